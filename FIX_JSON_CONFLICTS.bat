@@ -13,7 +13,7 @@ if exist "C:\PythonEnvs\ticketlive\Scripts\activate.bat" (
 )
 
 echo.
-echo [START] Fixing merge conflicts in JSON files...
+echo [START] Resolving merge conflicts in price files (union of both sides)...
 echo.
 
 REM Check Python (Windows 7 compatible)
@@ -30,11 +30,13 @@ if errorlevel 1 (
     set PYTHON_CMD=py
 )
 
-%PYTHON_CMD% fix_json_merge_conflicts.py
+REM Register the merge driver so future pulls don't leave conflict markers
+%PYTHON_CMD% merge_prices.py install
+%PYTHON_CMD% merge_prices.py repair
 
 echo.
 echo ============================================================
-echo [DONE] JSON conflicts fixed!
+echo [DONE] Price file conflicts resolved!
 echo ============================================================
 pause
 
@@ -11,6 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import subprocess
+from price_log import iter_records, read_records, current_path, rollup_path
 
 # Fix encoding for Windows (cp1252 can't handle emojis)
 if sys.platform == 'win32':
@@ -22,8 +23,10 @@ if sys.platform == 'win32':
 # ⚙️ CONFIGURATION
 # ==========================================
 SCRAPE_INTERVAL_HOURS = 2.0
-DATA_FILE_VIAGOGO = 'prices.json'
-DATA_FILE_FTN = 'prices_ftn.json'
+DATA_FILE_VIAGOGO = 'prices.ndjson'
+DATA_FILE_FTN = 'prices_ftn.ndjson'
+LEGACY_FILE_VIAGOGO = 'prices.json'
+LEGACY_FILE_FTN = 'prices_ftn.json'
 GAMES_FILE = 'all_games_to_scrape.json'
 PORT = 8000
 # ==========================================
@@ -41,11 +44,11 @@ app.add_middleware(
 # ---------------------------------------------------------
 # JSON Data Utility
 # ---------------------------------------------------------
-def load_data(file_path):
+def load_data(file_path, legacy_path=None):
+    file_path = current_path(file_path, legacy_path)
     if not os.path.exists(file_path): return []
-    try:
-        with open(file_path, 'r') as f: return json.load(f)
-    except: return []
+    # Points older than a week live in the log's hourly/daily rollup file
+    return list(iter_records(rollup_path(file_path))) + read_records(file_path)
 
 # ---------------------------------------------------------
 # API Endpoints
@@ -71,7 +74,7 @@ def get_matches():
 def get_history(match_url: str):
     try:
         # 1. LOAD VIAGOGO DATA
-        viagogo_data = load_data(DATA_FILE_VIAGOGO)
+        viagogo_data = load_data(DATA_FILE_VIAGOGO, LEGACY_FILE_VIAGOGO)
         v_match_data = []
         
         # Extract ID from requested URL
@@ -100,7 +103,7 @@ def get_history(match_url: str):
         v_match_data.sort(key=lambda x: x['timestamp'])
 
         # 2. IDENTIFY MATCH FOR FTN
-        ftn_data = load_data(DATA_FILE_FTN)
+        ftn_data = load_data(DATA_FILE_FTN, LEGACY_FILE_FTN)
         f_match_data = []
         
         match_number = None
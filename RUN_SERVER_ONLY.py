@@ -1,18 +1,34 @@
 """
 Railway Server - No Scrapers
-Only serves the API and frontend, reads from prices.json and prices_ftn.json
+Only serves the API and frontend, reads the price logs (prices.ndjson, prices_ftn.ndjson)
 """
+import asyncio
 import uvicorn
-import json
 import os
 import re
 import sys
-from fastapi import FastAPI, Request, HTTPException
+import time
+from datetime import datetime
+from fastapi import FastAPI, Request, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import subprocess
 from starlette.middleware.base import BaseHTTPMiddleware
+from price_store import (
+    CachedFile, PriceIndex, PriceSummary,
+    resolve_time_window, normalize_timestamp, in_window, window_series, after_cursor, page_before, parse_fields,
+    downsample_lttb, resample_step,
+)
+from http_cache import conditional_json
+from price_feed import PriceFeed, format_sse
+from json_response import FastJSONResponse
+from match_registry import MatchRegistry
+from price_log import stream_records, heartbeat_path, heartbeat_index, rollup_path
+from price_db import PriceDB, PriceDBSource
+from price_snapshot import SnapshotStore
+from team_store import TeamCache, with_heartbeat
+from rollup import SNAPSHOTS, pick_tier, rollup_series
 
 # Fix encoding for Windows
 if sys.platform == 'win32':
@@ -23,10 +39,24 @@ if sys.platform == 'win32':
 # ==========================================
 # ⚙️ CONFIGURATION
 # ==========================================
-DATA_FILE_VIAGOGO = 'prices.json'
-DATA_FILE_FTN = 'prices_ftn.json'
+DATA_FILE_VIAGOGO = 'prices.ndjson'
+DATA_FILE_FTN = 'prices_ftn.ndjson'
+LEGACY_FILE_VIAGOGO = 'prices.json'   # read until the first scraper append migrates it
+LEGACY_FILE_FTN = 'prices_ftn.json'
+# When each series was last observed - runs that change nothing only touch these
+HEARTBEAT_FILE_VIAGOGO = heartbeat_path(DATA_FILE_VIAGOGO)
+HEARTBEAT_FILE_FTN = heartbeat_path(DATA_FILE_FTN)
+PRICE_FILES = [DATA_FILE_VIAGOGO, LEGACY_FILE_VIAGOGO, DATA_FILE_FTN, LEGACY_FILE_FTN,
+               HEARTBEAT_FILE_VIAGOGO, HEARTBEAT_FILE_FTN]
+# Hourly/daily buckets of the points older than a week (python rollup.py run)
+ROLLUP_FILE_VIAGOGO = rollup_path(DATA_FILE_VIAGOGO)
+ROLLUP_FILE_FTN = rollup_path(DATA_FILE_FTN)
+DB_FILE = 'prices.db'  # local SQLite copy the scrapers write; /history prefers it when present
+HISTORY_FILES = PRICE_FILES + [ROLLUP_FILE_VIAGOGO, ROLLUP_FILE_FTN, DB_FILE, DB_FILE + '-wal']
+SNAPSHOT_DIR = 'snapshots'  # columnar exports (python price_snapshot.py export)
 GAMES_FILE = 'all_games_to_scrape.json'
-TEAMS_DATA_FILE = 'ftn_teams_data.json'
+FTN_GAMES_FILE = 'all_games_ftn_to_scrape.json'
+STREAM_HEARTBEAT = 15  # seconds between SSE keep-alive comments
 # Railway sets PORT dynamically - use whatever Railway provides
 # Railway will set PORT environment variable automatically
 PORT = int(os.environ.get('PORT', '8000'))  # Railway always sets PORT, but keep default for local dev
@@ -41,13 +71,15 @@ from contextlib import asynccontextmanager
 async def lifespan(app_instance: FastAPI):
     # Startup - Railway handles port/IP configuration
     print('[STARTUP] FastAPI application started', flush=True)
+    price_feed.start()
     try:
         yield
     finally:
         # Shutdown (if needed)
+        await price_feed.stop()
         print('[SHUTDOWN] FastAPI application shutting down', flush=True)
 
-app = FastAPI(title="Viagogo Monitor API", lifespan=lifespan)
+app = FastAPI(title="Viagogo Monitor API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Request logging middleware
 class LoggingMiddleware(BaseHTTPMiddleware):
@@ -70,37 +102,63 @@ app.add_middleware(
 # ---------------------------------------------------------
 # JSON Data Utility
 # ---------------------------------------------------------
-def load_data(file_path):
-    if not os.path.exists(file_path): 
-        print(f'[WARN] File not found: {file_path}')
-        return []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f: 
-            data = json.load(f)
-            print(f'[INFO] Loaded {len(data)} records from {file_path}')
-            return data
-    except Exception as e:
-        print(f'[ERROR] Failed to load {file_path}: {e}')
-        return []
+# Resident, indexed copies of the data files - re-parsed only when a file changes,
+# once per version no matter how many requests arrive together
+# Viagogo event id / FTN slug / match number -> one match key, built once at startup
+match_registry = MatchRegistry.load(GAMES_FILE, FTN_GAMES_FILE)
+print(f'[INFO] Match registry: {len(match_registry.matches)} matches')
+
+# Logs are streamed straight into the compact columns (price_store.PriceRows)
+viagogo_store = CachedFile(DATA_FILE_VIAGOGO, lambda rows: PriceIndex(rows, match_registry),
+                           reader=stream_records, fallback_path=LEGACY_FILE_VIAGOGO)
+ftn_store = CachedFile(DATA_FILE_FTN, lambda rows: PriceIndex(rows, match_registry),
+                       reader=stream_records, fallback_path=LEGACY_FILE_FTN)
+viagogo_heartbeat = CachedFile(HEARTBEAT_FILE_VIAGOGO, lambda state: heartbeat_index(state, match_registry), default={})
+ftn_heartbeat = CachedFile(HEARTBEAT_FILE_FTN, lambda state: heartbeat_index(state, match_registry), default={})
+# Absent until the first compaction - an empty index then
+viagogo_rollup = CachedFile(ROLLUP_FILE_VIAGOGO, lambda rows: PriceIndex(rows, match_registry), reader=stream_records)
+ftn_rollup = CachedFile(ROLLUP_FILE_FTN, lambda rows: PriceIndex(rows, match_registry), reader=stream_records)
+
+# Indexed SQLite store (WAL - scraper commits never block these reads)
+price_db = PriceDB(DB_FILE)
+# Memory-mapped column snapshots - served while their source file is unchanged
+viagogo_snapshot = SnapshotStore('viagogo', SNAPSHOT_DIR)
+ftn_snapshot = SnapshotStore('ftn', SNAPSHOT_DIR)
+games_store = CachedFile(GAMES_FILE, lambda games: games if isinstance(games, list) else [])
+
+# Latest / 24h-min per match and category, kept up to date row by row for /overview
+price_summary = PriceSummary()
+# Club games: one manifest per team (teams/{team_key}/manifest.json) + one shard per game
+team_cache = TeamCache()
+
+# Watches the same files and pushes change events to /stream clients
+def snapshot_baseline(snapshots, store):
+    snapshot = snapshots.current(store.current_path())
+    return snapshot.last_timestamp if snapshot is not None else None
+
+price_feed = PriceFeed({'viagogo': viagogo_store, 'ftn': ftn_store}, team_cache, GAMES_FILE, baselines={
+    'viagogo': lambda: snapshot_baseline(viagogo_snapshot, viagogo_store),
+    'ftn': lambda: snapshot_baseline(ftn_snapshot, ftn_store),
+})
 
 # ---------------------------------------------------------
 # API Endpoints
 # ---------------------------------------------------------
 @app.get('/matches')
-def get_matches():
+async def get_matches(request: Request):
+    async def build():
+        return build_matches(await games_store.aget())
+    return await conditional_json(request, [GAMES_FILE], build)
+
+def build_matches(games):
     try:
         print('[API] /matches endpoint called')
-        if not os.path.exists(GAMES_FILE): 
-            print(f'[WARN] {GAMES_FILE} not found')
-            return []
-        with open(GAMES_FILE, 'r', encoding='utf-8') as f: 
-            games = json.load(f)
         
         def get_match_number(match_name):
             m = re.search(r'Match (\d+)', match_name)
             return int(m.group(1)) if m else 9999
 
-        matches_list = [{'match_name': g['match_name'], 'match_url': g['url']} for g in games]
+        matches_list = [{'match_name': g['match_name'], 'match_url': g['url'], 'match_key': match_registry.resolve(g['url'], g['match_name'])} for g in games]
         matches_list.sort(key=lambda x: get_match_number(x['match_name']))
         print(f'[API] Returning {len(matches_list)} matches')
         return matches_list
@@ -111,106 +169,112 @@ def get_matches():
         return []
 
 @app.get('/history')
-def get_history(match_url: str):
+async def get_history(
+    request: Request,
+    match_url: str,
+    from_: str = Query(None, alias='from'),
+    to: str = Query(None),
+    time_range: str = Query(None, alias='range'),
+    max_points: int = Query(None, ge=2),
+    since: str = Query(None),
+    step: int = Query(None, ge=300),
+):
+    """
+    Price history for one match. from/to (ISO or epoch) and range (24h/7d/30d/all)
+    trim the series on the server; max_points caps each category's series with LTTB.
+    since= (the `cursor` of a previous response) returns only points appended after it.
+    Stored points are change points extended to each series' last observation;
+    step= (seconds) expands them into a regular step series instead. Points older
+    than a week come from hourly/daily buckets (with min/max); when a series has
+    more than max_points points and the window only needs one per hour or day,
+    recent points are bucketed the same way.
+    """
+    try:
+        window_start, window_end = resolve_time_window(from_, to, time_range)
+        if since:
+            since = normalize_timestamp(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A relative range slides with the clock, so its ETag also rolls over every hour
+    clock = int(time.time() // 3600) if time_range and not from_ else None
+    async def build():
+        sources = await asyncio.gather(
+            history_source('viagogo', viagogo_store, viagogo_snapshot),
+            history_source('ftn', ftn_store, ftn_snapshot),
+        )
+        heartbeats = await asyncio.gather(viagogo_heartbeat.aget(), ftn_heartbeat.aget())
+        rollups = await asyncio.gather(viagogo_rollup.aget(), ftn_rollup.aget())
+        return await asyncio.to_thread(build_history, *sources, match_url, window_start, window_end, max_points, since,
+                                       heartbeats, step, rollups)
+
+    return await conditional_json(request, HISTORY_FILES, build, extra=clock)
+
+async def history_source(source, store, snapshots):
+    """
+    Cheapest up-to-date reader for a source: mapped snapshot, then SQLite, then the in-memory index.
+    prices.db only counts while its import marker matches the log on disk (price_db.synced)
+    """
+    path = store.current_path()
+    snapshot = snapshots.current(path)
+    if snapshot is not None:
+        return snapshot
+    if os.path.exists(DB_FILE) and await asyncio.to_thread(price_db.synced, source, path):
+        return PriceDBSource(price_db, source)
+    return await store.aget()
+
+def build_history(viagogo_index, ftn_index, match_url,
+                  window_start=None, window_end=None, max_points=None, since=None,
+                  heartbeats=({}, {}), step=None, rollups=(None, None)):
     try:
         print(f"[API] History Request for URL: {match_url[:50]}...")
         
-        # 1. LOAD VIAGOGO DATA
-        viagogo_data = load_data(DATA_FILE_VIAGOGO)
-        v_match_data = []
-        
-        # Extract ID from requested URL
-        # e.g. .../World-Cup-Tickets/E-153033506?Currency=... -> E-153033506
-        req_id = None
-        match = re.search(r'/(E-\d+)', match_url)
-        if match: 
-            req_id = match.group(1)
-        
-        print(f"[API] Looking for Viagogo ID: {req_id}")
-
-        for row in viagogo_data:
-            # Extract ID from stored URL (remove query params for comparison)
-            stored_url = row.get('match_url', '').split('?')[0].split('&')[0]
-            stored_id = None
-            m_stored = re.search(r'/(E-\d+)', stored_url)
-            if m_stored: 
-                stored_id = m_stored.group(1)
-            
-            # Clean request URL too
-            clean_req_url = match_url.split('?')[0].split('&')[0]
-            
-            # Match by ID if possible (most reliable)
-            if req_id and stored_id:
-                if req_id == stored_id:
-                    v_match_data.append(row)
-                    continue
-            
-            # Match by URL (exact or partial)
-            if clean_req_url in stored_url or stored_url in clean_req_url:
-                v_match_data.append(row)
-                continue
-            
-            # Match by match number in match_name
-            match_name = row.get('match_name', '')
-            match_num = re.search(r'Match (\d+)', match_name)
-            if match_num:
-                url_match_num = re.search(r'Match (\d+)', match_url, re.IGNORECASE)
-                if url_match_num and match_num.group(1) == url_match_num.group(1):
-                    v_match_data.append(row)
-                    continue
-                 
-        print(f"[API] Found {len(v_match_data)} Viagogo records.")
-        v_match_data.sort(key=lambda x: x.get('timestamp', ''))
+        # Same match key for both sources - e.g. .../World-Cup-Tickets/E-153033506 -> match-79
+        match_key = match_registry.resolve(match_url)
+        print(f"[API] Match key: {match_key}")
 
-        # 2. IDENTIFY MATCH FOR FTN
-        ftn_data = load_data(DATA_FILE_FTN)
-        f_match_data = []
-        
-        match_number = None
-        m = re.search(r'Match (\d+)', match_url, re.IGNORECASE)
-        
-        # New fallback: Look in GAMES_FILE if URL does not have match number
-        if not m and os.path.exists(GAMES_FILE):
-             try:
-                 with open(GAMES_FILE, 'r', encoding='utf-8') as f: 
-                     games = json.load(f)
-                 # Find game with this URL (ignoring query params)
-                 clean_input_url = match_url.split('?')[0]
-                 
-                 for g in games:
-                     if g['url'].split('?')[0] == clean_input_url:
-                         m = re.search(r'Match (\d+)', g['match_name'], re.IGNORECASE)
-                         break
-             except Exception as e:
-                 print(f'[ERROR] Error loading games file: {e}')
-
-        if not m and v_match_data:
-             m = re.search(r'Match (\d+)', v_match_data[0].get('match_name', ''), re.IGNORECASE)
-        
-        if m:
-            match_number = m.group(1)
-            # Find FTN records for this Match #
-            f_match_data = [d for d in ftn_data if f'Match {match_number}' in d.get('match_name', '')]
-            f_match_data.sort(key=lambda x: x.get('timestamp', ''))
-            print(f"[API] Found {len(f_match_data)} FTN records for Match {match_number}")
+        # Rolled-up buckets all precede their series' raw points
+        def match_rows(index, rollup_index):
+            if not match_key:
+                return []
+            rolled = rollup_index.for_match(match_key, since=since) if rollup_index is not None else []
+            return rolled + index.for_match(match_key, since=since)
+
+        v_match_data = match_rows(viagogo_index, rollups[0])
+        f_match_data = match_rows(ftn_index, rollups[1])
+        print(f"[API] Found {len(v_match_data)} Viagogo / {len(f_match_data)} FTN records.")
         
-        def process_source_data(data_list):
-            if not data_list: 
-                return {}, []
-            categories = sorted(list(set(d.get('category', '') for d in data_list if d.get('category'))))
+        def process_source_data(data_list, heartbeat):
+            rows = {}
+            for d in data_list:
+                if d.get('category'):
+                    rows.setdefault(d['category'], []).append(d)
+            # Unchanged prices aren't stored again: each series starts with the price in force
+            # at window_start and runs on to its last observation (heartbeat)
+            seen = heartbeat.get(match_key, {})
             result_data = {}
-            for cat in categories:
-                cat_rows = [d for d in data_list if d.get('category') == cat]
-                result_data[cat] = [{'timestamp': d.get('timestamp', ''), 'price': d.get('price', 0)} for d in cat_rows]
-            return result_data, categories
+            for cat in set(rows) | set(seen):
+                points = window_series(rows.get(cat, []), window_start, window_end, since, seen.get(cat))
+                if points:
+                    result_data[cat] = points
+            categories = sorted(result_data)
+            return {cat: downsample_lttb(history_points(result_data[cat], window_start, window_end, max_points, step),
+                                         max_points)
+                    for cat in categories}, categories
+
+        v_processed, v_cats = process_source_data(v_match_data, heartbeats[0] or {})
+        f_processed, f_cats = process_source_data(f_match_data, heartbeats[1] or {})
 
-        v_processed, v_cats = process_source_data(v_match_data)
-        f_processed, f_cats = process_source_data(f_match_data)
+        # Newest timestamp seen - pass back as since= to get only what was appended after it
+        seen = [rows[-1].get('timestamp', '') for rows in (v_match_data, f_match_data) if rows]
+        seen += [entry['last_seen'] for hb in heartbeats for entry in (hb or {}).get(match_key, {}).values()]
+        cursor = max([since or ''] + seen) or None
 
         result = {
             'viagogo': {'categories': v_cats, 'data': v_processed},
             'ftn': {'categories': f_cats, 'data': f_processed},
-            'currency': 'USD'
+            'currency': 'USD',
+            'cursor': cursor
         }
         
         print(f"[API] Returning: Viagogo categories: {v_cats}, FTN categories: {f_cats}")
@@ -222,6 +286,87 @@ def get_history(match_url: str):
         traceback.print_exc()
         return {'viagogo': {'categories': [], 'data': {}}, 'ftn': {'categories': [], 'data': {}}}
 
+def bucket_tier(points, window_start, window_end, max_points):
+    """
+    Coarsest rollup tier that still leaves max_points buckets across the window -
+    None (raw points) when the series already fits in max_points
+    """
+    if not max_points or len(points) <= max_points:
+        return None
+    start = datetime.fromisoformat(window_start or points[0]['timestamp'])
+    end = datetime.fromisoformat(window_end or points[-1]['timestamp'])
+    return pick_tier((end - start).total_seconds() / max_points)
+
+def history_points(points, window_start, window_end, max_points, step):
+    if step:
+        return resample_step(points, step, window_start, window_end)
+    tier = bucket_tier(points, window_start, window_end, max_points)
+    if tier is None:
+        return points
+    return [{'timestamp': b['timestamp'], 'price': b['price'], 'min': b['min'], 'max': b['max']}
+            for b in rollup_series(points, tier)]
+
+@app.get('/overview')
+async def get_overview(request: Request):
+    """Latest and 24h-min price per category for every match, Viagogo and FTN, in one call"""
+    async def build():
+        viagogo_index, ftn_index = await asyncio.gather(viagogo_store.aget(), ftn_store.aget())
+        price_summary.sync('viagogo', viagogo_index)
+        price_summary.sync('ftn', ftn_index)
+        heartbeats = await asyncio.gather(viagogo_heartbeat.aget(), ftn_heartbeat.aget())
+        return build_overview(price_summary.overview({'viagogo': heartbeats[0], 'ftn': heartbeats[1]}))
+
+    # min_24h slides with the clock, so the ETag rolls over hourly as well
+    return await conditional_json(request, PRICE_FILES, build, extra=int(time.time() // 3600))
+
+def build_overview(summary):
+    try:
+        overview = []
+        for match_key, match in sorted(match_registry.matches.items(), key=lambda item: item[1]['match_number']):
+            prices = summary.get(match_key, {})
+            overview.append({
+                'match_key': match_key,
+                'match_number': match['match_number'],
+                'match_name': match['match_name'],
+                'match_url': match.get('viagogo_url'),
+                'viagogo': prices.get('viagogo', {}),
+                'ftn': prices.get('ftn', {}),
+            })
+        return overview
+    except Exception as e:
+        print(f'[ERROR] /overview error: {e}')
+        return []
+
+@app.get('/stream')
+async def stream(request: Request):
+    """
+    Server-Sent Events: 'price' (one per source and match with new Viagogo/FTN rows:
+    `prices` holds the latest stored price of every category of the match, `changed`
+    the categories those rows touched), 'team' (one per team game with a new
+    snapshot) and 'matches' (games list changed). A dashboard needs only one
+    connection for all three.
+    """
+    queue = price_feed.subscribe()
+
+    async def events():
+        try:
+            yield 'retry: 5000\n\n'
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'  # keeps proxies from closing an idle connection
+                    continue
+                yield format_sse(event, data)
+        finally:
+            price_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # ---------------------------------------------------------
 # Auto-Build Frontend
 # ---------------------------------------------------------
@@ -308,13 +453,14 @@ else:
 
 # Serve vite.svg from root (referenced in index.html)
 @app.get('/teams')
-def get_teams():
+async def get_teams(request: Request):
     """Get list of available teams"""
+    async def build():
+        return build_teams(await team_cache.amanifests())
+    return await conditional_json(request, team_cache.manifest_paths(), build)
+
+def build_teams(data):
     try:
-        if not os.path.exists(TEAMS_DATA_FILE):
-            return []
-        with open(TEAMS_DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
         teams = []
         for team_key, team_data in data.items():
             teams.append({
@@ -329,57 +475,151 @@ def get_teams():
         print(f'[ERROR] /teams error: {e}')
         return []
 
+# Per-game fields for /teams/{team_key}; price_history is opt-in and paged by limit/cursor
+TEAM_GAME_FIELDS = {
+    'url': lambda game: game.get('url'),
+    'match_name': lambda game: game.get('match_name'),
+    'opponent': lambda game: game.get('opponent'),
+    'date': lambda game: game.get('date'),
+    'latest_prices': lambda game: game.get('latest_prices', {}),
+    'last_scraped': lambda game: game.get('last_scraped'),
+    'price_history_count': lambda game: game.get('price_history_count', 0),
+    'price_history': None,
+}
+DEFAULT_TEAM_GAME_FIELDS = [f for f in TEAM_GAME_FIELDS if f != 'price_history']
+
+GAME_PRICE_FIELDS = ['game', 'prices', 'latest_prices', 'cursor', 'next_cursor']
+
+def parse_paging(fields, allowed, default, cursor):
+    try:
+        return parse_fields(fields, allowed, default), (normalize_timestamp(cursor) if cursor else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get('/teams/{team_key}')
-def get_team_games(team_key: str):
-    """Get all games for a specific team"""
+async def get_team_games(
+    team_key: str,
+    request: Request,
+    fields: str = Query(None),
+    limit: int = Query(None, ge=1),
+    cursor: str = Query(None),
+):
+    """
+    Get all games for a specific team. fields= picks the per-game keys (add
+    price_history to get snapshots: the newest `limit`, older than `cursor` if given).
+    """
+    fields, cursor = parse_paging(fields, TEAM_GAME_FIELDS, DEFAULT_TEAM_GAME_FIELDS, cursor)
+    async def build():
+        data = await load_team(team_key, with_history='price_history' in fields)
+        return build_team_games(data, team_key, fields, limit, cursor)
+    # Runs append to the game shards first and rewrite the manifest last, so it versions both
+    return await conditional_json(request, [team_cache.store.manifest_path(team_key)], build)
+
+async def load_team(team_key, with_history=False, game_index=None):
+    """
+    {team_key: team_data} in the nested shape the builders use, from the team's manifest;
+    price_history is read from the game shards for every game, or just game_index.
+    """
+    if team_key not in team_cache.store.team_keys():
+        return {}
+    manifest = await team_cache.manifest_file(team_key).aget()
+    if not manifest:
+        return {}
+    games = [dict(game) for game in manifest.get('games', [])]
+    if with_history:
+        wanted = range(len(games)) if game_index is None else [i for i in [game_index] if 0 <= i < len(games)]
+        histories = await asyncio.gather(*(team_cache.ahistory(team_key, games[i]['id']) for i in wanted))
+        for i, history in zip(wanted, histories):
+            # Shards only store changes - extend each game to its latest observation
+            games[i]['price_history'] = with_heartbeat(history, games[i])
+    return {team_key: {**manifest, 'games': games}}
+
+def build_team_games(data, team_key, fields=DEFAULT_TEAM_GAME_FIELDS, limit=None, cursor=None):
     try:
-        if not os.path.exists(TEAMS_DATA_FILE):
-            return []
-        with open(TEAMS_DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
         if team_key not in data:
             return []
         team_data = data[team_key]
         games = []
         for game in team_data.get('games', []):
-            games.append({
-                'url': game.get('url'),
-                'match_name': game.get('match_name'),
-                'opponent': game.get('opponent'),
-                'date': game.get('date'),
-                'latest_prices': game.get('latest_prices', {}),
-                'last_scraped': game.get('last_scraped'),
-                'price_history_count': len(game.get('price_history', []))
-            })
+            entry = {}
+            for field in fields:
+                if field == 'price_history':
+                    entry['price_history'], entry['next_cursor'] = page_before(game.get('price_history', []), cursor, limit)
+                else:
+                    entry[field] = TEAM_GAME_FIELDS[field](game)
+            games.append(entry)
         return games
     except Exception as e:
         print(f'[ERROR] /teams/{team_key} error: {e}')
         return []
 
 @app.get('/teams/{team_key}/game/{game_index}')
-def get_game_prices(team_key: str, game_index: int):
-    """Get price history for a specific game"""
+async def get_game_prices(
+    team_key: str,
+    game_index: int,
+    request: Request,
+    since: str = Query(None),
+    fields: str = Query(None),
+    limit: int = Query(None, ge=1),
+    cursor: str = Query(None),
+    from_: str = Query(None, alias='from'),
+    to: str = Query(None),
+    time_range: str = Query(None, alias='range'),
+    max_points: int = Query(None, ge=2),
+):
+    """
+    Get price history for a specific game. since= returns only snapshots after it;
+    limit/cursor page backwards from the newest snapshot (next_cursor = older page);
+    fields= picks any of game, prices, latest_prices, cursor, next_cursor.
+    from/to/range trim the snapshots like /history; when there are more than max_points
+    they are merged into hourly or daily buckets (per-block min/max) if the window allows it.
+    """
+    fields, cursor = parse_paging(fields, GAME_PRICE_FIELDS, GAME_PRICE_FIELDS, cursor)
+    try:
+        if since:
+            since = normalize_timestamp(since)
+        window = resolve_time_window(from_, to, time_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    clock = int(time.time() // 3600) if time_range and not from_ else None
+    async def build():
+        data = await load_team(team_key, with_history=True, game_index=game_index)
+        return build_game_prices(data, team_key, game_index, since, fields, limit, cursor, window, max_points)
+    return await conditional_json(request, [team_cache.store.manifest_path(team_key)], build, extra=clock)
+
+def build_game_prices(data, team_key, game_index, since=None, fields=GAME_PRICE_FIELDS, limit=None, cursor=None,
+                      window=(None, None), max_points=None):
     try:
-        if not os.path.exists(TEAMS_DATA_FILE):
-            return {'prices': [], 'game': None}
-        with open(TEAMS_DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
         if team_key not in data:
             return {'prices': [], 'game': None}
         games = data[team_key].get('games', [])
         if game_index < 0 or game_index >= len(games):
             return {'prices': [], 'game': None}
         game = games[game_index]
-        return {
-            'game': {
+        history = game.get('price_history', [])
+        result = {}
+        if 'game' in fields:
+            result['game'] = {
                 'match_name': game.get('match_name'),
                 'url': game.get('url'),
                 'opponent': game.get('opponent'),
                 'date': game.get('date')
-            },
-            'prices': game.get('price_history', []),
-            'latest_prices': game.get('latest_prices', {})
-        }
+            }
+        if 'prices' in fields or 'next_cursor' in fields:
+            snapshots = [s for s in after_cursor(history, since) if in_window(s.get('timestamp', ''), *window)]
+            tier = bucket_tier(snapshots, *window, max_points)
+            if tier is not None:
+                snapshots = rollup_series(snapshots, tier, SNAPSHOTS)
+            prices, next_cursor = page_before(snapshots, cursor, limit)
+            if 'prices' in fields:
+                result['prices'] = prices
+            if 'next_cursor' in fields:
+                result['next_cursor'] = next_cursor
+        if 'latest_prices' in fields:
+            result['latest_prices'] = game.get('latest_prices', {})
+        if 'cursor' in fields:
+            result['cursor'] = history[-1].get('timestamp') if history else since
+        return result
     except Exception as e:
         print(f'[ERROR] /teams/{team_key}/game/{game_index} error: {e}')
         return {'prices': [], 'game': None}
@@ -404,7 +644,7 @@ async def serve_react_app(full_path: str, request: Request):
     """Serve React app for all non-API routes (SPA routing)"""
     # Explicitly exclude API routes and static assets
     # These should never reach here if routes are defined correctly above
-    excluded_paths = ['matches', 'history', 'teams', 'health', 'assets', 'vite.svg']
+    excluded_paths = ['matches', 'history', 'overview', 'stream', 'teams', 'health', 'assets', 'vite.svg']
     if any(full_path.startswith(excluded) for excluded in excluded_paths):
         # This shouldn't happen if routes are defined correctly, but just in case
         raise HTTPException(status_code=404, detail="API route not found")
@@ -427,22 +667,17 @@ if __name__ == '__main__':
         print('\n' + '='*60, flush=True)
         print(f'  [START] VIAGOGO MONITOR - SERVER ONLY (NO SCRAPERS)', flush=True)
         print(f'  [PORT] {PORT}', flush=True)
-        print(f'  [DATA] Loading from {DATA_FILE_VIAGOGO} and {DATA_FILE_FTN}', flush=True)
+        print(f'  [DATA] Loading from {viagogo_store.current_path()} and {ftn_store.current_path()}', flush=True)
         print('='*60 + '\n', flush=True)
         
         # Quick check - don't load full data at startup, just verify files exist
         print('[INFO] Verifying data files exist...', flush=True)
-        if os.path.exists(DATA_FILE_VIAGOGO):
-            file_size = os.path.getsize(DATA_FILE_VIAGOGO)
-            print(f'[OK] {DATA_FILE_VIAGOGO} exists ({file_size} bytes)', flush=True)
-        else:
-            print(f'[WARN] {DATA_FILE_VIAGOGO} not found', flush=True)
-        
-        if os.path.exists(DATA_FILE_FTN):
-            file_size = os.path.getsize(DATA_FILE_FTN)
-            print(f'[OK] {DATA_FILE_FTN} exists ({file_size} bytes)', flush=True)
-        else:
-            print(f'[WARN] {DATA_FILE_FTN} not found', flush=True)
+        for data_file in (viagogo_store.current_path(), ftn_store.current_path()):
+            if os.path.exists(data_file):
+                file_size = os.path.getsize(data_file)
+                print(f'[OK] {data_file} exists ({file_size} bytes)', flush=True)
+            else:
+                print(f'[WARN] {data_file} not found', flush=True)
         
         # Verify frontend build exists
         print('[INFO] Verifying frontend build...', flush=True)
@@ -0,0 +1,176 @@
+"""
+Crash-safe Writes for the Data Files
+Whole documents are written to a temp file next to the target, fsynced and renamed
+over it, so a reader (the API server, another scraper) sees the old file or the new
+one - never half of one. Writers of the same file are serialized by an advisory
+lock on a sidecar {path}.lock, which works across processes (fcntl / msvcrt) and
+threads, and is re-entrant so locked helpers can call each other.
+
+    with file_lock('prices.ndjson'):                 # read-modify-write of one file
+        ...
+    write_json('teams/arsenal/manifest.json', manifest, indent=2)
+    with atomic_write('prices.ndjson') as f:         # stream a complete new version
+        ...
+
+Readers take no lock. Lock files are left in place (deleting them would race).
+"""
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_TIMEOUT = 120  # seconds a writer waits for another writer of the same file
+POLL_INTERVAL = 0.05
+
+
+class LockTimeout(TimeoutError):
+    """Another writer held the file for longer than the timeout"""
+
+
+def lock_path(path):
+    return path + '.lock'
+
+
+# ---------------------------------------------------------
+# Locking
+# ---------------------------------------------------------
+def _try_lock(fd):
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _acquire(path, deadline):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    while not _try_lock(fd):
+        if time.monotonic() >= deadline:
+            os.close(fd)
+            raise LockTimeout(f'{path} is held by another writer')
+        time.sleep(POLL_INTERVAL)
+    return fd
+
+
+class _HeldLock:
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_held = {}
+_held_guard = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    # A forked child owns none of its parent's locks
+    os.register_at_fork(after_in_child=_held.clear)
+
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """
+    Exclusive lock on `path` against every other writer. Raises LockTimeout after
+    `timeout` seconds (0 = fail at once if someone else has it).
+    """
+    with _held_guard:
+        held = _held.setdefault(os.path.abspath(path), _HeldLock())
+    deadline = time.monotonic() + timeout
+    if not held.thread_lock.acquire(timeout=timeout):
+        raise LockTimeout(f'{path} is held by another thread')
+    try:
+        if held.depth == 0:
+            held.fd = _acquire(lock_path(path), deadline)
+        held.depth += 1
+        try:
+            yield
+        finally:
+            held.depth -= 1
+            if held.depth == 0:
+                _unlock(held.fd)
+                os.close(held.fd)
+                held.fd = None
+    finally:
+        held.thread_lock.release()
+
+
+# ---------------------------------------------------------
+# Writing
+# ---------------------------------------------------------
+def _replace(tmp_path, path, attempts=40):
+    for attempt in range(attempts):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            # Windows refuses while a reader has the target open - it closes in a moment
+            if attempt == attempts - 1:
+                raise
+            time.sleep(POLL_INTERVAL)
+
+
+def _fsync_dir(directory):
+    """Make the rename itself durable (POSIX only - Windows can't open directories)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8'):
+    """
+    File object for a complete new version of `path`, swapped in when the block
+    exits cleanly and discarded if it raises. Holds the file's lock throughout.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with file_lock(path):
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600 - keep the target's permissions
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o644)
+            _replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    _fsync_dir(directory)
+
+
+def write_json(path, data, **dump_kwargs):
+    with atomic_write(path) as f:
+        json.dump(data, f, **dump_kwargs)
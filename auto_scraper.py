@@ -7,6 +7,9 @@ from datetime import datetime
 import json
 import threading
 
+import merge_prices
+import rollup
+
 # Fix encoding for Windows
 if sys.platform == 'win32':
     import io
@@ -30,8 +33,12 @@ PYTHON_CMD = get_python_cmd()
 # ⚙️ CONFIGURATION
 # ==========================================
 SCRAPE_INTERVAL_HOURS = 2.0  # Run every 2 hours
-PRICES_FTN_FILE = 'prices_ftn.json'
-PRICES_VIAGOGO_FILE = 'prices.json'
+PRICES_FTN_FILE = 'prices_ftn.ndjson'
+PRICES_VIAGOGO_FILE = 'prices.ndjson'
+# Last-observed time per series (runs with no price changes only update these)
+HEARTBEAT_FILES = [PRICES_FTN_FILE + '.heartbeat.json', PRICES_VIAGOGO_FILE + '.heartbeat.json']
+# Hourly/daily buckets of the points older than a week (written by compact_history)
+ROLLUP_FILES = ['prices_ftn.rollup.ndjson', 'prices.rollup.ndjson']
 
 # ==========================================
 # Scraper Functions
@@ -169,32 +176,48 @@ def git_commit(message):
             return True
         else:
             # Check if there are no changes to commit
-<<<<<<< .merge_file_a04156
-            if 'nothing to commit' in result.stdout.lower() or 'nothing to commit' in result.stderr.lower():
-                print(f'   [INFO] No changes to commit', flush=True)
-                return True
-=======
             output = (result.stdout + result.stderr).lower()
             if 'nothing to commit' in output or 'no changes' in output:
                 print(f'   [INFO] No changes to commit (files already up to date)', flush=True)
                 return True  # Return True because this is not an error
->>>>>>> .merge_file_a11708
             print(f'   [ERROR] Commit failed: {result.stderr}', flush=True)
             return False
     except Exception as e:
         print(f'   [ERROR] Git commit error: {e}', flush=True)
         return False
 
+def git_pull():
+    """Merge the remote's new commits - price files are union-merged by merge_prices.py"""
+    result = subprocess.run(
+        ['git', 'pull', '--no-rebase', '--no-edit'],
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    if result.returncode == 0:
+        print(f'   [OK] Pulled remote changes', flush=True)
+        return True
+    print(f'   [ERROR] Pull failed: {result.stderr}', flush=True)
+    subprocess.run(['git', 'merge', '--abort'], capture_output=True)
+    return False
+
 def git_push():
-    """Push to remote repository"""
+    """Push to remote repository (pulling first if another machine pushed in the meantime)"""
     try:
-        result = subprocess.run(
-            ['git', 'push'],
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
+        def push():
+            return subprocess.run(
+                ['git', 'push'],
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+        result = push()
+        if result.returncode != 0 and ('rejected' in result.stderr or 'fetch first' in result.stderr):
+            print(f'   [INFO] Remote has new commits - pulling and retrying', flush=True)
+            if git_pull():
+                result = push()
         if result.returncode == 0:
             print(f'   [OK] Pushed to remote repository', flush=True)
             return True
@@ -205,12 +228,19 @@ def git_push():
         print(f'   [ERROR] Git push error: {e}', flush=True)
         return False
 
+def compact_history():
+    """Move points older than a week into the hourly/daily rollup files (rollup.py)"""
+    try:
+        rollup.compact_all(teams=False)
+    except Exception as e:
+        print(f'   [WARN] Rollup compaction failed: {e}', flush=True)
+
 def commit_and_push_prices():
     """Commit and push price files"""
     print(f'\n[{datetime.now().strftime("%H:%M:%S")}] [ACTION] Committing and pushing price files...', flush=True)
     
     # Files to commit
-    price_files = [PRICES_FTN_FILE, PRICES_VIAGOGO_FILE]
+    price_files = [PRICES_FTN_FILE, PRICES_VIAGOGO_FILE] + HEARTBEAT_FILES + ROLLUP_FILES
     
     # Check if files exist
     files_to_commit = []
@@ -332,6 +362,8 @@ def run_cycle():
     else:
         print(f'\n[{datetime.now().strftime("%H:%M:%S")}] [OK] At least one scraper succeeded.', flush=True)
     
+    compact_history()
+
     # Always try to commit and push if price files exist (they might have been updated even if scraper reported failure)
     commit_and_push_prices()
     
@@ -347,6 +379,12 @@ def main():
     print(f'  [FILES] {PRICES_FTN_FILE}, {PRICES_VIAGOGO_FILE}')
     print(f'{"="*60}\n')
     
+    # Price files get union-merged on pull instead of conflict markers
+    try:
+        merge_prices.install()
+    except Exception as e:
+        print(f'[WARN] Could not install the price merge driver: {e}', flush=True)
+    
     # Run first cycle immediately
     run_cycle()
     
@@ -8,8 +8,12 @@ import os
 import sys
 import shutil
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import json
 
+import merge_prices
+import rollup
+
 # Fix encoding for Windows
 if sys.platform == 'win32':
     import io
@@ -33,7 +37,8 @@ PYTHON_CMD = get_python_cmd()
 # ⚙️ CONFIGURATION
 # ==========================================
 SCRAPE_INTERVAL_HOURS = 3.0  # Run every 3 hours
-OUTPUT_FILE = 'ftn_teams_data.json'
+TEAMS_DIR = 'teams'  # teams/{team_key}/manifest.json + games/*.ndjson (see team_store.py)
+PARALLEL_TEAMS = 2  # team runs write to separate shards, so they can overlap
 
 # ==========================================
 # Git Functions
@@ -79,16 +84,38 @@ def git_commit(message):
         print(f'   [ERROR] Git commit error: {e}', flush=True)
         return False
 
+def git_pull():
+    """Merge the remote's new commits - price files are union-merged by merge_prices.py"""
+    result = subprocess.run(
+        ['git', 'pull', '--no-rebase', '--no-edit'],
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    if result.returncode == 0:
+        print(f'   [OK] Pulled remote changes', flush=True)
+        return True
+    print(f'   [ERROR] Pull failed: {result.stderr}', flush=True)
+    subprocess.run(['git', 'merge', '--abort'], capture_output=True)
+    return False
+
 def git_push():
-    """Push to remote repository"""
+    """Push to remote repository (pulling first if another machine pushed in the meantime)"""
     try:
-        result = subprocess.run(
-            ['git', 'push'],
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
+        def push():
+            return subprocess.run(
+                ['git', 'push'],
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+        result = push()
+        if result.returncode != 0 and ('rejected' in result.stderr or 'fetch first' in result.stderr):
+            print(f'   [INFO] Remote has new commits - pulling and retrying', flush=True)
+            if git_pull():
+                result = push()
         if result.returncode == 0:
             print(f'   [OK] Pushed to remote repository', flush=True)
             return True
@@ -99,14 +126,21 @@ def git_push():
         print(f'   [ERROR] Git push error: {e}', flush=True)
         return False
 
+def compact_history():
+    """Move points older than a week into the hourly/daily rollup files (rollup.py)"""
+    try:
+        rollup.compact_all(sources=())
+    except Exception as e:
+        print(f'   [WARN] Rollup compaction failed: {e}', flush=True)
+
 def commit_and_push_teams_data():
     """Commit and push teams data file"""
     print(f'\n[{datetime.now().strftime("%H:%M:%S")}] [ACTION] Committing and pushing teams data...', flush=True)
     
     # Files to commit
-    files_to_commit = [OUTPUT_FILE]
+    files_to_commit = [TEAMS_DIR]
     
-    # Add all team-specific files (*_prices.json)
+    # Add all team seed files (*_prices.json)
     import glob
     team_files = glob.glob('*_prices.json')
     files_to_commit.extend(team_files)
@@ -277,21 +311,15 @@ def run_all_teams():
         print(f'   [ERROR] No teams found in config. Exiting.', flush=True)
         return False
     
-    results = {}
-    for team in teams:
-        team_key = team['key']
-        team_name = team['name']
+    def run_one(team):
         print(f'\n{"="*60}', flush=True)
-        print(f'[{datetime.now().strftime("%H:%M:%S")}] Processing: {team_name} ({team_key})', flush=True)
+        print(f'[{datetime.now().strftime("%H:%M:%S")}] Processing: {team["name"]} ({team["key"]})', flush=True)
         print(f'{"="*60}', flush=True)
-        
-        success = run_team_scraper(team_key)
-        results[team_key] = success
-        
-        # Wait between teams to be nice to the server
-        if team != teams[-1]:  # Don't wait after last team
-            print(f'\n   [INFO] Waiting 5 seconds before next team...', flush=True)
-            time.sleep(5)
+        return run_team_scraper(team['key'])
+    
+    # Each team only writes its own shards, so up to PARALLEL_TEAMS runs overlap
+    with ThreadPoolExecutor(max_workers=PARALLEL_TEAMS) as pool:
+        results = dict(zip([team['key'] for team in teams], pool.map(run_one, teams)))
     
     # Summary
     print(f'\n{"="*60}', flush=True)
@@ -301,6 +329,8 @@ def run_all_teams():
         status = '✅ SUCCESS' if success else '❌ FAILED'
         print(f'   {team_key}: {status}', flush=True)
     
+    compact_history()
+
     # Commit and push
     print(f'\n{"="*60}', flush=True)
     commit_and_push_teams_data()
@@ -327,9 +357,15 @@ def main():
     print(f'\n{"="*60}', flush=True)
     print(f'[START] AUTO SCRAPER - TEAMS PRICE MONITORING & AUTO COMMIT', flush=True)
     print(f'[INTERVAL] Running every {SCRAPE_INTERVAL_HOURS} hours', flush=True)
-    print(f'[FILES] {OUTPUT_FILE}, teams_config.json', flush=True)
+    print(f'[FILES] {TEAMS_DIR}/, teams_config.json', flush=True)
     print(f'{"="*60}\n', flush=True)
     
+    # Price files get union-merged on pull instead of conflict markers
+    try:
+        merge_prices.install()
+    except Exception as e:
+        print(f'[WARN] Could not install the price merge driver: {e}', flush=True)
+    
     # Run immediately on start
     run_cycle()
     
@@ -10,6 +10,9 @@ import shutil
 from datetime import datetime
 import json
 
+import merge_prices
+import rollup
+
 # Fix encoding for Windows
 if sys.platform == 'win32':
     import io
@@ -33,7 +36,9 @@ PYTHON_CMD = get_python_cmd()
 # ⚙️ CONFIGURATION
 # ==========================================
 SCRAPE_INTERVAL_HOURS = 3.0  # Run every 3 hours
-PRICES_VIAGOGO_FILE = 'prices.json'
+PRICES_VIAGOGO_FILE = 'prices.ndjson'
+HEARTBEAT_FILE = PRICES_VIAGOGO_FILE + '.heartbeat.json'  # last-observed time per series
+ROLLUP_FILE = 'prices.rollup.ndjson'  # hourly/daily buckets of the points older than a week
 
 # ==========================================
 # Git Functions
@@ -79,16 +84,38 @@ def git_commit(message):
         print(f'   [ERROR] Git commit error: {e}', flush=True)
         return False
 
+def git_pull():
+    """Merge the remote's new commits - price files are union-merged by merge_prices.py"""
+    result = subprocess.run(
+        ['git', 'pull', '--no-rebase', '--no-edit'],
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+    if result.returncode == 0:
+        print(f'   [OK] Pulled remote changes', flush=True)
+        return True
+    print(f'   [ERROR] Pull failed: {result.stderr}', flush=True)
+    subprocess.run(['git', 'merge', '--abort'], capture_output=True)
+    return False
+
 def git_push():
-    """Push to remote repository"""
+    """Push to remote repository (pulling first if another machine pushed in the meantime)"""
     try:
-        result = subprocess.run(
-            ['git', 'push'],
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
+        def push():
+            return subprocess.run(
+                ['git', 'push'],
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+        result = push()
+        if result.returncode != 0 and ('rejected' in result.stderr or 'fetch first' in result.stderr):
+            print(f'   [INFO] Remote has new commits - pulling and retrying', flush=True)
+            if git_pull():
+                result = push()
         if result.returncode == 0:
             print(f'   [OK] Pushed to remote repository', flush=True)
             return True
@@ -99,12 +126,19 @@ def git_push():
         print(f'   [ERROR] Git push error: {e}', flush=True)
         return False
 
+def compact_history():
+    """Move points older than a week into the hourly/daily rollup files (rollup.py)"""
+    try:
+        rollup.compact_all(sources=('viagogo',), teams=False)
+    except Exception as e:
+        print(f'   [WARN] Rollup compaction failed: {e}', flush=True)
+
 def commit_and_push_worldcup_data():
     """Commit and push World Cup data file"""
     print(f'\n[{datetime.now().strftime("%H:%M:%S")}] [ACTION] Committing and pushing World Cup data...', flush=True)
     
     # Files to commit
-    files_to_commit = [PRICES_VIAGOGO_FILE]
+    files_to_commit = [PRICES_VIAGOGO_FILE, HEARTBEAT_FILE, ROLLUP_FILE]
     
     # Check if files exist
     existing_files = []
@@ -200,6 +234,7 @@ def run_cycle():
     print(f'{"="*60}\n', flush=True)
     
     success = run_worldcup_scraper()
+    compact_history()
     
     # Commit and push
     print(f'\n{"="*60}', flush=True)
@@ -221,6 +256,12 @@ def main():
     print(f'[FILES] {PRICES_VIAGOGO_FILE}', flush=True)
     print(f'{"="*60}\n', flush=True)
     
+    # Price files get union-merged on pull instead of conflict markers
+    try:
+        merge_prices.install()
+    except Exception as e:
+        print(f'[WARN] Could not install the price merge driver: {e}', flush=True)
+    
     # Run immediately on start
     run_cycle()
     
@@ -0,0 +1,240 @@
+"""
+Shared Browser Pool
+The scrapers visit one page per job (a match, a club game). Instead of walking the
+list with one Chrome, a pool of worker threads - each driving its own Chrome - pulls
+jobs from a shared queue:
+
+    with BrowserPool(get_driver, workers=3, restart_every=5) as pool:
+        results = pool.map(scrape_match, games, url=lambda game: game['url'])
+
+Politeness is per domain and holds across processes (the team runs overlap, and
+each auto runner starts its scrapers side by side): at most `slots` pages of a
+domain are open at once and page loads start at least `interval` seconds apart.
+Both are coordinated through lock files in POOL_DIR (atomic_io.file_lock), so a
+cycle gets faster with more workers only up to what the site is allowed to see.
+
+A handler raising BrowserCrashed (or an error that looks like a dead browser)
+gets its worker a fresh Chrome; the job is retried up to `attempts` times.
+"""
+import os
+import queue
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlparse
+
+from atomic_io import LockTimeout, POLL_INTERVAL, file_lock
+
+POOL_WORKERS = int(os.environ.get('SCRAPER_WORKERS', 3))  # browsers per scraper process
+POOL_DIR = '.browser_pool'  # slot and rate lock files (gitignored)
+
+# domain: (pages open at once, seconds between page loads) - across all scrapers
+DOMAIN_LIMITS = {
+    'viagogo.com': (3, 2.0),
+    'footballticketnet.com': (3, 2.0),
+}
+DEFAULT_LIMIT = (1, 5.0)
+
+CRASH_KEYWORDS = [
+    'crashed', 'disconnected', 'tab crashed', 'target closed',
+    'chrome not reachable', 'timeout: timed out receiving message',
+    'httpconnectionpool', 'connectionpool', 'max retries exceeded',
+    'connection refused', 'connection aborted', 'broken pipe',
+    'localhost', 'port 6',  # Chrome DevTools Protocol port errors
+]
+
+
+class BrowserCrashed(Exception):
+    """Raised by a handler when its browser is unusable - the worker restarts it"""
+
+
+def is_browser_crash(error):
+    msg = str(error).lower()
+    return isinstance(error, BrowserCrashed) or any(keyword in msg for keyword in CRASH_KEYWORDS)
+
+
+# ---------------------------------------------------------
+# Per-domain politeness
+# ---------------------------------------------------------
+def domain_of(url):
+    host = (urlparse(url).hostname or '').lower()
+    for domain in DOMAIN_LIMITS:
+        if host == domain or host.endswith('.' + domain):
+            return domain
+    return host[4:] if host.startswith('www.') else host
+
+
+def _wait_turn(domain, interval):
+    """Sleep until `interval` has passed since the domain's last page load (any process), then claim it"""
+    stamp = os.path.join(POOL_DIR, f'{domain}.last')
+    with file_lock(stamp):
+        try:
+            with open(stamp, 'r') as f:
+                last = float(f.read() or 0)
+        except (OSError, ValueError):
+            last = 0
+        delay = last + interval - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        with open(stamp, 'w') as f:
+            f.write(repr(time.time()))
+
+
+@contextmanager
+def domain_slot(url):
+    """Hold one of the domain's page slots for the block; entering also waits for its turn"""
+    domain = domain_of(url)
+    slots, interval = DOMAIN_LIMITS.get(domain, DEFAULT_LIMIT)
+    while True:
+        for i in range(slots):
+            stack = ExitStack()
+            try:
+                stack.enter_context(file_lock(os.path.join(POOL_DIR, f'{domain}.slot{i}'), timeout=0))
+            except LockTimeout:
+                continue
+            with stack:
+                _wait_turn(domain, interval)
+                yield
+            return
+        time.sleep(POLL_INTERVAL * 10)
+
+
+# ---------------------------------------------------------
+# Pool
+# ---------------------------------------------------------
+class _Browser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.jobs = 0
+
+
+class BrowserPool:
+    """Worker threads with one Chrome each; browsers are kept between map() calls until close()"""
+
+    def __init__(self, get_driver, workers=POOL_WORKERS, restart_every=None, attempts=1):
+        self.get_driver = get_driver
+        self.workers = max(1, workers)
+        self.restart_every = restart_every  # fresh Chrome after this many jobs (frees memory)
+        self.attempts = attempts
+        self._idle = []
+        self._idle_lock = threading.Lock()
+        self._start_lock = threading.Lock()  # one Chrome starting at a time (uc patches the driver binary)
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._idle_lock:
+            browsers, self._idle = self._idle, []
+        for browser in browsers:
+            self._quit(browser)
+
+    # -------------------------------------------------
+    # Browsers
+    # -------------------------------------------------
+    def _start(self):
+        with self._start_lock:
+            driver = self.get_driver()
+        return _Browser(driver) if driver else None
+
+    def _quit(self, browser):
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        with self._idle_lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._start()
+
+    def _healthy(self, browser):
+        try:
+            browser.driver.current_url
+            return True
+        except Exception as e:
+            print(f'   [WARN] Browser unhealthy, restarting... ({str(e)[:50]})', flush=True)
+            return False
+
+    def _ready(self, browser):
+        """The worker's browser for its next job: restarted when due or dead, started if missing"""
+        if browser is not None and self.restart_every and browser.jobs >= self.restart_every:
+            print(f'   [RESTART] Scheduled browser restart after {browser.jobs} pages', flush=True)
+            self._quit(browser)
+            browser = None
+        if browser is not None and not self._healthy(browser):
+            self._quit(browser)
+            browser = None
+        return browser or self._start()
+
+    # -------------------------------------------------
+    # Jobs
+    # -------------------------------------------------
+    def _run_job(self, browser, handler, job, url):
+        """(browser to keep using, result); result is None when every attempt failed"""
+        for attempt in range(1, self.attempts + 1):
+            browser = self._ready(browser)
+            if browser is None:
+                print('   [ERROR] Could not start a browser - skipping job', flush=True)
+                return None, None
+            browser.jobs += 1
+            try:
+                if url is None:
+                    return browser, handler(browser.driver, job)
+                with domain_slot(url(job)):
+                    return browser, handler(browser.driver, job)
+            except Exception as e:
+                if not is_browser_crash(e):
+                    print(f'   [ERROR] Job failed: {str(e)[:80]}', flush=True)
+                    return browser, None
+                print(f'   [WARN] Browser crashed (attempt {attempt}/{self.attempts}): {str(e)[:80]}', flush=True)
+                self._quit(browser)
+                browser = None
+        return browser, None
+
+    def _work(self, handler, jobs, url, results):
+        browser = self._checkout()
+        try:
+            while not self._stop.is_set():
+                try:
+                    i, job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                browser, results[i] = self._run_job(browser, handler, job, url)
+        finally:
+            if browser is not None:
+                with self._idle_lock:
+                    self._idle.append(browser)
+
+    def map(self, handler, jobs, url=None):
+        """
+        handler(driver, job) for every job, spread over the workers. `url(job)` names
+        the page the job loads, for the per-domain limits. Returns the results in job
+        order (None for failed jobs). Ctrl+C stops handing out jobs and returns what
+        the running ones finish with.
+        """
+        jobs = list(jobs)
+        results = [None] * len(jobs)
+        pending = queue.Queue()
+        for item in enumerate(jobs):
+            pending.put(item)
+        self._stop.clear()
+        threads = [threading.Thread(target=self._work, args=(handler, pending, url, results), daemon=True)
+                   for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            print('\n[WARN] Interrupted - finishing the pages in progress', flush=True)
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        return results
@@ -7,6 +7,11 @@ import './App.css'
 // Use local backend for development, empty for production (same origin)
 const API_URL = import.meta.env.DEV ? 'http://localhost:8000' : ''
 console.log('API_URL:', API_URL, 'DEV mode:', import.meta.env.DEV)
+const MAX_CHART_POINTS = 500
+
+// /stream 'price' events carry the same canonical match_key as /matches, the latest price
+// of every category (prices) and the categories that changed (changed)
+const isSameMatch = (match, evt) => !!match.match_key && match.match_key === evt.match_key
 
 function App() {
   const [view, setView] = useState('original') // 'original' or 'teams'
@@ -15,23 +20,59 @@ function App() {
   const [history, setHistory] = useState(null)
   const [timeRange, setTimeRange] = useState('all')
   const [selectedDate, setSelectedDate] = useState(null)
+  const [overview, setOverview] = useState({})
+
 
+  // Push feed from the server replaces interval polling: refetch only what changed.
+  // Kept in state so the effects (and TeamView) that listen on it re-run once it exists
+  const [stream, setStream] = useState(null)
 
   useEffect(() => {
     fetchMatches()
-    const interval = setInterval(fetchMatches, 120000)
-    return () => clearInterval(interval)
+    fetchOverview()
+    const source = new EventSource(API_URL + '/stream')
+    source.addEventListener('matches', () => fetchMatches())
+    // A scrape cycle lands as a burst of events - refresh the overview once it settles
+    let overviewTimer = null
+    source.addEventListener('price', () => {
+      clearTimeout(overviewTimer)
+      overviewTimer = setTimeout(fetchOverview, 2000)
+    })
+    setStream(source)
+    return () => {
+      clearTimeout(overviewTimer)
+      source.close()
+      setStream(null)
+    }
   }, [])
 
   useEffect(() => {
-    if (selectedMatch) {
-      fetchHistory(selectedMatch.match_url)
-      const historyInterval = setInterval(() => {
+    if (selectedMatch) fetchHistory(selectedMatch.match_url)
+  }, [selectedMatch, timeRange, selectedDate])
+
+  useEffect(() => {
+    if (!selectedMatch || !stream) return
+    const onPrice = (e) => {
+      if (isSameMatch(selectedMatch, JSON.parse(e.data))) {
         fetchHistory(selectedMatch.match_url)
-      }, 120000)
-      return () => clearInterval(historyInterval)
+      }
+    }
+    stream.addEventListener('price', onPrice)
+    return () => stream.removeEventListener('price', onPrice)
+  }, [selectedMatch, timeRange, selectedDate, stream])
+
+  // Let the server trim and downsample - the charts never need more than a few hundred points
+  const historyParams = (url) => {
+    const params = { match_url: url, max_points: MAX_CHART_POINTS }
+    if (selectedDate) {
+      // Naive bounds, like the stored timestamps (scraper local time) - no UTC conversion
+      params.from = `${selectedDate}T00:00:00`
+      params.to = `${selectedDate}T23:59:59.999999`
+    } else if (timeRange !== 'all') {
+      params.range = timeRange
     }
-  }, [selectedMatch])
+    return params
+  }
 
   const fetchMatches = async () => {
     try {
@@ -49,11 +90,33 @@ function App() {
     }
   }
 
+  const fetchOverview = async () => {
+    try {
+      const res = await axios.get(API_URL + '/overview')
+      const byKey = {}
+      res.data.forEach(m => { byKey[m.match_key] = m })
+      setOverview(byKey)
+    } catch (err) {
+      console.error('Error fetching overview:', err)
+    }
+  }
+
+  // Cheapest current price for a match across both sources and all categories
+  const lowestPrice = (match) => {
+    const entry = overview[match.match_key]
+    if (!entry) return null
+    const prices = ['viagogo', 'ftn']
+      .flatMap(src => Object.values(entry[src] || {}))
+      .map(c => c.price)
+      .filter(p => typeof p === 'number')
+    return prices.length ? Math.min(...prices) : null
+  }
+
   const fetchHistory = async (url) => {
     try {
       const apiUrl = API_URL + '/history'
       console.log('Fetching history from:', apiUrl, 'for match:', url)
-      const res = await axios.get(apiUrl, { params: { match_url: url } })
+      const res = await axios.get(apiUrl, { params: historyParams(url) })
       console.log('History received:', res.data)
       setHistory(res.data)
     } catch (err) { 
@@ -69,9 +132,8 @@ function App() {
     
     if (selectedDate) {
       // Jump to specific date - show data for that day
-      const selected = new Date(selectedDate)
-      selected.setHours(0, 0, 0, 0)
-      const dayStart = selected.getTime()
+      // Parsed as local time, the same way the naive point timestamps are below
+      const dayStart = new Date(`${selectedDate}T00:00:00`).getTime()
       const dayEnd = dayStart + 24 * 3600 * 1000
       cutoff = dayStart
       // Filter to only show data within the selected day
@@ -187,7 +249,7 @@ function App() {
             ← Back to Original View
           </button>
         </div>
-        <TeamView />
+        <TeamView stream={stream} />
       </div>
     )
   }
@@ -221,6 +283,11 @@ function App() {
               onClick={() => setSelectedMatch(m)}
             >
               <div className='match-name'>{m.match_name}</div>
+              {lowestPrice(m) !== null && (
+                <div className='match-price' style={{ fontSize: '0.8rem', color: '#8b949e' }}>
+                  from {formatPrice(lowestPrice(m))}
+                </div>
+              )}
             </div>
           ))}
         </div>
@@ -238,7 +305,7 @@ function App() {
             <div className='header'>
               <h1>{selectedMatch.match_name}</h1>
               <div style={{ display: 'flex', gap: '10px', alignItems: 'center', flexWrap: 'wrap' }}>
-                <span className='last-updated'>Auto-refresh: 10m</span>
+                <span className='last-updated'>Live updates</span>
                 <div className='time-filters' style={{ display: 'flex', gap: '5px', alignItems: 'center' }}>
                   {['24h', '7d', 'all'].map(r => (
                     <button
@@ -5,7 +5,8 @@ import './App.css'
 
 const API_URL = import.meta.env.DEV ? 'http://localhost:8000' : ''
 
-function TeamView() {
+// stream: App's /stream EventSource - one connection per dashboard, shared by both views
+function TeamView({ stream }) {
   const [teams, setTeams] = useState([])
   const [selectedTeam, setSelectedTeam] = useState(null)
   const [games, setGames] = useState([])
@@ -31,6 +32,19 @@ function TeamView() {
     }
   }, [selectedTeam, selectedGame])
 
+  // Refetch when the server pushes a new snapshot for this game (re-subscribes if App's stream is replaced)
+  useEffect(() => {
+    if (!stream || !selectedTeam || selectedGame === null) return
+    const onTeam = (e) => {
+      const evt = JSON.parse(e.data)
+      if (evt.team_key === selectedTeam.key && evt.game_index === selectedGame) {
+        fetchGamePrices(selectedTeam.key, selectedGame)
+      }
+    }
+    stream.addEventListener('team', onTeam)
+    return () => stream.removeEventListener('team', onTeam)
+  }, [selectedTeam, selectedGame, stream])
+
   const fetchTeams = async () => {
     try {
       console.log('Fetching teams from:', `${API_URL}/teams`)
@@ -1,9 +1,10 @@
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 import time
-import json
 import re
 
+from atomic_io import write_json
+
 BASE_URL = 'https://www.footballticketnet.com'
 OUTPUT_FILE = 'all_games_ftn_to_scrape.json'
 PAGES_TO_SCRAPE = 5
@@ -53,8 +54,7 @@ def get_all_match_urls():
             time.sleep(2)
 
         print(f'\n✨ Total unique matches found: {len(all_game_links)}')
-        with open(OUTPUT_FILE, 'w') as f:
-            json.dump(all_game_links, f, indent=2)
+        write_json(OUTPUT_FILE, all_game_links, indent=2)
         print(f'💾 Saved to {OUTPUT_FILE}')
 
     except Exception as e:
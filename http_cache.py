@@ -0,0 +1,81 @@
+"""
+Conditional GET helpers for the API server
+ETags are derived from the (mtime, size) version of the data files a response is
+built from, so a poll between scraper cycles costs a header comparison instead of
+a JSON parse + serialization.
+"""
+import hashlib
+import inspect
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import Response
+
+from json_response import choose_encoding, encoded_json_response
+from price_store import file_signature
+
+
+def data_version(paths):
+    """Version of a set of files: their signatures plus the newest mtime (epoch seconds)"""
+    signatures = [file_signature(p) for p in paths]
+    mtimes = [s[0] / 1e9 for s in signatures if s]
+    return signatures, (max(mtimes) if mtimes else None)
+
+
+def make_etag(request, signatures, extra=None):
+    """Strong ETag: request path + query + data file versions"""
+    h = hashlib.sha1()
+    h.update(request.url.path.encode('utf-8'))
+    h.update(b'?')
+    h.update(str(request.url.query).encode('utf-8'))
+    h.update(repr(signatures).encode('utf-8'))
+    if extra is not None:
+        h.update(repr(extra).encode('utf-8'))
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [t.strip() for t in if_none_match.split(',')]
+    # If-None-Match uses weak comparison
+    return any((t[2:] if t.startswith('W/') else t) == etag for t in candidates)
+
+
+def not_modified_since(if_modified_since, last_modified):
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have 1s resolution
+    return int(last_modified) <= since
+
+
+async def conditional_json(request, paths, build, extra=None):
+    """
+    Answer 304 if the client's copy is still current, otherwise build() the body
+    (build may be a coroutine function, e.g. one that awaits a CachedFile).
+    `extra` folds anything besides the files that the body depends on into the ETag;
+    Last-Modified cannot express it, so If-Modified-Since is only honoured without it.
+    """
+    signatures, last_modified = data_version(paths)
+    # Each content-coding is its own representation, so it gets its own strong ETag
+    encoding = choose_encoding(request.headers.get('accept-encoding'))
+    etag = make_etag(request, signatures, (extra, encoding))
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    if last_modified is not None:
+        headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get('if-none-match')
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None and extra is None and not_modified_since(request.headers.get('if-modified-since'), last_modified)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    body = build()
+    if inspect.isawaitable(body):
+        body = await body
+    return encoded_json_response(body, encoding, headers=headers)
@@ -0,0 +1,190 @@
+"""
+Streaming Reader for the JSON Data Files
+prices.json / prices_ftn.json are one big array and ftn_teams_data.json one big
+object; json.load has to build all of it before the first record can be used.
+This reader walks the top level of such a file and hands out one member at a time,
+so a tool's memory stays at one record (plus a read buffer) whatever the file size:
+
+    for record in iter_array('prices.json'):             # [ {...}, {...}, ... ]
+        ...
+    for team_key, team_data in iter_object('ftn_teams_data.json'):   # { "k": {...}, ... }
+        ...
+    for event, value in iter_events(path):   # ('start_array'|'start_map', None), ('item', v),
+        ...                                  # ('key', k), ('value', v), ('end', None)
+
+Each member is decoded by the C json decoder (raw_decode) straight from the buffer.
+
+Usage:
+    python json_stream.py bench [paths...]     # compare with json.load
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+CHUNK_SIZE = 1 << 16  # characters read at a time; a member larger than this grows the buffer
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+
+class _Buffer:
+    """Text of a file read chunk by chunk; `pos` moves forward, consumed text is dropped"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read one more chunk; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), '' at end of file"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise ValueError(f'Expected one of {chars!r} at offset {self.pos}, got {char or "end of file"!r}')
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the JSON value at the current position"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # A number cut off by the chunk boundary still parses - make sure it ended
+                if self.eof or (end < len(self.text) and self.text[end] not in _NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_events(path, chunk_size=CHUNK_SIZE):
+    """
+    Top-level events of a JSON file: ('start_array', None), then ('item', value) per
+    element; or ('start_map', None), then ('key', name) and ('value', value) per
+    member; ('end', None) last. A scalar document is a single ('value', value).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = _Buffer(f, chunk_size)
+        first = buf.peek()
+        if first not in ('[', '{'):
+            yield 'value', buf.value()
+            return
+        buf.pos += 1
+        closing = ']' if first == '[' else '}'
+        yield ('start_array' if first == '[' else 'start_map'), None
+        if buf.peek() == closing:
+            buf.pos += 1
+        else:
+            while True:
+                if first == '[':
+                    yield 'item', buf.value()
+                else:
+                    if buf.peek() != '"':
+                        buf.expect('"')
+                    yield 'key', buf.value()
+                    buf.expect(':')
+                    yield 'value', buf.value()
+                if buf.expect(',' + closing) == closing:
+                    break
+        yield 'end', None
+        if buf.peek() != '':
+            raise ValueError(f'Extra data after the top-level value in {path}')
+
+
+def iter_array(path, chunk_size=CHUNK_SIZE):
+    """Elements of a file holding one JSON array"""
+    for event, value in iter_events(path, chunk_size):
+        if event == 'start_map' or (event == 'value' and not isinstance(value, list)):
+            raise ValueError(f'{path} does not hold a JSON array')
+        if event == 'item':
+            yield value
+
+
+def iter_object(path, chunk_size=CHUNK_SIZE):
+    """(key, value) members of a file holding one JSON object"""
+    key = None
+    for event, value in iter_events(path, chunk_size):
+        if event == 'start_array' or (event == 'value' and key is None):
+            raise ValueError(f'{path} does not hold a JSON object')
+        if event == 'key':
+            key = value
+        elif event == 'value':
+            yield key, value
+
+
+def top_level_type(path):
+    """'array', 'object' or None (missing, empty or scalar file)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        first = _Buffer(f, 64).peek()
+    return {'[': 'array', '{': 'object'}.get(first)
+
+
+# ---------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------
+def _measure(fn):
+    """(result, seconds, peak bytes) - timed untraced, then run again under tracemalloc"""
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def bench(paths):
+    for path in paths:
+        kind = top_level_type(path)
+        if kind is None:
+            print(f'[WARN] {path}: not a JSON array or object - skipped')
+            continue
+        stream = iter_array if kind == 'array' else iter_object
+
+        def load():
+            with open(path, 'r', encoding='utf-8') as f:
+                return len(json.load(f))
+
+        results = {'json.load': _measure(load), 'stream': _measure(lambda: sum(1 for _ in stream(path)))}
+        size = os.path.getsize(path)
+        for name, (count, elapsed, peak) in results.items():
+            print(f'[INFO] {path} ({size / 1e6:.1f} MB, {count} {kind} members) {name:9}: '
+                  f'{elapsed * 1000:7.1f} ms, peak {peak / 1e6:6.1f} MB')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        bench(sys.argv[2:] or ['prices.json', 'prices_ftn.json', 'ftn_teams_data.json'])
+    else:
+        print(__doc__)
@@ -0,0 +1,123 @@
+"""
+Canonical Match Registry
+One stable match key per World Cup match, built once from all_games_to_scrape.json
+(Viagogo) and all_games_ftn_to_scrape.json (FootballTicketNet).
+
+Every Viagogo event id (E-153033506), FTN URL slug (match-1-mexico-vs-south-africa)
+and match number maps to the same key ('match-79'), so the scrapers can stamp it on
+each record and the server can look a match up with a single dict hit.
+"""
+import json
+import os
+import re
+
+VIAGOGO_GAMES_FILE = 'all_games_to_scrape.json'
+FTN_GAMES_FILE = 'all_games_ftn_to_scrape.json'
+
+EVENT_ID_RE = re.compile(r'/(E-\d+)')
+MATCH_NUMBER_RE = re.compile(r'Match (\d+)', re.IGNORECASE)
+FTN_SLUG_MATCH_RE = re.compile(r'^match-(\d+)\b')
+
+
+def match_key_for_number(number):
+    return f'match-{int(number)}'
+
+
+def clean_url(url):
+    return (url or '').split('?')[0].split('&')[0]
+
+
+def ftn_slug(url):
+    """https://www.footballticketnet.com/world-cup-2026/match-1-mexico-vs-south-africa -> match-1-mexico-vs-south-africa"""
+    path = clean_url(url).rstrip('/')
+    return path.rsplit('/', 1)[-1] if 'footballticketnet.com' in path else None
+
+
+def _load_list(path):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        print(f'[ERROR] Failed to load {path}: {e}')
+        return []
+
+
+class MatchRegistry:
+    def __init__(self, viagogo_games=(), ftn_games=()):
+        self.matches = {}       # match_key -> {'match_number', 'match_name', 'viagogo_url', 'ftn_url'}
+        self.by_event_id = {}
+        self.by_ftn_slug = {}
+        self.by_url = {}
+
+        for game in viagogo_games:
+            key = self._register(game.get('match_name'), game.get('url'), 'viagogo_url')
+            event_id = self._event_id(game.get('url'))
+            if key and event_id:
+                self.by_event_id[event_id] = key
+
+        for game in ftn_games:
+            key = self._register(game.get('match_name'), game.get('url'), 'ftn_url')
+            slug = ftn_slug(game.get('url'))
+            if key and slug:
+                self.by_ftn_slug[slug] = key
+
+    @classmethod
+    def load(cls, viagogo_path=VIAGOGO_GAMES_FILE, ftn_path=FTN_GAMES_FILE):
+        return cls(_load_list(viagogo_path), _load_list(ftn_path))
+
+    @staticmethod
+    def _event_id(url):
+        m = EVENT_ID_RE.search(url or '')
+        return m.group(1) if m else None
+
+    def _register(self, match_name, url, url_field):
+        m = MATCH_NUMBER_RE.search(match_name or '')
+        if not m:
+            return None
+        key = match_key_for_number(m.group(1))
+        entry = self.matches.setdefault(key, {'match_number': int(m.group(1)), 'match_name': match_name})
+        entry[url_field] = clean_url(url)
+        if url_field == 'viagogo_url':
+            # Viagogo names ("1A vs 3C/E/F/H/I (Match 79)") are what the dashboard shows
+            entry['match_name'] = match_name
+        self.by_url[clean_url(url)] = key
+        return key
+
+    def resolve(self, url=None, match_name=None):
+        """Match key for a URL and/or name, or None if it isn't a known match"""
+        if url:
+            key = self.by_url.get(clean_url(url))
+            if key:
+                return key
+            event_id = self._event_id(url)
+            if event_id and event_id in self.by_event_id:
+                return self.by_event_id[event_id]
+            slug = ftn_slug(url)
+            if slug:
+                if slug in self.by_ftn_slug:
+                    return self.by_ftn_slug[slug]
+                m = FTN_SLUG_MATCH_RE.match(slug)
+                if m:
+                    return match_key_for_number(m.group(1))
+        for text in (url, match_name):
+            m = MATCH_NUMBER_RE.search(text or '')
+            if m:
+                return match_key_for_number(m.group(1))
+        return None
+
+    def record_key(self, record):
+        """Stored match_key if the writer stamped one, else resolved from URL/name (older rows)"""
+        return record.get('match_key') or self.resolve(record.get('match_url'), record.get('match_name'))
+
+
+def stamp_match_keys(records, registry=None):
+    """Set match_key on every record (in place) - called by the scrapers before saving"""
+    registry = registry or MatchRegistry.load()
+    for record in records:
+        key = registry.resolve(record.get('match_url'), record.get('match_name'))
+        if key:
+            record['match_key'] = key
+    return records
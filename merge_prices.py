@@ -0,0 +1,284 @@
+"""
+Git Merge Driver for the Price Data
+Price logs only ever grow, so two branches that both scraped are merged as the
+sorted union of their observations instead of leaving conflict markers:
+
+    prices*.ndjson, teams/*/games/*.ndjson   stream-merged by timestamp, deduplicated on
+                                             (source, match, category, block, timestamp)
+    *.rollup.ndjson                          buckets folded per series and bucket (rollup.py)
+    *.ndjson.heartbeat.json                  per series: newest change row, latest last_seen
+    teams/*/manifest.json                    per game: the more recently scraped entry
+
+Logs are read as streams - already time-ordered files (the normal case) are merged
+in one linear pass; out-of-order ones are first sorted externally in CHUNK_ROWS
+runs, so memory stays bounded either way. No observation is ever dropped.
+
+Setup (once per clone - .gitattributes maps the files, the driver lives in .git/config):
+    python merge_prices.py install
+
+Git then runs:
+    python merge_prices.py %O %A %B %P
+
+Files that already contain conflict markers are recovered with:
+    python merge_prices.py repair [paths...]
+"""
+import glob
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from atomic_io import file_lock, write_json
+from price_log import iter_records, write_log
+from rollup import merge_rollups
+
+DRIVER_NAME = 'prices'
+DATA_PATTERNS = ['prices*.ndjson', '*.ndjson.heartbeat.json', 'teams/*/manifest.json', 'teams/*/games/*.ndjson']
+CHUNK_ROWS = 50000  # rows held in memory per external-sort run
+
+
+def _timestamp(record):
+    return record.get('timestamp') or ''
+
+
+def observation_key(record):
+    return (record.get('source'), record.get('match_key') or record.get('match_url'),
+            record.get('category'), record.get('block'), _timestamp(record))
+
+
+def file_kind(path):
+    name = path.replace('\\', '/')
+    if name.endswith('.heartbeat.json'):
+        return 'heartbeat'
+    if name.endswith('/manifest.json') or name == 'manifest.json':
+        return 'manifest'
+    if name.endswith('.rollup.ndjson'):
+        return 'rollup'
+    if name.endswith('.ndjson'):
+        return 'log'
+    return None
+
+
+# ---------------------------------------------------------
+# Logs
+# ---------------------------------------------------------
+def _is_sorted(path):
+    last = ''
+    for record in iter_records(path):
+        timestamp = _timestamp(record)
+        if timestamp < last:
+            return False
+        last = timestamp
+    return True
+
+
+def _sorted_records(path, tmp_dir):
+    """A log's records in timestamp order: as stored if already sorted, else via sorted runs on disk"""
+    if _is_sorted(path):
+        return iter_records(path)
+    print(f'[INFO] {path} is out of order - sorting in runs of {CHUNK_ROWS}')
+    runs = []
+    chunk = []
+    for record in iter_records(path):
+        chunk.append(record)
+        if len(chunk) >= CHUNK_ROWS:
+            runs.append(_spill(chunk, tmp_dir))
+            chunk = []
+    if chunk:
+        runs.append(_spill(chunk, tmp_dir))
+    return heapq.merge(*(iter_records(run) for run in runs), key=_timestamp)
+
+
+def _spill(chunk, tmp_dir):
+    chunk.sort(key=_timestamp)
+    fd, path = tempfile.mkstemp(suffix='.ndjson', dir=tmp_dir)
+    os.close(fd)
+    write_log(path, chunk)
+    return path
+
+
+def _dedupe(records):
+    """Drop repeats - duplicates share a timestamp, so only one timestamp's keys are held"""
+    group, seen = None, set()
+    for record in records:
+        timestamp = _timestamp(record)
+        if timestamp != group:
+            group, seen = timestamp, set()
+        key = observation_key(record)
+        if key not in seen:
+            seen.add(key)
+            yield record
+
+
+def _replace_with(out, write):
+    """Build the result in a scratch directory next to `out` and rename it over `out`"""
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out)), prefix='.merge-') as tmp_dir:
+        result = os.path.join(tmp_dir, 'merged')
+        value = write(result)
+        os.replace(result, out)
+    return value
+
+
+def merge_logs(ours, theirs, out):
+    """Sorted, deduplicated union of two logs written to `out`"""
+    def write(result):
+        tmp_dir = os.path.dirname(result)
+        merged = heapq.merge(_sorted_records(ours, tmp_dir), _sorted_records(theirs, tmp_dir), key=_timestamp)
+        return write_log(result, _dedupe(merged))
+    return _replace_with(out, write)
+
+
+# ---------------------------------------------------------
+# JSON sidecars
+# ---------------------------------------------------------
+def _load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except Exception as e:
+        print(f'[WARN] Unreadable {path}: {e}')
+        return None
+
+
+def merge_heartbeats(ours, theirs):
+    series = dict(ours.get('series', {}))
+    for key, entry in theirs.get('series', {}).items():
+        mine = series.get(key)
+        if mine is None:
+            series[key] = entry
+            continue
+        newer = entry if _timestamp(entry['record']) > _timestamp(mine['record']) else mine
+        series[key] = {'record': newer['record'], 'last_seen': max(mine['last_seen'], entry['last_seen'])}
+    last_runs = [r for r in (ours.get('last_run'), theirs.get('last_run')) if r]
+    return {'last_run': max(last_runs) if last_runs else None, 'series': series}
+
+
+def merge_manifests(ours, theirs):
+    games = {g['id']: g for g in ours.get('games', [])}
+    order = [g['id'] for g in ours.get('games', [])]
+    for game in theirs.get('games', []):
+        mine = games.get(game['id'])
+        if mine is None:
+            games[game['id']] = game
+            order.append(game['id'])
+            continue
+        newer, older = (game, mine) if (game.get('last_scraped') or '') > (mine.get('last_scraped') or '') else (mine, game)
+        firsts = [t for t in (newer.get('first_timestamp'), older.get('first_timestamp')) if t]
+        merged = dict(newer)
+        # Both sides' rows end up in the shard; the count is a lower bound until the next run
+        merged['price_history_count'] = max(newer.get('price_history_count', 0), older.get('price_history_count', 0))
+        merged['first_timestamp'] = min(firsts) if firsts else None
+        games[game['id']] = merged
+    updated = [u for u in (ours.get('last_updated'), theirs.get('last_updated')) if u]
+    return {**theirs, **ours, 'last_updated': max(updated) if updated else None, 'games': [games[i] for i in order]}
+
+
+# ---------------------------------------------------------
+# Entry points
+# ---------------------------------------------------------
+def merge_files(ours, theirs, path, out=None):
+    """Merge `theirs` into `ours` (or into `out`) by the kind of data file `path` is"""
+    out = out or ours
+    kind = file_kind(path)
+    if kind == 'log':
+        count = merge_logs(ours, theirs, out)
+        print(f'[OK] Merged {path}: {count} rows')
+        return True
+    if kind == 'rollup':
+        rows = merge_rollups(ours, theirs, path)
+        _replace_with(out, lambda result: write_log(result, rows))
+        print(f'[OK] Merged {path}: {len(rows)} buckets')
+        return True
+    if kind in ('heartbeat', 'manifest'):
+        mine, other = _load_json(ours), _load_json(theirs)
+        if mine is None or other is None:
+            merged = mine or other
+            if merged is None:
+                return False
+        else:
+            merged = merge_heartbeats(mine, other) if kind == 'heartbeat' else merge_manifests(mine, other)
+        if kind == 'heartbeat':
+            _replace_with(out, lambda result: write_json(result, merged, ensure_ascii=False, separators=(',', ':')))
+        else:
+            _replace_with(out, lambda result: write_json(result, merged, indent=2))
+        print(f'[OK] Merged {path}')
+        return True
+    print(f'[ERROR] No merge rule for {path}')
+    return False
+
+
+def split_conflicts(path, ours_path, theirs_path):
+    """Rebuild both sides of a file with conflict markers (diff3 base sections dropped)"""
+    found = False
+    side = None
+    with open(path, 'r', encoding='utf-8') as f, \
+            open(ours_path, 'w', encoding='utf-8') as ours, open(theirs_path, 'w', encoding='utf-8') as theirs:
+        for line in f:
+            if line.startswith('<<<<<<<') and side is None:
+                side, found = 'ours', True
+            elif line.startswith('|||||||') and side == 'ours':
+                side = 'base'
+            elif line.startswith('=======') and side in ('ours', 'base'):
+                side = 'theirs'
+            elif line.startswith('>>>>>>>') and side == 'theirs':
+                side = None
+            else:
+                if side in (None, 'ours'):
+                    ours.write(line)
+                if side in (None, 'theirs'):
+                    theirs.write(line)
+    return found
+
+
+def repair(path):
+    """Resolve leftover conflict markers in a data file by merging its two sides"""
+    if file_kind(path) is None:
+        print(f'[WARN] {path}: not a price data file - skipped')
+        return False
+    with file_lock(path), tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path)),
+                                                      prefix='.repair-') as tmp_dir:
+        ours, theirs = os.path.join(tmp_dir, 'ours'), os.path.join(tmp_dir, 'theirs')
+        if not split_conflicts(path, ours, theirs):
+            return False
+        return merge_files(ours, theirs, path, out=path)
+
+
+def data_files():
+    return sorted({p for pattern in DATA_PATTERNS for p in glob.glob(pattern)})
+
+
+def install():
+    """Register the driver in this clone's .git/config (.gitattributes is committed)"""
+    # Git runs drivers from the top of the work tree
+    python = sys.executable.replace('\\', '/')
+    command = f'"{python}" merge_prices.py %O %A %B %P'
+    for key, value in (('name', 'Union merge of price data'), ('driver', command)):
+        subprocess.run(['git', 'config', f'merge.{DRIVER_NAME}.{key}', value], check=True)
+    print(f'[OK] Merge driver "{DRIVER_NAME}" installed: {command}')
+
+
+def main(argv):
+    if argv and argv[0] == 'install':
+        install()
+    elif argv and argv[0] == 'repair':
+        repaired = sum(1 for path in (argv[1:] or data_files()) if repair(path))
+        print(f'[OK] Repaired {repaired} file(s)')
+    elif len(argv) == 4:
+        # Git driver: %O (ancestor) %A (ours, receives the result) %B (theirs) %P (path).
+        # Logs only grow, so the union of both sides already contains the ancestor.
+        try:
+            return 0 if merge_files(argv[1], argv[2], argv[3]) else 1
+        except Exception as e:
+            print(f'[ERROR] Merge of {argv[3]} failed: {e}')
+            return 1
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,124 @@
+"""
+Readiness-based Page Waits
+Instead of sleeping a fixed time after every page load or click, the scrapers poll
+the page until it is ready for extraction, as described by a per-site profile:
+
+    wait_ready(driver, 'viagogo_event')        # after driver.get(...)
+
+    before = page_state(driver, 'ftn_filter')  # after a click: wait for the page to react
+    button.click()
+    wait_ready(driver, 'ftn_filter', baseline=before)
+
+A page is ready when
+    - content: at least `min` matches of `pattern` are in the page text and they
+      have not changed for `stable` seconds (prices present, listing settled), or
+    - network quiet: the document is complete and no request has finished for
+      `idle` seconds (a page that simply has no prices),
+and never waited on for longer than `timeout` seconds. With a baseline taken before
+a click, the pre-click page does not count: the matches must differ from the
+baseline's, or requests must have finished since it (and then gone quiet).
+Every wait is logged with the time actually spent; summary() prints the totals
+per profile at the end of a run.
+"""
+import threading
+import time
+
+from browser_pool import is_browser_crash
+
+POLL_INTERVAL = 0.25
+
+# pattern: JavaScript regex (case-insensitive) counted in document.body.innerText
+PROFILES = {
+    # Match page: category prices in USD
+    'viagogo_event': {'pattern': r'(?:\$|USD)\s*[\d,]{2,}', 'min': 1, 'stable': 1.0, 'idle': 3.0, 'timeout': 12},
+    # Match / club game page: EUR, USD or GBP prices next to the categories
+    'ftn_event': {'pattern': r'[€$£]\s*[\d,]+', 'min': 1, 'stable': 1.0, 'idle': 3.0, 'timeout': 12},
+    # Ticket list after the "Up To 2 Seats Together" filter: give the re-render a little longer to settle
+    'ftn_filter': {'pattern': r'[€$£]\s*[\d,]+', 'min': 1, 'stable': 1.5, 'idle': 3.0, 'timeout': 8},
+    # Team home-games list
+    'ftn_team_games': {'pattern': r'view tickets|buy tickets', 'min': 1, 'stable': 1.5, 'idle': 3.0, 'timeout': 15},
+}
+
+# One round trip per poll: [pattern matches, ms since the last request finished, readyState,
+# requests finished so far, hash of the matched text]
+_PROBE_JS = '''
+if (!window.__pageWaitBuffer) {
+    performance.setResourceTimingBufferSize(10000);
+    window.__pageWaitBuffer = true;
+}
+var entries = performance.getEntriesByType('resource');
+var last = 0;
+for (var i = 0; i < entries.length; i++) last = Math.max(last, entries[i].responseEnd);
+var text = document.body ? document.body.innerText : '';
+var matches = text.match(new RegExp(arguments[0], 'gi')) || [];
+var joined = matches.join('|'), hash = 0;
+for (var j = 0; j < joined.length; j++) hash = (hash * 31 + joined.charCodeAt(j)) | 0;
+return [matches.length, performance.now() - last, document.readyState, entries.length, hash];
+'''
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _probe(driver, pattern):
+    try:
+        return driver.execute_script(_PROBE_JS, pattern)
+    except Exception as e:
+        if is_browser_crash(e):
+            raise
+        return None  # mid-navigation (document unloaded etc.) - not ready yet
+
+
+def page_state(driver, profile):
+    """The page as PROFILES[profile] sees it now - pass as wait_ready(baseline=...) after a click"""
+    return _probe(driver, PROFILES[profile]['pattern'])
+
+
+def wait_ready(driver, profile, label=None, baseline=None):
+    """
+    Block until the current page is ready according to PROFILES[profile]; returns the
+    seconds waited. With a baseline (page_state() before a click) it must also have
+    changed since then.
+    """
+    p = PROFILES[profile]
+    start = time.monotonic()
+    last_count, last_content, since = None, None, start
+    reason = 'timeout'
+    while True:
+        now = time.monotonic()
+        state = _probe(driver, p['pattern'])
+        if state is not None:
+            count, idle_ms, ready_state, finished, content = state
+            if (count, content) != last_content:
+                last_count, last_content, since = count, (count, content), now
+            changed = baseline is None or (count, content) != (baseline[0], baseline[4])
+            # Differs from the baseline: requests have finished since it was taken, or the
+            # resource buffer was reset by a navigation
+            requested = baseline is None or finished != baseline[3]
+            if count >= p['min'] and changed and now - since >= p['stable']:
+                reason = 'content'
+                break
+            if ready_state == 'complete' and requested and idle_ms >= p['idle'] * 1000:
+                reason = 'network quiet'
+                break
+        if now - start >= p['timeout']:
+            break
+        time.sleep(POLL_INTERVAL)
+    elapsed = time.monotonic() - start
+    with _stats_lock:
+        entry = _stats.setdefault(profile, {'pages': 0, 'seconds': 0.0, 'max': 0.0, 'timeouts': 0})
+        entry['pages'] += 1
+        entry['seconds'] += elapsed
+        entry['max'] = max(entry['max'], elapsed)
+        entry['timeouts'] += reason == 'timeout'
+    print(f'      ⏱️ {label or profile}: ready after {elapsed:.1f}s ({reason}, {last_count or 0} matches)', flush=True)
+    return elapsed
+
+
+def summary():
+    """Print the wait totals of this process per profile"""
+    with _stats_lock:
+        for profile, entry in sorted(_stats.items()):
+            print(f'[INFO] Page waits {profile}: {entry["pages"]} pages, '
+                  f'avg {entry["seconds"] / entry["pages"]:.1f}s, max {entry["max"]:.1f}s, '
+                  f'{entry["timeouts"]} timeouts', flush=True)
@@ -0,0 +1,285 @@
+"""
+SQLite Price Store (WAL)
+Every scraped price is one row in `observations`. The database runs in WAL mode,
+so a scraper committing a run never blocks the API server reading history, and
+per-match queries are answered from a covering index instead of a file scan.
+
+The NDJSON logs (price_log.py) stay the files that get committed and deployed;
+prices.db is the local indexed copy of their raw rows (rolled-up buckets stay in the
+*.rollup.ndjson files, see rollup.py). Each source's rows count as a copy of its log
+only while `imports` holds the log's current file signature: a full import sets it,
+a scraper run that adds exactly the rows it appended moves it along, and anything
+else that touches the log (a merge, a hand edit) leaves it stale until the next
+import. Readers check synced() before using the table. Backfill or rebuild it with:
+
+    python price_db.py import
+    python price_db.py stats
+"""
+import sqlite3
+import sys
+import threading
+
+from match_registry import MatchRegistry
+from price_store import file_signature
+from team_store import TeamStore
+from price_log import (
+    read_records, current_path,
+    VIAGOGO_LOG_FILE, VIAGOGO_LEGACY_FILE, FTN_LOG_FILE, FTN_LEGACY_FILE,
+)
+
+DB_FILE = 'prices.db'
+BUSY_TIMEOUT = 30  # seconds a writer waits for another writer's commit
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS observations (
+    id          INTEGER PRIMARY KEY,
+    source      TEXT NOT NULL,      -- viagogo / ftn / ftn_team
+    match_key   TEXT,               -- canonical key (match_registry.py); NULL for club games
+    team_key    TEXT,               -- club games (scraper_ftn_teams.py)
+    match_url   TEXT,
+    match_name  TEXT,
+    category    TEXT,
+    block       TEXT,
+    price       REAL,
+    currency    TEXT,
+    timestamp   TEXT NOT NULL       -- naive local ISO, as the scrapers write it
+);
+-- Covering: per-match / per-category history never touches the table itself
+CREATE INDEX IF NOT EXISTS obs_match_category_ts
+    ON observations (match_key, category, timestamp, source, price);
+CREATE INDEX IF NOT EXISTS obs_source_match_ts
+    ON observations (source, match_key, timestamp, category, price);
+CREATE INDEX IF NOT EXISTS obs_team_game_ts
+    ON observations (team_key, match_url, timestamp);
+-- Log each source's rows were last brought in line with, and its file signature then
+CREATE TABLE IF NOT EXISTS imports (
+    source      TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    signature   TEXT NOT NULL
+);
+'''
+
+INSERT_SQL = '''
+INSERT INTO observations (source, match_key, team_key, match_url, match_name, category, block, price, currency, timestamp)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _signature(path):
+    signature = file_signature(path)
+    return f'{signature[0]}:{signature[1]}' if signature else None
+
+
+def connect(path=DB_FILE):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    # WAL + NORMAL: a commit survives a process crash; only an OS crash can drop the last one
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class PriceDB:
+    """Thread-safe handle: one connection per thread, opened lazily"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def insert(self, rows):
+        """rows: tuples in INSERT_SQL column order; one transaction"""
+        conn = self.conn()
+        with conn:
+            conn.executemany(INSERT_SQL, rows)
+        return len(rows)
+
+    def record_prices(self, source, records):
+        """Flat scraper records ({match_url, match_name, category, price, currency, timestamp, match_key})"""
+        return self.insert(price_rows(source, records))
+
+    def record_log(self, source, path, records, was_synced, registry=None):
+        """
+        After `records` were appended to the source's log: if the table held the log as it
+        was before the append (was_synced, from synced() taken then), add them and move the
+        marker; otherwise re-import the whole log so the table catches up
+        """
+        if not was_synced:
+            return import_source(self, source, path, registry or MatchRegistry.load())
+        signature = _signature(path)
+        conn = self.conn()
+        with conn:
+            conn.executemany(INSERT_SQL, price_rows(source, records))
+            self._mark(conn, source, path, signature)
+        return len(records)
+
+    def record_team_prices(self, team_key, game, timestamp, prices, currency='USD'):
+        """One club-game snapshot: prices = {category: {block: price}}"""
+        return self.insert(team_rows(team_key, game, timestamp, prices, currency))
+
+    def replace(self, source, rows, path=None, signature=None):
+        """
+        Swap all of a source's rows in one transaction - readers see the old set or the new one.
+        With `path`, the rows are a full copy of that log as of `signature`
+        """
+        conn = self.conn()
+        with conn:
+            conn.execute('DELETE FROM observations WHERE source = ?', (source,))
+            conn.executemany(INSERT_SQL, rows)
+            if path is not None:
+                self._mark(conn, source, path, signature)
+        return len(rows)
+
+    def clear(self, source):
+        conn = self.conn()
+        with conn:
+            conn.execute('DELETE FROM observations WHERE source = ?', (source,))
+            conn.execute('DELETE FROM imports WHERE source = ?', (source,))
+
+    def _mark(self, conn, source, path, signature):
+        if signature is None:
+            conn.execute('DELETE FROM imports WHERE source = ?', (source,))
+        else:
+            conn.execute('INSERT OR REPLACE INTO imports (source, path, signature) VALUES (?, ?, ?)',
+                         (source, path, signature))
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def for_match(self, source, match_key, since=None):
+        """Rows for a match in timestamp order, optionally only those after `since`"""
+        sql = 'SELECT category, timestamp, price FROM observations WHERE source = ? AND match_key = ?'
+        params = [source, match_key]
+        if since:
+            sql += ' AND timestamp > ?'
+            params.append(since)
+        sql += ' ORDER BY timestamp'
+        return [dict(row) for row in self.conn().execute(sql, params)]
+
+    def category_series(self, match_key, category, source, start=None, end=None):
+        """One category's (timestamp, price) points within [start, end] - a pure index range scan"""
+        sql = 'SELECT timestamp, price FROM observations WHERE match_key = ? AND category = ?'
+        params = [match_key, category]
+        if start:
+            sql += ' AND timestamp >= ?'
+            params.append(start)
+        if end:
+            sql += ' AND timestamp <= ?'
+            params.append(end)
+        sql += ' AND source = ? ORDER BY timestamp'
+        params.append(source)
+        return [dict(row) for row in self.conn().execute(sql, params)]
+
+    def team_game_history(self, team_key, match_url, since=None):
+        sql = 'SELECT category, block, price, timestamp FROM observations WHERE team_key = ? AND match_url = ?'
+        params = [team_key, match_url]
+        if since:
+            sql += ' AND timestamp > ?'
+            params.append(since)
+        sql += ' ORDER BY timestamp'
+        return [dict(row) for row in self.conn().execute(sql, params)]
+
+    def synced(self, source, path):
+        """True if the source's rows are a full copy of `path` as it is on disk now"""
+        try:
+            row = self.conn().execute('SELECT path, signature FROM imports WHERE source = ?', (source,)).fetchone()
+        except sqlite3.Error as e:
+            print(f'[WARN] {self.path}: {e}')
+            return False
+        return row is not None and row['path'] == path and row['signature'] == _signature(path)
+
+    def counts(self):
+        return {row['source']: row['n'] for row in
+                self.conn().execute('SELECT source, COUNT(*) AS n FROM observations GROUP BY source')}
+
+
+def price_rows(source, records):
+    return [
+        (source, r.get('match_key'), None, r.get('match_url'), r.get('match_name'),
+         r.get('category'), r.get('block'), r.get('price'), r.get('currency'), r.get('timestamp'))
+        for r in records if r.get('timestamp')
+    ]
+
+
+def team_rows(team_key, game, timestamp, prices, currency='USD'):
+    return [
+        ('ftn_team', None, team_key, game.get('url'), game.get('match_name'),
+         category, block, price, currency, timestamp)
+        for category, blocks in prices.items()
+        for block, price in blocks.items()
+    ]
+
+
+class PriceDBSource:
+    """One source of a PriceDB with the PriceIndex.for_match() interface used by /history"""
+
+    def __init__(self, db, source):
+        self.db = db
+        self.source = source
+
+    def for_match(self, match_key, since=None):
+        return self.db.for_match(self.source, match_key, since=since)
+
+
+# ---------------------------------------------------------
+# Backfill
+# ---------------------------------------------------------
+def import_source(db, source, path, registry):
+    """Replace a source's rows with the records of its price log"""
+    # Taken first: a write landing during the read leaves the marker stale, not wrong
+    signature = _signature(path)
+    records = read_records(path)
+    for r in records:
+        r['match_key'] = registry.record_key(r)
+    return db.replace(source, price_rows(source, records), path=path, signature=signature)
+
+
+def import_teams(db, store=None):
+    """Replace the club-game rows with the snapshots in the team shards"""
+    store = store or TeamStore()
+    rows = []
+    for team_key in store.team_keys():
+        for game in store.load_manifest(team_key).get('games', []):
+            for snapshot in store.load_history(team_key, game['id']):
+                rows.extend(team_rows(team_key, game, snapshot.get('timestamp'), snapshot.get('prices', {})))
+    return db.replace('ftn_team', rows)
+
+
+def import_all(db, registry=None):
+    """Rebuild the database from the price logs and the team shards"""
+    registry = registry or MatchRegistry.load()
+    for source, log_path, legacy_path in (('viagogo', VIAGOGO_LOG_FILE, VIAGOGO_LEGACY_FILE),
+                                          ('ftn', FTN_LOG_FILE, FTN_LEGACY_FILE)):
+        path = current_path(log_path, legacy_path)
+        print(f'[OK] {source}: imported {import_source(db, source, path, registry)} rows from {path}')
+    print(f'[OK] ftn_team: imported {import_teams(db)} rows from teams/')
+
+
+def main(argv):
+    db = PriceDB(argv[1] if len(argv) > 1 else DB_FILE)
+    if argv and argv[0] == 'import':
+        import_all(db)
+    elif argv and argv[0] == 'stats':
+        for source, n in sorted(db.counts().items()):
+            print(f'[INFO] {source}: {n} rows')
+        for source, log_path, legacy_path in (('viagogo', VIAGOGO_LOG_FILE, VIAGOGO_LEGACY_FILE),
+                                              ('ftn', FTN_LOG_FILE, FTN_LEGACY_FILE)):
+            path = current_path(log_path, legacy_path)
+            print(f'[INFO] {source}: {"in sync with" if db.synced(source, path) else "stale against"} {path}')
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+"""
+Push feed for the /stream SSE endpoint
+One watcher per server process polls the data files' (mtime, size) and, when a
+scraper lands new data, fans out one compact event per changed match to every
+connected dashboard.
+"""
+import asyncio
+import json
+
+from price_store import file_signature
+
+POLL_INTERVAL = 5.0  # seconds between file checks
+QUEUE_SIZE = 500     # per subscriber; a client this far behind just refetches
+
+
+class PriceFeed:
+    def __init__(self, price_stores, team_cache, games_path, interval=POLL_INTERVAL, baselines=None):
+        self.price_stores = price_stores  # {'viagogo': CachedFile, 'ftn': CachedFile}
+        # {'viagogo': callable -> newest timestamp already known (e.g. from a snapshot) or None};
+        # lets the first poll set its cursor without parsing the file
+        self.baselines = baselines or {}
+        self.team_cache = team_cache      # team_store.TeamCache - only the manifests are watched
+        self.games_path = games_path
+        self.interval = interval
+        self.subscribers = set()
+        self._signatures = {}
+        self._cursors = {}
+        self._team_cursors = {}
+        self._primed = set()
+        self._task = None
+
+    # -------------------------------------------------
+    # Subscribers
+    # -------------------------------------------------
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event, data):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                pass
+
+    # -------------------------------------------------
+    # Watcher
+    # -------------------------------------------------
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        # Prime cursors so only data that lands after startup is pushed
+        await asyncio.to_thread(self.poll)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                events = await asyncio.to_thread(self.poll)
+            except Exception as e:
+                print(f'[ERROR] Price feed poll failed: {e}')
+                continue
+            if events:
+                print(f'[STREAM] {len(events)} change event(s) -> {len(self.subscribers)} client(s)')
+            for event, data in events:
+                self.publish(event, data)
+
+    def _changed(self, path):
+        signature = file_signature(path)
+        if signature == self._signatures.get(path, ()):
+            return False
+        self._signatures[path] = signature
+        return True
+
+    def _prime(self, name):
+        """True the first time a watched file is seen - that state is the baseline, not news"""
+        first = name not in self._primed
+        self._primed.add(name)
+        return first
+
+    def _prime_from_baseline(self, source):
+        if source in self._primed or source not in self.baselines:
+            return False
+        timestamp = self.baselines[source]()
+        if timestamp is None:
+            return False
+        self._cursors[source] = timestamp
+        self._primed.add(source)
+        return True
+
+    def poll(self):
+        """Check every watched file once; returns [(event, data), ...] for what changed"""
+        events = []
+        for source, store in self.price_stores.items():
+            if self._changed(store.current_path()) and not self._prime_from_baseline(source):
+                events.extend(self._price_events(source, store.get()))
+        if any([self._changed(path) for path in self.team_cache.manifest_paths()]):
+            events.extend(self._team_events(self.team_cache.manifests()))
+        if self._changed(self.games_path) and not self._prime('games'):
+            events.append(('matches', {}))
+        return events
+
+    def _price_events(self, source, index):
+        first_poll = self._prime(source)
+        start = index.start_after(self._cursors.get(source))
+        if index.timestamps:
+            self._cursors[source] = index.timestamps[-1]
+        if first_poll:
+            return []
+
+        # Matches that got new rows, with the categories that changed
+        changed = {}
+        rows = index.rows
+        for i in range(start, len(rows)):
+            key = index.match_keys[i]
+            if not key:
+                continue
+            entry = changed.setdefault(key, {
+                'source': source,
+                'match_key': key,
+                'match_name': rows.value(i, 'match_name'),
+                'timestamp': '',
+                'prices': {},
+            })
+            entry['prices'][rows.value(i, 'category')] = rows.value(i, 'price')
+            entry['timestamp'] = max(entry['timestamp'], index.timestamps[i])
+        # Full state per match: the latest stored price of every category, not just the changed ones
+        for key, entry in changed.items():
+            latest = {}
+            for row in index.for_match(key):
+                latest[row['category']] = row['price']
+            entry['changed'] = sorted(entry['prices'])
+            entry['prices'] = latest
+        return [('price', entry) for entry in changed.values()]
+
+    def _team_events(self, teams):
+        first_poll = self._prime('teams')
+        events = []
+        for team_key, team_data in (teams if isinstance(teams, dict) else {}).items():
+            for game_index, game in enumerate(team_data.get('games', [])):
+                latest = game.get('last_timestamp')
+                key = (team_key, game_index)
+                if self._team_cursors.get(key) == latest:
+                    continue
+                self._team_cursors[key] = latest
+                if not first_poll:
+                    events.append(('team', {
+                        'team_key': team_key,
+                        'game_index': game_index,
+                        'match_name': game.get('match_name'),
+                        'timestamp': latest,
+                        'latest_prices': game.get('latest_prices', {}),
+                    }))
+        return events
+
+
+def format_sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
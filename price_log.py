@@ -0,0 +1,357 @@
+"""
+Append-only Price Log (NDJSON)
+One JSON object per line, so a scraper run only writes its own rows instead of
+re-reading and rewriting the whole history.
+
+    prices.ndjson       <- scraper_viagogo.py   (was prices.json)
+    prices_ftn.ndjson   <- scraper_ftn.py       (was prices_ftn.json)
+
+The first append migrates the legacy JSON array once; readers fall back to it
+while no log exists yet.
+
+Change points: the scrapers append through append_changes(), which only writes a
+row when a series' (match, category) price differs from the last one written - plus
+a "closing" row carrying the old price at the time it was last seen, so a line drawn
+through the stored points is the same as one drawn through every observation. When
+each series was last observed is kept in a small sidecar that is rewritten per run
+(prices.ndjson.heartbeat.json); readers extend each series to it.
+
+Writers lock the log (atomic_io.file_lock) for the whole read-modify-write, and
+every full rewrite is swapped in atomically - readers never lock.
+
+Usage:
+    python price_log.py migrate prices.json prices.ndjson
+    python price_log.py compact prices.ndjson
+    python price_log.py changepoints prices.ndjson    # re-encode an existing log
+    python price_log.py stats prices.ndjson
+"""
+import json
+import os
+import sys
+
+from atomic_io import atomic_write, file_lock, write_json
+from json_stream import iter_array
+
+try:
+    import orjson
+except ImportError:  # scrapers don't need it - stdlib json reads the same lines
+    orjson = None
+
+VIAGOGO_LOG_FILE = 'prices.ndjson'
+VIAGOGO_LEGACY_FILE = 'prices.json'
+FTN_LOG_FILE = 'prices_ftn.ndjson'
+FTN_LEGACY_FILE = 'prices_ftn.json'
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+def is_log(path):
+    return path.endswith('.ndjson')
+
+
+def current_path(log_path, legacy_path=None):
+    """The log once it exists, the legacy JSON array until then"""
+    if legacy_path is None or os.path.exists(log_path):
+        return log_path
+    return legacy_path
+
+
+# ---------------------------------------------------------
+# Reading
+# ---------------------------------------------------------
+def iter_records(path):
+    """
+    Stream records from a log one line at a time. A torn last line (writer killed
+    mid-append) or any other unparseable line is skipped with a warning.
+    """
+    if not os.path.exists(path):
+        return
+    skipped = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = _loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(record, dict):
+                yield record
+    if skipped:
+        print(f'[WARN] Skipped {skipped} unreadable line(s) in {path}')
+
+
+def read_records(path, default=None):
+    """All records of a log or a legacy JSON array file, chosen by extension"""
+    default = [] if default is None else default
+    if not os.path.exists(path):
+        print(f'[WARN] File not found: {path}')
+        return default
+    try:
+        if is_log(path):
+            return list(iter_records(path))
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else default
+    except Exception as e:
+        print(f'[ERROR] Failed to load {path}: {e}')
+        return default
+
+
+def iter_legacy(path):
+    """Stream the records of a legacy JSON array file (json_stream.py) - raises ValueError if malformed"""
+    for record in iter_array(path):
+        if isinstance(record, dict):
+            yield record
+
+
+def _guarded(records, path):
+    """A legacy stream that stops with an error message instead of raising mid-iteration"""
+    try:
+        yield from records
+    except Exception as e:
+        print(f'[ERROR] Failed to load {path}: {e}')
+
+
+def stream_records(path, default=None):
+    """read_records() that streams instead of building the list"""
+    if is_log(path):
+        return iter_records(path)
+    if not os.path.exists(path):
+        return read_records(path, default)
+    return _guarded(iter_legacy(path), path)
+
+
+# ---------------------------------------------------------
+# Writing
+# ---------------------------------------------------------
+def _ends_with_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def append_records(path, records, legacy_path=None):
+    """
+    Append records to the log - cost is O(len(records)), not O(history).
+    With legacy_path, the JSON array it names is migrated first if no log exists yet.
+    """
+    with file_lock(path):
+        if legacy_path is not None:
+            ensure_migrated(legacy_path, path)
+        lines = ''.join(_dumps(r) + '\n' for r in records)
+        if not lines:
+            return 0
+        # Don't glue the first new row onto a torn line left by an interrupted writer
+        prefix = '' if _ends_with_newline(path) else '\n'
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(prefix + lines)
+            f.flush()
+            os.fsync(f.fileno())
+    return len(records)
+
+
+def write_log(path, records):
+    """Write a complete log and swap it in, so readers never see half of it"""
+    count = 0
+    with atomic_write(path) as f:
+        for record in records:
+            f.write(_dumps(record) + '\n')
+            count += 1
+    return count
+
+
+def migrate(legacy_path, log_path, force=False):
+    """One-shot conversion of a JSON array file into a log"""
+    if os.path.exists(log_path) and not force:
+        print(f'[WARN] {log_path} already exists - not migrating (use --force to overwrite)')
+        return 0
+    try:
+        # Streamed straight into the new log: the array is never held in memory
+        count = write_log(log_path, iter_legacy(legacy_path))
+    except (OSError, ValueError) as e:
+        print(f'[ERROR] Failed to migrate {legacy_path}: {e}')
+        return 0
+    print(f'[OK] Migrated {count} records: {legacy_path} -> {log_path}')
+    return count
+
+
+def ensure_migrated(legacy_path, log_path):
+    with file_lock(log_path):
+        if not os.path.exists(log_path) and os.path.exists(legacy_path):
+            migrate(legacy_path, log_path)
+
+
+# ---------------------------------------------------------
+# Change points
+# ---------------------------------------------------------
+def heartbeat_path(path):
+    return path + '.heartbeat.json'
+
+
+def rollup_path(path):
+    """prices.ndjson -> prices.rollup.ndjson (older history in hourly/daily buckets, see rollup.py)"""
+    return (path[:-len('.ndjson')] if is_log(path) else path) + '.rollup.ndjson'
+
+
+def series_key(record):
+    return f"{record.get('match_key') or record.get('match_url')}|{record.get('category')}"
+
+
+class ChangeEncoder:
+    """
+    Turns a chronological stream of observations into change points.
+    state['series'][key] = {'record': last row written, 'last_seen': newest observation}
+    """
+
+    def __init__(self, state=None):
+        self.state = state or {'last_run': None, 'series': {}}
+
+    def feed(self, record):
+        """Rows to write for one observation ([] when the price is unchanged)"""
+        key = series_key(record)
+        timestamp = record.get('timestamp', '')
+        previous = self.state['series'].get(key)
+        rows = []
+        if previous is None:
+            rows.append(record)
+        elif previous['record'].get('price') != record.get('price'):
+            if previous['last_seen'] > previous['record'].get('timestamp', ''):
+                # Close the old level where it was last observed
+                rows.append({**previous['record'], 'timestamp': previous['last_seen']})
+            rows.append(record)
+        if rows:
+            self.state['series'][key] = {'record': record, 'last_seen': timestamp}
+        else:
+            previous['last_seen'] = max(previous['last_seen'], timestamp)
+        if timestamp > (self.state['last_run'] or ''):
+            self.state['last_run'] = timestamp
+        return rows
+
+
+def load_heartbeat(path):
+    """Change-point state of a log; rebuilt from the log itself if the sidecar is missing"""
+    sidecar = heartbeat_path(path)
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f'[WARN] Rebuilding unreadable {sidecar}: {e}')
+    encoder = ChangeEncoder()
+    for record in iter_records(path):
+        encoder.feed(record)
+    return encoder.state
+
+
+def save_heartbeat(path, state):
+    write_json(heartbeat_path(path), state, ensure_ascii=False, separators=(',', ':'))
+
+
+def append_changes(path, records, legacy_path=None):
+    """
+    Change-point append: write only new/changed series values (plus closing rows) and
+    move every observed series' heartbeat. Returns the rows actually written.
+    """
+    # Heartbeat read -> append -> heartbeat write must not interleave with another run
+    with file_lock(path):
+        if legacy_path is not None:
+            ensure_migrated(legacy_path, path)
+        encoder = ChangeEncoder(load_heartbeat(path))
+        rows = []
+        for record in sorted(records, key=lambda r: r.get('timestamp', '')):
+            rows.extend(encoder.feed(record))
+        append_records(path, rows)
+        save_heartbeat(path, encoder.state)
+    return rows
+
+
+def encode_changes(path):
+    """Offline: rewrite a whole log as change points and rebuild its heartbeat"""
+    with file_lock(path):
+        if not os.path.exists(path):
+            print(f'[WARN] {path} not found - migrate the legacy file first')
+            return 0
+        before = sum(1 for _ in iter_records(path))
+        records = sorted(iter_records(path), key=lambda r: r.get('timestamp', ''))
+        encoder = ChangeEncoder()
+        count = write_log(path, (row for record in records for row in encoder.feed(record)))
+        save_heartbeat(path, encoder.state)
+        print(f'[OK] {path}: {before} rows -> {count} change points, {len(encoder.state["series"])} series')
+        return count
+
+
+def heartbeat_index(state, registry):
+    """{match_key: {category: {'price', 'last_seen'}}} for the server"""
+    index = {}
+    for entry in (state or {}).get('series', {}).values():
+        record = entry['record']
+        key = registry.record_key(record)
+        if key and record.get('category'):
+            index.setdefault(key, {})[record['category']] = {'price': record.get('price'), 'last_seen': entry['last_seen']}
+    return index
+
+
+def compact(path):
+    """
+    Offline compaction: drop unreadable and exact-duplicate lines and sort by
+    timestamp. Holds the log's lock, so a scraper finishing meanwhile waits for it.
+    """
+    with file_lock(path):
+        before = os.path.getsize(path) if os.path.exists(path) else 0
+        seen = set()
+        records = []
+        for record in iter_records(path):
+            key = _dumps(record)
+            if key in seen:
+                continue
+            seen.add(key)
+            records.append(record)
+        records.sort(key=lambda r: r.get('timestamp', ''))
+        count = write_log(path, records)
+    print(f'[OK] Compacted {path}: {count} records, {before} -> {os.path.getsize(path)} bytes')
+    return count
+
+
+def stats(path):
+    count, first, last = 0, None, None
+    for record in iter_records(path):
+        count += 1
+        timestamp = record.get('timestamp', '')
+        first = timestamp if first is None else min(first, timestamp)
+        last = timestamp if last is None else max(last, timestamp)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    print(f'[INFO] {path}: {count} records, {size} bytes, {first} .. {last}')
+    return count
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main(argv):
+    if len(argv) >= 3 and argv[0] == 'migrate':
+        migrate(argv[1], argv[2], force='--force' in argv[3:])
+    elif len(argv) == 2 and argv[0] == 'compact':
+        compact(argv[1])
+    elif len(argv) == 2 and argv[0] == 'changepoints':
+        encode_changes(argv[1])
+    elif len(argv) == 2 and argv[0] == 'stats':
+        stats(argv[1])
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
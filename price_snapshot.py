@@ -0,0 +1,279 @@
+"""
+Columnar Price Snapshots
+Exports each source's price history as flat binary columns the API server opens
+with numpy memmap: nothing is parsed at startup, pages are shared between worker
+processes through the OS page cache, and a match's history is one array slice.
+
+Layout (per source, in snapshots/):
+    {source}.meta.json                  dictionaries, row count, generation, source file signature
+    {source}.{generation}.ts.npy        int64    epoch microseconds of the (naive local) timestamp
+    {source}.{generation}.price.npy     float32  NaN = no price
+    {source}.{generation}.match.npy     uint16/uint32 ids into meta['matches']
+    {source}.{generation}.category.npy  uint16/uint32 ids into meta['categories']
+    {source}.{generation}.offsets.npy   int64    rows of match id m are [offsets[m], offsets[m + 1])
+
+Rows are sorted by (match, timestamp). A snapshot is only served while the file it
+was exported from is unchanged; after that the server falls back to the live data.
+The image build exports the first one; the auto runners re-export every stale
+snapshot from their compaction pass after each cycle (rollup.compact_all -> refresh),
+so a running server is back on a current snapshot once the cycle's append is compacted.
+Snapshots serve /history and the feed's baseline; /overview builds its summary
+from the live log.
+
+Usage:
+    python price_snapshot.py export     # all sources
+    python price_snapshot.py refresh    # only the stale ones
+    python price_snapshot.py stats
+"""
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # optional - without it the server reads the live files
+    np = None
+
+from atomic_io import write_json
+from match_registry import MatchRegistry
+from price_log import (
+    stream_records, current_path,
+    VIAGOGO_LOG_FILE, VIAGOGO_LEGACY_FILE, FTN_LOG_FILE, FTN_LEGACY_FILE,
+)
+from price_store import file_signature
+
+SNAPSHOT_DIR = 'snapshots'
+SOURCES = {
+    'viagogo': (VIAGOGO_LOG_FILE, VIAGOGO_LEGACY_FILE),
+    'ftn': (FTN_LOG_FILE, FTN_LEGACY_FILE),
+}
+COLUMNS = ('ts', 'price', 'match', 'category', 'offsets')
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp):
+    return (datetime.fromisoformat(timestamp) - EPOCH) // MICROSECOND
+
+
+def from_micros(values):
+    """int64 microseconds -> the ISO strings the scrapers wrote (isoformat drops .000000)"""
+    strings = np.datetime_as_string(np.asarray(values).astype('datetime64[us]'))
+    return [s[:-7] if s.endswith('.000000') else s for s in strings.tolist()]
+
+
+def _id_dtype(size):
+    return np.uint16 if size <= np.iinfo(np.uint16).max else np.uint32
+
+
+def _meta_path(out_dir, source):
+    return os.path.join(out_dir, f'{source}.meta.json')
+
+
+def _column_path(out_dir, source, generation, column):
+    return os.path.join(out_dir, f'{source}.{generation}.{column}.npy')
+
+
+# ---------------------------------------------------------
+# Export
+# ---------------------------------------------------------
+def export_snapshot(source, path, out_dir=SNAPSHOT_DIR, registry=None):
+    """Write one source's columns, then swap the meta file in so readers never see a half export"""
+    if np is None:
+        print('[WARN] numpy not installed - snapshot export skipped')
+        return None
+    registry = registry or MatchRegistry.load()
+    # Signature first: if the file grows while we read, the snapshot is simply stale
+    signature = file_signature(path)
+
+    keyed = []
+    last_timestamp = None
+    total = 0
+    for r in stream_records(path):
+        total += 1
+        timestamp = r.get('timestamp')
+        if not timestamp:
+            continue
+        last_timestamp = timestamp if last_timestamp is None else max(last_timestamp, timestamp)
+        key = registry.record_key(r)
+        if key and r.get('category'):
+            keyed.append((key, timestamp, r.get('category'), r.get('price')))
+    keyed.sort(key=lambda k: (k[0], k[1]))
+
+    matches = sorted({k[0] for k in keyed})
+    categories = sorted({k[2] for k in keyed})
+    match_ids = {key: i for i, key in enumerate(matches)}
+    category_ids = {name: i for i, name in enumerate(categories)}
+
+    columns = {
+        'ts': np.array([to_micros(k[1]) for k in keyed], dtype=np.int64),
+        'price': np.array([np.nan if k[3] is None else k[3] for k in keyed], dtype=np.float32),
+        'match': np.array([match_ids[k[0]] for k in keyed], dtype=_id_dtype(len(matches))),
+        'category': np.array([category_ids[k[2]] for k in keyed], dtype=_id_dtype(len(categories))),
+    }
+    columns['offsets'] = np.searchsorted(columns['match'], np.arange(len(matches) + 1)).astype(np.int64)
+
+    os.makedirs(out_dir, exist_ok=True)
+    generation = uuid.uuid4().hex[:12]
+    for column, values in columns.items():
+        # Fresh names nobody reads until the meta swap below - fsync is enough
+        with open(_column_path(out_dir, source, generation, column), 'wb') as f:
+            np.save(f, values)
+            f.flush()
+            os.fsync(f.fileno())
+
+    meta = {
+        'source': source,
+        'path': path,
+        'signature': list(signature) if signature else None,
+        'generation': generation,
+        'rows': len(keyed),
+        'skipped': total - len(keyed),
+        'last_timestamp': last_timestamp,
+        'matches': matches,
+        'categories': categories,
+        'created': datetime.now().isoformat(),
+    }
+    write_json(_meta_path(out_dir, source), meta)
+    _remove_old_generations(out_dir, source, generation)
+    print(f'[OK] Snapshot {source}: {len(keyed)} rows, {len(matches)} matches, {len(categories)} categories ({path})')
+    return meta
+
+
+def _remove_old_generations(out_dir, source, generation):
+    for name in os.listdir(out_dir):
+        if name.startswith(f'{source}.') and name.endswith('.npy') and f'.{generation}.' not in name:
+            try:
+                os.remove(os.path.join(out_dir, name))
+            except OSError:
+                pass  # still mapped by a running server on Windows - next export retries
+
+
+def export_all(out_dir=SNAPSHOT_DIR):
+    registry = MatchRegistry.load()
+    for source, (log_path, legacy_path) in SOURCES.items():
+        export_snapshot(source, current_path(log_path, legacy_path), out_dir, registry)
+
+
+def _exported_from(out_dir, source, path):
+    """True if the source's current snapshot was exported from `path` as it is now"""
+    try:
+        with open(_meta_path(out_dir, source), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    signature = file_signature(path)
+    return meta.get('path') == path and meta.get('signature') == (list(signature) if signature else None)
+
+
+def refresh(sources=tuple(SOURCES), out_dir=SNAPSHOT_DIR, registry=None):
+    """Re-export the sources whose snapshot no longer matches their file; returns the sources exported"""
+    if np is None:
+        return []
+    exported = []
+    for source in sources:
+        path = current_path(*SOURCES[source])
+        if not os.path.exists(path) or _exported_from(out_dir, source, path):
+            continue
+        registry = registry or MatchRegistry.load()
+        if export_snapshot(source, path, out_dir, registry):
+            exported.append(source)
+    return exported
+
+
+# ---------------------------------------------------------
+# Reading
+# ---------------------------------------------------------
+class Snapshot:
+    """One exported generation, memory-mapped read-only"""
+
+    def __init__(self, meta, out_dir):
+        self.meta = meta
+        self.signature = tuple(meta['signature']) if meta.get('signature') else None
+        self.last_timestamp = meta.get('last_timestamp')
+        self.match_ids = {key: i for i, key in enumerate(meta['matches'])}
+        self.categories = meta['categories']
+        for column in COLUMNS:
+            path = _column_path(out_dir, meta['source'], meta['generation'], column)
+            setattr(self, column, np.load(path, mmap_mode='r'))
+
+    def __len__(self):
+        return int(self.meta['rows'])
+
+    def for_match(self, match_key, since=None):
+        """Rows for a match in timestamp order (PriceIndex.for_match interface) - one slice + binary search"""
+        m = self.match_ids.get(match_key)
+        if m is None:
+            return []
+        lo, hi = int(self.offsets[m]), int(self.offsets[m + 1])
+        if since:
+            lo += int(np.searchsorted(self.ts[lo:hi], to_micros(since), side='right'))
+        if lo >= hi:
+            return []
+        prices = np.round(self.price[lo:hi].astype(np.float64), 2)
+        categories = self.categories
+        return [
+            {'category': categories[c], 'timestamp': t, 'price': None if p != p else p}
+            for c, t, p in zip(self.category[lo:hi].tolist(), from_micros(self.ts[lo:hi]), prices.tolist())
+        ]
+
+
+class SnapshotStore:
+    """Latest snapshot of a source, re-opened when a new export lands"""
+
+    def __init__(self, source, out_dir=SNAPSHOT_DIR):
+        self.source = source
+        self.out_dir = out_dir
+        self._meta_signature = None
+        self._snapshot = None
+
+    def get(self):
+        if np is None:
+            return None
+        meta_path = _meta_path(self.out_dir, self.source)
+        signature = file_signature(meta_path)
+        if signature != self._meta_signature:
+            self._meta_signature = signature
+            self._snapshot = None
+            if signature is not None:
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        self._snapshot = Snapshot(json.load(f), self.out_dir)
+                    print(f'[INFO] Mapped snapshot {meta_path} ({len(self._snapshot)} rows)')
+                except Exception as e:
+                    print(f'[ERROR] Failed to open snapshot {meta_path}: {e}')
+        return self._snapshot
+
+    def current(self, path):
+        """The snapshot if it was exported from `path` as it is now, else None"""
+        snapshot = self.get()
+        if snapshot is not None and snapshot.meta.get('path') == path and snapshot.signature == file_signature(path):
+            return snapshot
+        return None
+
+
+def main(argv):
+    if argv and argv[0] == 'export':
+        export_all(argv[1] if len(argv) > 1 else SNAPSHOT_DIR)
+    elif argv and argv[0] == 'refresh':
+        refresh(out_dir=argv[1] if len(argv) > 1 else SNAPSHOT_DIR)
+    elif argv and argv[0] == 'stats':
+        for source, (log_path, legacy_path) in SOURCES.items():
+            store = SnapshotStore(source)
+            snapshot = store.get()
+            if snapshot is None:
+                print(f'[INFO] {source}: no snapshot')
+                continue
+            state = 'current' if store.current(current_path(log_path, legacy_path)) else 'stale'
+            print(f'[INFO] {source}: {len(snapshot)} rows, generation {snapshot.meta["generation"]} ({state})')
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
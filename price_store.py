@@ -0,0 +1,544 @@
+"""
+Resident Price Store for the API server
+Parses each price file once and keeps a hash index by canonical match key (see
+match_registry.py) so /history lookups cost O(result) instead of O(file).
+A file is only re-parsed when its mtime or size changes.
+
+Rows are held as columns (PriceRows), not one dict each: the ~110-character match
+URLs, names, categories and currencies are interned into integer ids, prices sit in
+a float array and a scrape run's rows share one timestamp string - tens of bytes
+per row instead of ~1 KB. Dicts are only built for the rows a request returns.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+# Parses are CPU bound (GIL) - a couple of workers is enough to keep one slow file
+# from queueing behind another without letting a burst of reloads pile up
+PARSE_WORKERS = 2
+_parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+
+# /history ?range= presets (relative to now)
+TIME_RANGES = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    'all': None,
+}
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        print(f'[WARN] File not found: {path}')
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f'[ERROR] Failed to load {path}: {e}')
+        return default
+
+
+def normalize_timestamp(value):
+    """
+    Parse an ISO date/datetime (or epoch seconds) into the naive local ISO format
+    the scrapers write, so it can be compared directly against stored timestamps.
+    Naive input is taken as that same scraper-local time (the frontend sends its
+    day bounds that way); a UTC offset or epoch is converted to this machine's
+    local time. Raises ValueError on anything else.
+    """
+    value = str(value).strip()
+    try:
+        dt = datetime.fromtimestamp(float(value))
+    except ValueError:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if dt.tzinfo is not None:
+            dt = dt.astimezone().replace(tzinfo=None)
+    return dt.isoformat()
+
+
+def resolve_time_window(start=None, end=None, time_range=None):
+    """Turn from/to/range query params into an ISO (start, end) window; None = open"""
+    if time_range:
+        if time_range not in TIME_RANGES:
+            raise ValueError(f'Unknown range {time_range!r} (expected one of {", ".join(TIME_RANGES)})')
+        delta = TIME_RANGES[time_range]
+        if delta is not None and start is None:
+            start = (datetime.now() - delta).isoformat()
+    if start is not None:
+        start = normalize_timestamp(start)
+    if end is not None:
+        end = normalize_timestamp(end)
+    return start, end
+
+
+class KeyView:
+    """key(item) for each item of a list, computed on access - bisect by key without Python 3.10's key="""
+
+    def __init__(self, items, key):
+        self.items = items
+        self.key = key
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.key(self.items[i])
+
+
+def after_cursor(items, since, key=lambda item: item.get('timestamp', '')):
+    """Items of a timestamp-ordered list strictly newer than `since` - binary search"""
+    if not since:
+        return items
+    return items[bisect_right(KeyView(items, key), since):]
+
+
+def page_before(items, before=None, limit=None, key=lambda item: item.get('timestamp', '')):
+    """
+    Newest `limit` items strictly older than `before` from a timestamp-ordered list,
+    plus the cursor for the next (older) page - None when nothing older is left.
+    """
+    end = bisect_left(KeyView(items, key), before) if before else len(items)
+    start = 0 if limit is None else max(0, end - limit)
+    return items[start:end], (key(items[start]) if start > 0 else None)
+
+
+def parse_fields(fields, allowed, default):
+    """fields=a,b,c query param -> list of names; ValueError on unknown ones"""
+    if not fields:
+        return list(default)
+    names = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in names if f not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown field(s) {", ".join(unknown)} (expected any of {", ".join(allowed)})')
+    return names
+
+
+def in_window(timestamp, start, end):
+    return (start is None or timestamp >= start) and (end is None or timestamp <= end)
+
+
+def window_series(rows, start=None, end=None, since=None, heartbeat=None):
+    """
+    One category's points for the window [start, end] from its timestamp-ordered
+    change points (rollup buckets keep their min/max). A price holds until the next
+    change, so the row in force at `start` is carried in as a point at `start`, and
+    the series is closed with the price in force at its last observation (the later
+    of its last row and the heartbeat's last_seen) or at `end` if that comes first.
+    With `since` (rows already trimmed to it), only points after it are returned.
+    """
+    before, points = None, []
+    observed = heartbeat['last_seen'] if heartbeat else ''
+    for row in rows:
+        timestamp = row.get('timestamp', '')
+        observed = max(observed, timestamp)
+        if start is not None and timestamp < start:
+            before = row
+        elif in_window(timestamp, start, end):
+            point = {'timestamp': timestamp, 'price': row.get('price', 0)}
+            if 'tier' in row:
+                point['min'], point['max'] = row.get('min'), row.get('max')
+            points.append(point)
+    if before is not None and observed >= start and (not points or points[0]['timestamp'] > start):
+        points.insert(0, {'timestamp': start, 'price': before.get('price', 0)})
+    close = min(observed, end) if end is not None else observed
+    if points and close > points[-1]['timestamp']:
+        points.append({'timestamp': close, 'price': points[-1]['price']})
+    elif not points and heartbeat and in_window(observed, start, end):
+        # Nothing new since the cursor, but still observed: extend the client's line
+        points.append({'timestamp': observed, 'price': heartbeat['price']})
+    return [p for p in points if p['timestamp'] > since] if since else points
+
+
+# ---------------------------------------------------------
+# Downsampling
+# ---------------------------------------------------------
+def _epoch(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def downsample_lttb(points, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling of [{'timestamp', 'price'}, ...].
+    Keeps the first and last point and, per bucket, the point that best preserves
+    the visual shape (spikes and dips survive, flat stretches collapse).
+    """
+    n = len(points)
+    if max_points is None or max_points >= n or n <= 2:
+        return points
+    if max_points < 3:
+        return [points[0], points[-1]]
+
+    xs = [_epoch(p.get('timestamp')) for p in points]
+    ys = [float(p.get('price') or 0) for p in points]
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def resample_step(points, step, start=None, end=None):
+    """
+    Regular step series from (change-point) samples: one point every `step` seconds
+    holding the last value at or before it, from the first point (or start) to the
+    last (or end) - the value at that stop is always emitted, even off the grid.
+    The stored points only mark changes, so this is exact.
+    """
+    if not points or not step:
+        return points
+    xs = [_epoch(p.get('timestamp')) for p in points]
+    t = max(xs[0], _epoch(start)) if start else xs[0]
+    stop = min(xs[-1], _epoch(end)) if end else xs[-1]
+    result = []
+    i = 0
+
+    def emit(at):
+        nonlocal i
+        while i + 1 < len(xs) and xs[i + 1] <= at:
+            i += 1
+        result.append({'timestamp': datetime.fromtimestamp(at).isoformat(), 'price': points[i].get('price')})
+
+    while t <= stop:
+        emit(t)
+        t += step
+    if t - step < stop:
+        emit(stop)
+    return result
+
+
+# ---------------------------------------------------------
+# Compact rows
+# ---------------------------------------------------------
+class StringTable:
+    """Interned strings <-> integer ids; id 0 is None"""
+
+    def __init__(self):
+        self.values = [None]
+        self.ids = {None: 0}
+
+    def id(self, value):
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class PriceRows:
+    """
+    Price records as parallel columns. String fields are ids into one StringTable,
+    price is a float64 array (NaN = None), timestamps are shared str objects.
+    Fields outside the fixed columns (the bucket stats of rollup rows) are kept
+    per row in `extra`. rows[i] rebuilds the record as a dict.
+    """
+
+    STRING_FIELDS = ('match_url', 'match_name', 'match_key', 'category', 'block', 'currency', 'source')
+    FIXED_FIELDS = frozenset(STRING_FIELDS + ('price', 'timestamp'))
+
+    def __init__(self, records=()):
+        self.strings = StringTable()
+        self.timestamp_ids = {}
+        self.timestamps = []
+        self.prices = array('d')
+        self.columns = {}             # field -> array('I') of string ids, created on first use
+        self.extra = {}               # position -> {field: value}
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def append(self, record):
+        i = len(self.timestamps)
+        timestamp = record.get('timestamp') or ''
+        self.timestamps.append(self.timestamp_ids.setdefault(timestamp, timestamp))
+        price = record.get('price')
+        numeric = isinstance(price, (int, float))
+        self.prices.append(price if numeric else math.nan)
+        for field in self.STRING_FIELDS:
+            value = record.get(field)
+            column = self.columns.get(field)
+            if column is None:
+                if value is None:
+                    continue
+                column = self.columns[field] = array('I', bytes(4 * i))
+            column.append(self.strings.id(value))
+        extra = {k: v for k, v in record.items() if k not in self.FIXED_FIELDS}
+        if not numeric and price is not None:
+            extra['price'] = price    # malformed, but passed through as written
+        if extra:
+            self.extra[i] = extra
+
+    def value(self, i, field):
+        """One field of row i without building the dict"""
+        if field == 'price':
+            price = self.prices[i]
+            return self.extra.get(i, {}).get('price') if price != price else price
+        if field == 'timestamp':
+            return self.timestamps[i]
+        column = self.columns.get(field)
+        if column is not None:
+            return self.strings.values[column[i]]
+        return self.extra.get(i, {}).get(field)
+
+    def row(self, i):
+        return self.rows_at([i])[0]
+
+    def rows_at(self, positions):
+        """Records for a list of positions - one pass per row over the used columns"""
+        strings = self.strings.values
+        columns = list(self.columns.items())
+        prices, timestamps, extra = self.prices, self.timestamps, self.extra
+        records = []
+        for i in positions:
+            record = {field: strings[column[i]] for field, column in columns if column[i]}
+            price = prices[i]
+            record['price'] = price if price == price else None
+            record['timestamp'] = timestamps[i]
+            if i in extra:
+                record.update(extra[i])
+            records.append(record)
+        return records
+
+    def sort(self):
+        """Order rows by timestamp (stable) - a no-op for the usual append-only file"""
+        timestamps = self.timestamps
+        if all(timestamps[i] <= timestamps[i + 1] for i in range(len(timestamps) - 1)):
+            return
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        self.timestamps = [timestamps[i] for i in order]
+        self.prices = array('d', (self.prices[i] for i in order))
+        self.columns = {f: array('I', (c[i] for i in order)) for f, c in self.columns.items()}
+        position = {old: new for new, old in enumerate(order) if old in self.extra}
+        self.extra = {position[old]: extra for old, extra in self.extra.items()}
+
+
+# ---------------------------------------------------------
+# Indexes
+# ---------------------------------------------------------
+class PriceIndex:
+    """Rows of one price file (PriceRows), sorted by timestamp, with a hash index of row positions"""
+
+    def __init__(self, rows, registry):
+        if not isinstance(rows, PriceRows):
+            # A list (legacy JSON) or a generator (streamed log); anything else is an unreadable file
+            rows = PriceRows(rows if isinstance(rows, list) or hasattr(rows, '__next__') else ())
+        rows.sort()
+        self.rows = rows
+        self.timestamps = rows.timestamps
+        # Stamped by the scrapers; resolved through the registry for older rows - once per
+        # distinct (match_key, match_url, match_name), the same few hundred combinations
+        resolved = {}
+        columns = [rows.columns.get(f) for f in ('match_key', 'match_url', 'match_name')]
+        strings = rows.strings.values
+        self.match_keys = []
+        self.by_match_key = defaultdict(lambda: array('I'))
+        for i in range(len(rows)):
+            ids = tuple(c[i] if c is not None else 0 for c in columns)
+            key = resolved.get(ids)
+            if key is None and ids not in resolved:
+                stamped, url, name = (strings[j] for j in ids)
+                key = resolved[ids] = registry.record_key({'match_key': stamped, 'match_url': url, 'match_name': name})
+            self.match_keys.append(key)
+            if key:
+                self.by_match_key[key].append(i)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def after(self, positions, since):
+        """Tail of a (timestamp-ordered) position list strictly newer than `since` - binary search"""
+        if not since:
+            return positions
+        return positions[bisect_right(KeyView(positions, self.timestamps.__getitem__), since):]
+
+    def start_after(self, since):
+        """First position strictly newer than `since` (whole file)"""
+        return bisect_right(self.timestamps, since) if since else 0
+
+    def for_match(self, match_key, since=None):
+        """Rows for a match key in timestamp order, optionally only those after `since`"""
+        return self.rows.rows_at(self.after(self.by_match_key.get(match_key, array('I')), since))
+
+
+# ---------------------------------------------------------
+# Cache
+# ---------------------------------------------------------
+class CachedFile:
+    """
+    Parsed view of a JSON file, rebuilt only when its mtime or size changes.
+    Parsing is single-flight: concurrent callers asking for the same file version
+    share one parse, which runs on the bounded PARSE_WORKERS pool.
+    `reader(path, default)` loads the raw data; with fallback_path the cache reads
+    that file until `path` exists (a price log not yet migrated from its JSON array).
+    """
+
+    def __init__(self, path, build, default=None, reader=read_json, fallback_path=None):
+        self.path = path
+        self.fallback_path = fallback_path
+        self.build = build
+        self.reader = reader
+        self.default = [] if default is None else default
+        self.signature = None
+        self._ready = None            # done Future holding the current value
+        self._pending = None          # in-flight parse: (signature, Future)
+        self._lock = threading.Lock()
+
+    def current_path(self):
+        if self.fallback_path is None or os.path.exists(self.path):
+            return self.path
+        return self.fallback_path
+
+    def load(self):
+        """Future for the file's current version"""
+        path = self.current_path()
+        signature = (path, file_signature(path))
+        with self._lock:
+            if self._ready is not None and signature == self.signature:
+                return self._ready
+            if self._pending is not None and self._pending[0] == signature:
+                return self._pending[1]
+            future = _parse_pool.submit(self._parse, signature)
+            self._pending = (signature, future)
+            return future
+
+    def get(self):
+        """Current value (blocks while a parse is in flight - not for the event loop)"""
+        return self.load().result()
+
+    async def aget(self):
+        """Current value without blocking the event loop"""
+        return await asyncio.wrap_future(self.load())
+
+    def _parse(self, signature):
+        path = signature[0]
+        try:
+            data = self.reader(path, self.default)
+            value = self.build(data)
+            # Streaming readers hand over a generator - count what it built instead
+            print(f'[INFO] Indexed {path} ({len(data) if hasattr(data, "__len__") else len(value)} records)')
+            ready = Future()
+            ready.set_result(value)
+            with self._lock:
+                self._ready, self.signature = ready, signature
+            return value
+        finally:
+            # On failure the next caller retries instead of inheriting the error
+            with self._lock:
+                if self._pending is not None and self._pending[0] == signature:
+                    self._pending = None
+
+
+# ---------------------------------------------------------
+# Overview summary
+# ---------------------------------------------------------
+class PriceSummary:
+    """
+    Latest price and recent points per (source, match key, category), folded in
+    incrementally: each sync only walks the rows appended since the last one.
+    Backs /overview so it never rescans the full files.
+    """
+
+    def __init__(self, window=timedelta(hours=24)):
+        self.window = window
+        self.series = {}      # (source, match_key, category) -> {'price', 'timestamp', 'recent': deque}
+        self._synced = {}     # source -> (index, row count, last timestamp)
+        self._lock = threading.Lock()
+
+    def sync(self, source, index):
+        """Fold rows of `index` not seen yet into the summary"""
+        with self._lock:
+            previous = self._synced.get(source)
+            if previous is not None and previous[0] is index:
+                return
+            start = 0
+            if previous is not None:
+                start = index.start_after(previous[2])
+            if previous is None or start != previous[1]:
+                # New source, or rows landed before the last one seen (rewrite/merge) - rebuild it
+                self.series = {k: v for k, v in self.series.items() if k[0] != source}
+                start = 0
+            cutoff = (datetime.now() - self.window).isoformat()
+            rows = index.rows
+            for i in range(start, len(index)):
+                key = index.match_keys[i]
+                category = rows.value(i, 'category')
+                timestamp = index.timestamps[i]
+                if not key or not category:
+                    continue
+                price = rows.value(i, 'price')
+                entry = self.series.setdefault((source, key, category), {'price': None, 'timestamp': '', 'recent': deque()})
+                if timestamp >= entry['timestamp']:
+                    entry['price'], entry['timestamp'] = price, timestamp
+                if timestamp >= cutoff:
+                    entry['recent'].append((timestamp, price))
+            self._synced[source] = (index, len(index), index.timestamps[-1] if index.timestamps else None)
+
+    def overview(self, heartbeats=None):
+        """
+        {match_key: {source: {category: {'price', 'timestamp', 'min_24h'}}}}
+        heartbeats ({source: {match_key: {category: {'last_seen'}}}}) carry unchanged prices
+        forward: the latest price still counts towards min_24h while it is being observed.
+        """
+        cutoff = (datetime.now() - self.window).isoformat()
+        heartbeats = heartbeats or {}
+        result = {}
+        with self._lock:
+            for (source, key, category), entry in self.series.items():
+                recent = entry['recent']
+                while recent and recent[0][0] < cutoff:
+                    recent.popleft()
+                prices = [p for _, p in recent if p is not None]
+                timestamp = entry['timestamp']
+                seen = heartbeats.get(source, {}).get(key, {}).get(category)
+                if seen and seen['last_seen'] > timestamp:
+                    timestamp = seen['last_seen']
+                    if timestamp >= cutoff and entry['price'] is not None:
+                        prices.append(entry['price'])
+                result.setdefault(key, {}).setdefault(source, {})[category] = {
+                    'price': entry['price'],
+                    'timestamp': timestamp,
+                    'min_24h': min(prices) if prices else None,
+                }
+        return result
@@ -0,0 +1,288 @@
+"""
+Tiered Retention: raw -> hourly -> daily
+Keeps the price files bounded over a season. A compaction pass moves raw points
+older than RAW_DAYS out of each log into a rollup file next to it:
+
+    prices.ndjson                  raw change points of the last RAW_DAYS
+    prices.rollup.ndjson           hourly buckets up to HOURLY_DAYS old, daily buckets before that
+    teams/{team}/games/{id}.ndjson         same for club games (the bucket is a whole
+    teams/{team}/games/{id}.rollup.ndjson  price table with per-block min/max)
+
+A bucket row is the bucket's last row (timestamp and price of its last observation)
+plus tier, bucket start, first (its first observation), min, max and count. The stored series are step functions -
+a price holds until the next change point - so a bucket's min/max include the price
+carried in from before it. Each series' newest row always stays raw: it is the
+current level that /overview, the feed and the scrapers' change encoder start from.
+
+The scrapers' auto runners compact after every cycle; readers stitch rollup + raw
+and the API rolls up further when a request only needs coarser points.
+
+Usage:
+    python rollup.py run       # compact both logs and the team shards, refresh prices.db and snapshots/
+    python rollup.py stats
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from atomic_io import file_lock
+from match_registry import MatchRegistry
+from price_db import DB_FILE, PriceDB, import_source, import_teams
+from price_log import (
+    iter_records, series_key, rollup_path, write_log,
+    VIAGOGO_LOG_FILE, FTN_LOG_FILE,
+)
+from price_snapshot import SNAPSHOT_DIR, refresh as refresh_snapshots
+from team_store import TeamStore
+
+RAW_DAYS = 7
+HOURLY_DAYS = 60
+TIERS = [('hourly', 3600), ('daily', 86400)]  # finest first
+SOURCES = {'viagogo': VIAGOGO_LOG_FILE, 'ftn': FTN_LOG_FILE}
+BUCKET_FIELDS = ('tier', 'bucket', 'first', 'min', 'max', 'count')
+
+
+def tier_bucket(timestamp, tier):
+    """Start of the bucket holding `timestamp` (naive local ISO strings, so a slice)"""
+    return timestamp[:13] + ':00:00' if tier == 'hourly' else timestamp[:10] + 'T00:00:00'
+
+
+def pick_tier(resolution):
+    """Coarsest tier whose buckets fit in `resolution` seconds - None means raw points"""
+    tier = None
+    for name, seconds in TIERS:
+        if resolution and resolution >= seconds:
+            tier = name
+    return tier
+
+
+def cutoffs(now=None):
+    """(raw cutoff, daily cutoff), aligned to bucket starts so no bucket straddles two tiers"""
+    now = now or datetime.now()
+    return (tier_bucket((now - timedelta(days=RAW_DAYS)).isoformat(), 'hourly'),
+            tier_bucket((now - timedelta(days=HOURLY_DAYS)).isoformat(), 'daily'))
+
+
+def _timestamp(row):
+    return row.get('timestamp') or ''
+
+
+# ---------------------------------------------------------
+# Bucketing
+# ---------------------------------------------------------
+def _widen_price(bucket, low, high):
+    if low is not None:
+        bucket['min'] = low if bucket['min'] is None else min(bucket['min'], low)
+    if high is not None:
+        bucket['max'] = high if bucket['max'] is None else max(bucket['max'], high)
+
+
+def _widen_table(bucket, lows, highs):
+    for field, table, pick in (('min', lows, min), ('max', highs, max)):
+        for category, blocks in (table or {}).items():
+            target = bucket[field].setdefault(category, {})
+            for block, price in blocks.items():
+                if price is not None:
+                    target[block] = price if block not in target else pick(target[block], price)
+
+
+# How a series is keyed, which field holds its value, and how extremes combine
+PRICE_ROWS = {'key': series_key, 'value': 'price', 'widen': _widen_price, 'empty': lambda: None}
+SNAPSHOTS = {'key': lambda row: '', 'value': 'prices', 'widen': _widen_table, 'empty': dict}
+
+
+def rollup_series(rows, tier, kind=PRICE_ROWS, carry=None):
+    """
+    One series' rows (raw points or finer buckets, in timestamp order) as `tier`
+    buckets. `carry` is the value in force before the first row.
+    """
+    value = kind['value']
+    buckets = []
+    for row in rows:
+        start = tier_bucket(_timestamp(row), tier)
+        if not buckets or buckets[-1][1]['bucket'] != start:
+            stats = {'tier': tier, 'bucket': start, 'first': row.get('first', _timestamp(row)),
+                     'min': kind['empty'](), 'max': kind['empty'](), 'count': 0}
+            # Finer buckets start at their bucket, raw rows at their timestamp
+            if carry is not None and row.get('bucket', _timestamp(row)) > start:
+                kind['widen'](stats, carry, carry)
+            buckets.append([row, stats])
+        current = buckets[-1]
+        current[0] = row
+        kind['widen'](current[1], row.get('min', row.get(value)), row.get('max', row.get(value)))
+        current[1]['count'] += row.get('count', 1)
+        carry = row.get(value)
+    return [{**{k: v for k, v in last.items() if k not in BUCKET_FIELDS}, **stats} for last, stats in buckets]
+
+
+def rollup_rows(rows, tier, kind=PRICE_ROWS, carries=None):
+    """Rows of many series (timestamp order) as `tier` buckets, in timestamp order"""
+    by_series = {}
+    for row in rows:
+        by_series.setdefault(kind['key'](row), []).append(row)
+    buckets = []
+    for key, series in by_series.items():
+        buckets.extend(rollup_series(series, tier, kind, (carries or {}).get(key)))
+    buckets.sort(key=_timestamp)
+    return buckets
+
+
+def _fold(rows, kind):
+    """
+    One row per (series, tier, bucket): extremes widen and the newest row wins.
+    Rows covering separate stretches of the bucket (a later compaction pass) add
+    their counts; overlapping ones are the same observations coming back through a
+    merge, so the larger count is kept - folding a bucket with itself changes nothing.
+    """
+    folded = {}
+    for row in rows:
+        key = (kind['key'](row), row['tier'], row['bucket'])
+        other = folded.get(key)
+        if other is None:
+            folded[key] = row
+            continue
+        older, newer = (other, row) if _timestamp(row) > _timestamp(other) else (row, other)
+        count = older['count'] + newer['count'] if _timestamp(older) < newer['first'] else max(row['count'], other['count'])
+        merged = {**newer, 'first': min(row['first'], other['first']), 'min': kind['empty'](), 'max': kind['empty'](),
+                  'count': count}
+        for side in (row, other):
+            kind['widen'](merged, side['min'], side['max'])
+        folded[key] = merged
+    return sorted(folded.values(), key=_timestamp)
+
+
+def _carries(rows, before, kind):
+    """Per series, the value of the last of `rows` older than that series' first row in `before`"""
+    first = {}
+    for row in before:
+        first.setdefault(kind['key'](row), _timestamp(row))
+    carries = {}
+    for row in sorted(rows, key=_timestamp):
+        key = kind['key'](row)
+        if key in first and _timestamp(row) < first[key]:
+            carries[key] = row.get(kind['value'])
+    return carries
+
+
+def build_tiers(existing, old, daily_cutoff, kind=PRICE_ROWS):
+    """Rollup file contents after folding `old` raw rows (timestamp order) into `existing` buckets"""
+    new = rollup_rows(old, 'hourly', kind, _carries(existing, old, kind))
+    hourly = _fold([r for r in existing if r.get('tier') == 'hourly'] + new, kind)
+    daily = [r for r in existing if r.get('tier') == 'daily']
+    aging = [r for r in hourly if r['bucket'] < daily_cutoff]
+    daily = _fold(daily + rollup_rows(aging, 'daily', kind, _carries(daily, aging, kind)), kind)
+    return sorted(daily + [r for r in hourly if r['bucket'] >= daily_cutoff], key=_timestamp)
+
+
+def kind_of(path):
+    """Team game shards hold whole price tables, the source logs one price per row"""
+    return SNAPSHOTS if '/games/' in path.replace('\\', '/') else PRICE_ROWS
+
+
+def merge_rollups(ours, theirs, path, now=None):
+    """Both sides' buckets folded together and re-aged - for merge_prices.py"""
+    rows = list(iter_records(ours)) + list(iter_records(theirs))
+    return build_tiers(rows, [], cutoffs(now)[1], kind_of(path))
+
+
+def split_old(rows, raw_cutoff, kind=PRICE_ROWS):
+    """(rows to roll up, rows to keep raw) - each series' newest row stays raw"""
+    newest = {kind['key'](row): i for i, row in enumerate(rows)}
+    keep = set(newest.values())
+    old, raw = [], []
+    for i, row in enumerate(rows):
+        (old if _timestamp(row) < raw_cutoff and i not in keep else raw).append(row)
+    return old, raw
+
+
+# ---------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------
+def compact_log(path, now=None):
+    """Roll a price log's old rows into its rollup file; returns how many rows moved"""
+    raw_cutoff, daily_cutoff = cutoffs(now)
+    with file_lock(path):
+        old, raw = split_old(sorted(iter_records(path), key=_timestamp), raw_cutoff)
+        if not old:
+            return 0
+        target = rollup_path(path)
+        # Rollup first: a crash before the raw rewrite only leaves rows that fold in again
+        with file_lock(target):
+            write_log(target, build_tiers(list(iter_records(target)), old, daily_cutoff))
+        write_log(path, raw)
+    print(f'[OK] {path}: rolled up {len(old)} rows, {len(raw)} raw rows kept')
+    return len(old)
+
+
+def compact_team(store, team_key, now=None):
+    raw_cutoff, daily_cutoff = cutoffs(now)
+    rolled = 0
+    with store.lock(team_key):
+        manifest = store.load_manifest(team_key)
+        for entry in manifest.get('games', []):
+            path = store.shard_path(team_key, entry['id'])
+            old, raw = split_old(store.load_history(team_key, entry['id']), raw_cutoff, SNAPSHOTS)
+            if not old:
+                continue
+            target = rollup_path(path)
+            write_log(target, build_tiers(list(iter_records(target)), old, daily_cutoff, SNAPSHOTS))
+            write_log(path, raw)
+            entry['price_history_count'] = len(raw)
+            rolled += len(old)
+        if rolled:
+            store.save_manifest(team_key, manifest)
+            print(f'[OK] {team_key}: rolled up {rolled} snapshots')
+    return rolled
+
+
+def compact_all(sources=tuple(SOURCES), teams=True, now=None, db_path=DB_FILE, snapshot_dir=SNAPSHOT_DIR):
+    """
+    One compaction pass; prices.db (if present) is re-imported from every log it no
+    longer matches, and the sources' column snapshots are re-exported when stale
+    """
+    db = PriceDB(db_path) if os.path.exists(db_path) else None
+    registry = None
+    for source in sources:
+        path = SOURCES[source]
+        if not os.path.exists(path):
+            continue
+        compact_log(path, now)
+        # Rewritten here, merged, or appended to while the DB was stale
+        if db is not None and not db.synced(source, path):
+            registry = registry or MatchRegistry.load()
+            import_source(db, source, path, registry)
+    refresh_snapshots(sources, snapshot_dir, registry)
+    if teams:
+        store = TeamStore()
+        rolled = sum(compact_team(store, team_key, now) for team_key in store.team_keys())
+        if rolled and db is not None:
+            import_teams(db, store)
+
+
+def stats():
+    paths = list(SOURCES.values())
+    store = TeamStore()
+    for team_key in store.team_keys():
+        paths += [store.shard_path(team_key, g['id']) for g in store.load_manifest(team_key).get('games', [])]
+    for path in paths:
+        tiers = {}
+        for row in iter_records(rollup_path(path)):
+            tiers[row.get('tier')] = tiers.get(row.get('tier'), 0) + 1
+        raw = sum(1 for _ in iter_records(path))
+        size = sum(os.path.getsize(p) for p in (path, rollup_path(path)) if os.path.exists(p))
+        print(f'[INFO] {path}: {raw} raw, {tiers.get("hourly", 0)} hourly, {tiers.get("daily", 0)} daily, {size} bytes')
+
+
+def main(argv):
+    if argv and argv[0] == 'run':
+        compact_all()
+    elif argv and argv[0] == 'stats':
+        stats()
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,11 @@ import os
 import sys
 from collections import defaultdict
 from datetime import datetime
+from browser_pool import BrowserPool, BrowserCrashed, POOL_WORKERS
+from match_registry import stamp_match_keys
+from page_wait import wait_ready, summary as wait_summary
+from price_log import append_changes
+from price_db import PriceDB
 
 # Fix encoding for Windows (cp1252 can't handle emojis)
 if sys.platform == 'win32':
@@ -23,10 +28,6 @@ def get_driver():
     time.sleep(random.uniform(0.5, 2.0))
     
     try:
-<<<<<<< .merge_file_a12552
-        browser_path = '/usr/bin/chromium' if os.path.exists('/usr/bin/chromium') else None
-        driver_path = '/usr/bin/chromedriver' if os.path.exists('/usr/bin/chromedriver') else None
-=======
         # Windows: Detect Chrome path (handle 32-bit vs 64-bit)
         if sys.platform == 'win32':
             # Try 32-bit Chrome first (Program Files x86)
@@ -43,7 +44,6 @@ def get_driver():
         else:
             browser_path = '/usr/bin/chromium' if os.path.exists('/usr/bin/chromium') else None
             driver_path = '/usr/bin/chromedriver' if os.path.exists('/usr/bin/chromedriver') else None
->>>>>>> .merge_file_a09972
 
         for attempt in range(5):  # Increased retries
             try:
@@ -61,12 +61,8 @@ def get_driver():
                     options=options, 
                     version_main=None, 
                     browser_executable_path=browser_path, 
-<<<<<<< .merge_file_a12552
-                    driver_executable_path=driver_path
-=======
                     driver_executable_path=driver_path,
                     use_subprocess=False  # Avoid subprocess issues on Windows 7
->>>>>>> .merge_file_a09972
                 )
                 print(f'   ✅ Driver initialized successfully (attempt {attempt+1})', flush=True)
                 return driver
@@ -112,7 +108,7 @@ def scrape_ftn_single(driver, url, match_name):
 
     try:
         driver.get(url)
-        time.sleep(8) 
+        wait_ready(driver, 'ftn_event')
         
         try:
             body_text = driver.find_element(By.TAG_NAME, 'body').text
@@ -152,11 +148,7 @@ def scrape_ftn_single(driver, url, match_name):
         records = []
         if prices_found_for_match:
             print(f'      ✅ Found prices: {dict(prices_found_for_match)}', flush=True)
-<<<<<<< .merge_file_a12552
-            timestamp = datetime.now().isoformat()
-=======
             # Note: timestamp will be set by caller to use single run timestamp
->>>>>>> .merge_file_a09972
             for cat, price in prices_found_for_match.items():
                 records.append({
                     'match_url': url,
@@ -165,11 +157,7 @@ def scrape_ftn_single(driver, url, match_name):
                     'price': price,
                     'currency': 'USD',
                     'source': 'FootballTicketNet',
-<<<<<<< .merge_file_a12552
-                    'timestamp': timestamp
-=======
                     'timestamp': ''  # Will be set by caller with single run timestamp
->>>>>>> .merge_file_a09972
                 })
         else:
             print('      ❌ No valid prices found.', flush=True)
@@ -186,7 +174,8 @@ def scrape_ftn_single(driver, url, match_name):
 
 def run_ftn_scraper_cycle():
     GAMES_FILE = 'all_games_ftn_to_scrape.json'
-    OUTPUT_FILE = 'prices_ftn.json'
+    OUTPUT_FILE = 'prices_ftn.ndjson'        # append-only log, one record per line
+    LEGACY_OUTPUT_FILE = 'prices_ftn.json'   # migrated into OUTPUT_FILE on first append
     
     print(f'\n[{datetime.now().strftime("%H:%M")}] 🚀 FTN SCRAPER STARTING...', flush=True)
     
@@ -199,119 +188,58 @@ def run_ftn_scraper_cycle():
         
     print(f'   Target: {len(games)} games...', flush=True)
     
-    # Initialize driver
-    print('   Initializing Chrome driver...', flush=True)
-    driver = get_driver()
-    
-    if not driver:
-        print('   ❌ [ERROR] Failed to initialize driver at startup. Exiting.', flush=True)
-        return
-    
-    print('   ✅ Driver initialized successfully', flush=True)
-    
-<<<<<<< .merge_file_a12552
-=======
     # Create single timestamp for entire scraper run (like Viagogo)
     run_timestamp = datetime.now().isoformat()
     print(f'   📅 Run timestamp: {run_timestamp}', flush=True)
+    print(f'   Scraping with {POOL_WORKERS} browsers...', flush=True)
+    
+    def scrape(driver, job):
+        i, game = job
+        print(f'   [{i}/{len(games)}] Scraping {game.get("match_name", "Unknown")[:40]}...', flush=True)
+        new_records = scrape_ftn_single(driver, game['url'], game['match_name'])
+        # None signals a critical error: the pool restarts this browser
+        if new_records is None:
+            raise BrowserCrashed('Critical Driver Error detected in worker')
+        if not new_records:
+            print(f'      ⚠️ No prices found for {game["match_name"][:40]}', flush=True)
+        return new_records
     
->>>>>>> .merge_file_a09972
+    all_new_records = []  # Collect all records, save at end
     try:
-        existing_data = []
-        if os.path.exists(OUTPUT_FILE):
-            try:
-                with open(OUTPUT_FILE, 'r') as f: existing_data = json.load(f)
-            except: pass
-        
-<<<<<<< .merge_file_a12552
-=======
-        all_new_records = []  # Collect all records, save at end
-        
->>>>>>> .merge_file_a09972
-        for i, game in enumerate(games, 1):
-            # 🔄 BATCH RESTART: Proactively restart driver every 10 games to free memory
-            if i > 1 and i % 10 == 1:
-                print(f'   🔄 Scheduled Batch Restart (Match {i})...', flush=True)
-                try: 
-                    driver.quit()
-                    print(f'   ✅ Old driver closed', flush=True)
-                except Exception as quit_err:
-                    print(f'   ⚠️ Error closing driver: {quit_err}', flush=True)
-                driver = None
-                time.sleep(1)  # Brief pause before getting new driver
-
-            # 1. Check if driver is alive/healthy before starting
-            if driver is None:
-                print(f'   [RESTART] Getting new driver for match {i}...', flush=True)
-                driver = get_driver()
-                if not driver:
-                    print(f'   ❌ Could not restart driver for match {i}, skipping...', flush=True)
-                    continue
-            
-            # Show progress
-            match_name = game.get('match_name', 'Unknown')
-            print(f'   [{i}/{len(games)}] Scraping {match_name[:40]}...', flush=True)
-            
-            # 2. Scrape with retry/recovery logic
-            try:
-                new_records = scrape_ftn_single(driver, game['url'], game['match_name'])
-                
-                # If None returned (signal for critical error), force restart
-                if new_records is None:
-                    raise Exception("Critical Driver Error detected in worker")
-
-                if new_records:
-<<<<<<< .merge_file_a12552
-                    existing_data.extend(new_records)
-                    with open(OUTPUT_FILE, 'w') as f:
-                        json.dump(existing_data, f, indent=2)
-                    print(f'      ✅ Saved {len(new_records)} price records', flush=True)
-=======
-                    # Set single timestamp for all records in this run
-                    for record in new_records:
-                        record['timestamp'] = run_timestamp
-                    all_new_records.extend(new_records)
-                    print(f'      ✅ Collected {len(new_records)} price records', flush=True)
->>>>>>> .merge_file_a09972
-                else:
-                    print(f'      ⚠️ No prices found for this match', flush=True)
-            
-            except Exception as e:
-                print(f'   ⚠️ Driver Unstable ({e}). Restarting...', flush=True)
-                try: 
-                    driver.quit()
-                except: 
-                    pass
-                driver = None # Force create new one next loop
-                continue
-            
-            time.sleep(2) 
+        # 🔄 Each browser is restarted every 10 games to free memory; a crashed game is retried once
+        with BrowserPool(get_driver, restart_every=10, attempts=2) as pool:
+            for new_records in pool.map(scrape, enumerate(games, 1), url=lambda job: job[1]['url']):
+                # Set single timestamp for all records in this run
+                for record in new_records or []:
+                    record['timestamp'] = run_timestamp
+                    all_new_records.append(record)
             
     except Exception as e:
         print(f'🔥 Fatal Error in FTN Cycle: {e}', flush=True)
         import traceback
         traceback.print_exc()
     finally:
-<<<<<<< .merge_file_a12552
-=======
         # Save all collected records at once at the end (like Viagogo does)
         if all_new_records:
+            written = []
+            db = PriceDB()
             try:
-                existing_data.extend(all_new_records)
-                with open(OUTPUT_FILE, 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                print(f'\n[OK] Saved {len(all_new_records)} total price records to {OUTPUT_FILE}', flush=True)
+                stamp_match_keys(all_new_records)
+                # Whether prices.db held the log before this append - decides add vs. re-import below
+                db_synced = db.synced('ftn', OUTPUT_FILE)
+                # Only prices that changed since the last run are stored; the rest just move the heartbeat
+                written = append_changes(OUTPUT_FILE, all_new_records, legacy_path=LEGACY_OUTPUT_FILE)
+                print(f'\n[OK] Saved {len(all_new_records)} total price records to {OUTPUT_FILE} ({len(written)} change rows)', flush=True)
             except Exception as save_err:
                 print(f'\n[ERROR] Error saving results: {str(save_err)[:50]}', flush=True)
-        
->>>>>>> .merge_file_a09972
-        if driver:
+                db_synced = False  # the log may hold part of the append - re-import it
             try:
-                driver.quit()
-                print('   ✅ Driver closed', flush=True)
-            except: 
-                pass
+                db.record_log('ftn', OUTPUT_FILE, written, db_synced)
+                print(f'[OK] Recorded {len(written)} price records in {db.path}', flush=True)
+            except Exception as db_err:
+                print(f'[WARN] Could not update price database: {str(db_err)[:50]}', flush=True)
     
+    wait_summary()
     print(f'[{datetime.now().strftime("%H:%M")}] 💤 FTN CYCLE COMPLETE.', flush=True)
 
 if __name__ == '__main__':
@@ -14,6 +14,11 @@ import os
 import sys
 from datetime import datetime
 from collections import defaultdict
+from browser_pool import BrowserPool
+from page_wait import page_state, wait_ready, summary as wait_summary
+from price_db import PriceDB
+from atomic_io import LockTimeout
+from team_store import TeamStore, load_legacy_team
 
 # Fix encoding for Windows
 if sys.platform == 'win32':
@@ -22,7 +27,6 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 EUR_TO_USD = 1.05
-OUTPUT_FILE = 'ftn_teams_data.json'
 
 def discover_teams_from_files():
     """Discover teams from existing *_prices.json files"""
@@ -140,282 +144,173 @@ def get_driver():
         print(f'   ❌ Driver init failed: {e}', flush=True)
         return None
 
-def extract_games_from_current_page(driver, team_name, team_url_slug, seen_urls):
-    """Extract game URLs from the current page by finding 'View Tickets' buttons/links"""
+# One script collects every View/Buy Tickets control with the link candidates the
+# old per-element lookups tried (own href, enclosing <a>, a slug link in its parent
+# or in its match card, onclick / data-href), plus the card text for name and date.
+# All <a> links come along too, for the fallback when no control leads to a game.
+_GAME_LINKS_JS = r"""
+var slug = arguments[0];
+var cardPattern = /match|event|game|card|row/;
+function slugLink(container) {
+    if (!container || !slug) return null;
+    var links = container.getElementsByTagName('a');
+    for (var i = 0; i < links.length; i++) {
+        var href = links[i].href;
+        if (href && href.toLowerCase().indexOf(slug) !== -1 && href.indexOf('/filter/') === -1) return href;
+    }
+    return null;
+}
+function card(el) {
+    for (var node = el.parentElement; node; node = node.parentElement) {
+        if (cardPattern.test(node.getAttribute('class') || '')) return node;
+    }
+    return null;
+}
+var lower = "translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')";
+var result = document.evaluate("//*[contains(" + lower + ", 'view tickets') or contains(" + lower + ", 'buy tickets')]",
+                               document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var controls = [];
+for (var i = 0; i < result.snapshotLength; i++) {
+    var el = result.snapshotItem(i);
+    var tag = el.tagName.toLowerCase();
+    if (['a', 'button', 'div', 'span'].indexOf(tag) === -1) continue;
+    var enclosing = el.closest('a');
+    var box = card(el);
+    controls.push({
+        tag: tag,
+        text: (el.innerText || '').trim(),
+        href: (tag === 'a' && el.href) || (enclosing && enclosing.href) || slugLink(el.parentElement) || slugLink(box) || null,
+        onclick: el.getAttribute('onclick'),
+        data_href: el.getAttribute('data-href') || el.getAttribute('data-url'),
+        card: box ? box.innerText : ''
+    });
+}
+var links = Array.prototype.map.call(document.getElementsByTagName('a'), function (a) {
+    return [a.href || '', (a.innerText || '').trim()];
+});
+return {controls: controls, links: links};
+"""
+
+def _is_game_url(href, team_url_slug):
+    """
+    Pattern 1: /[team-url-slug]/[game] (old pattern)
+    Pattern 2: /[competition]/[team]-vs-[opponent] (new pattern like /carabao-cup/arsenal-vs-chelsea)
+    Never a filter page
+    """
+    href = href.lower()
+    if not team_url_slug or '/filter/' in href:
+        return False
+    return f'/{team_url_slug}/' in href or (team_url_slug.split('-')[0] in href and 'vs' in href)
+
+def _normalize_href(href):
+    if href.startswith('/'):
+        return 'https://www.footballticketnet.com' + href
+    return href if href.startswith('http') else None
+
+def _name_from_url(href):
+    """(match name, opponent) from the last URL segment"""
+    last_part = href.split('/')[-1].split('?')[0]
+    opponent = None
+    if '-vs-' in last_part.lower():
+        parts = last_part.split('-vs-')
+        opponent = ' '.join(parts[1].split('-')[:3]).title()
+    return last_part.replace('-', ' ').title(), opponent
+
+def games_from_links(page, team_name, team_url_slug, seen_urls):
+    """Game dicts from the _GAME_LINKS_JS payload - classification, dedup and parsing, no browser calls"""
     page_games = []
+    print(f'   🔍 Found {len(page["controls"])} "View Tickets" elements', flush=True)
+    
+    for control in page['controls']:
+        href = control['href']
+        # Last resort: onclick or data attributes
+        if not href and control['onclick']:
+            url_match = re.search(r'https?://[^\s\'"]+', control['onclick'])
+            if url_match:
+                href = url_match.group(0)
+        href = href or control['data_href']
+        if not href:
+            print(f'      ⚠️ No href found for: {control["tag"]}, text: "{control["text"][:50]}"', flush=True)
+            continue
+        href = _normalize_href(href)
+        if not href or not _is_game_url(href, team_url_slug) or href in seen_urls:
+            continue
+        seen_urls.add(href)
+        
+        match_name = opponent = date = None
+        card_text = control['card']
+        # Extract match name (Arsenal vs Opponent) from the match card/row
+        vs_match = re.search(rf'{re.escape(team_name)}\s+vs\s+(.+)', card_text, re.IGNORECASE)
+        if vs_match:
+            match_name = vs_match.group(0).strip()
+            # Clean up opponent (remove extra text after opponent name)
+            opponent = vs_match.group(1).strip().split('\n')[0].split('|')[0].strip()
+        # Extract date (format: 27/12/25 or similar)
+        for pattern in (r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', r'(\d{1,2}\s+\w+\s+\d{4})'):
+            date_match = re.search(pattern, card_text)
+            if date_match:
+                date = date_match.group(1)
+                break
+        # If no match name found, extract from URL
+        if not match_name:
+            match_name, url_opponent = _name_from_url(href)
+            opponent = opponent or url_opponent
+        
+        game_info = {
+            'url': href,
+            'match_name': match_name or f'{team_name} vs {opponent or "Opponent"}',
+            'team': team_name,
+            'opponent': opponent or 'Unknown',
+            'date': date,
+            'is_home': True
+        }
+        page_games.append(game_info)
+        print(f'      ✅ Found: {game_info["match_name"]} -> {href[:100]}...', flush=True)
+    
+    # Fallback - any link under the team's URL
+    if not page_games:
+        print(f'   ⚠️ No games found via View Tickets, trying fallback method...', flush=True)
+        for href, text in page['links']:
+            href = _normalize_href(href) if href else None
+            if not href or not team_url_slug or f'/{team_url_slug}/' not in href.lower() or '/filter/' in href:
+                continue
+            if href in seen_urls:
+                continue
+            seen_urls.add(href)
+            
+            # Match name from the link text, else from the URL
+            match_name = text if text and len(text) > 5 else _name_from_url(href)[0]
+            opponent = None
+            vs_match = re.search(rf'{re.escape(team_name)}\s+vs\s+(.+)', match_name, re.IGNORECASE)
+            if vs_match:
+                opponent = vs_match.group(1).strip()
+            
+            if 'vs' in match_name.lower() or 'vs' in href.lower():
+                game_info = {
+                    'url': href,
+                    'match_name': match_name,
+                    'team': team_name,
+                    'opponent': opponent or 'Unknown',
+                    'date': None,
+                    'is_home': True
+                }
+                page_games.append(game_info)
+                print(f'      ✅ Found (fallback): {game_info["match_name"]} -> {href[:100]}...', flush=True)
     
+    return page_games
+
+def extract_games_from_current_page(driver, team_name, team_url_slug, seen_urls):
+    """Extract game URLs from the current page by finding 'View Tickets' buttons/links - one script call"""
     try:
         # Scroll to ensure all content is loaded
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
-        
-        # Find "View Tickets" buttons/links - these ARE the game page links
-        # Try multiple approaches to find these elements
-        view_tickets_elements = []
-        
-        # Method 1: Direct <a> tags with "View Tickets" text
-        try:
-            elements = driver.find_elements(By.XPATH, 
-                "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view tickets')] | "
-                "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'buy tickets')]"
-            )
-            view_tickets_elements.extend(elements)
-        except:
-            pass
-        
-        # Method 2: Buttons with "View Tickets" text (might wrap <a> or have onclick)
-        try:
-            elements = driver.find_elements(By.XPATH,
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view tickets')] | "
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'buy tickets')]"
-            )
-            view_tickets_elements.extend(elements)
-        except:
-            pass
-        
-        # Method 3: Any element with "View Tickets" text (broader search)
-        try:
-            elements = driver.find_elements(By.XPATH,
-                "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view tickets')] | "
-                "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'buy tickets')]"
-            )
-            # Filter to only links and buttons
-            view_tickets_elements.extend([e for e in elements if e.tag_name.lower() in ['a', 'button', 'div', 'span']])
-        except:
-            pass
-        
-        # Remove duplicates
-        seen_elements = set()
-        unique_elements = []
-        for elem in view_tickets_elements:
-            try:
-                elem_id = elem.id
-                if elem_id not in seen_elements:
-                    seen_elements.add(elem_id)
-                    unique_elements.append(elem)
-            except:
-                unique_elements.append(elem)
-        
-        view_tickets_elements = unique_elements
-        print(f'   🔍 Found {len(view_tickets_elements)} "View Tickets" elements', flush=True)
-        
-        # Extract URLs from View Tickets buttons/links
-        # Each "View Tickets" button IS the href link to the game page
-        for elem in view_tickets_elements:
-            try:
-                href = None
-                tag_name = elem.tag_name.lower()
-                elem_text = elem.text.strip()
-                
-                # Method 1: If it's an <a> tag, get href directly
-                if tag_name == 'a':
-                    href = elem.get_attribute('href')
-                
-                # Method 2: If it's not an <a>, find the parent <a> tag (button inside link)
-                if not href:
-                    try:
-                        # Look for closest parent <a> tag
-                        parent_a = elem.find_element(By.XPATH, './ancestor::a[1]')
-                        href = parent_a.get_attribute('href')
-                    except:
-                        pass
-                
-                # Method 3: Try to find the <a> tag that wraps this element or is nearby
-                if not href:
-                    try:
-                        # Get the parent container and find all <a> tags in it
-                        # The "View Tickets" button should be near or inside the game link
-                        parent = elem.find_element(By.XPATH, './ancestor::*[position()<=10][1]')
-                        all_links = parent.find_elements(By.TAG_NAME, 'a')
-                        # Find the link that contains the team URL slug and is not a filter
-                        for link in all_links:
-                            link_href = link.get_attribute('href')
-                            if link_href and team_url_slug in link_href.lower() and '/filter/' not in link_href:
-                                href = link_href
-                                break
-                    except:
-                        pass
-                
-                # Method 5: Use JavaScript to get href if element is clickable
-                if not href:
-                    try:
-                        # Try to get href via JavaScript
-                        js_href = driver.execute_script("""
-                            var elem = arguments[0];
-                            if (elem.tagName === 'A') {
-                                return elem.href;
-                            }
-                            var parent = elem.closest('a');
-                            if (parent) {
-                                return parent.href;
-                            }
-                            // Look for <a> tag in parent container
-                            var container = elem.closest('[class*="match"], [class*="event"], [class*="game"], [class*="card"], [class*="row"]');
-                            if (container) {
-                                var link = container.querySelector('a[href*="' + arguments[1] + '"]:not([href*="/filter/"])');
-                                if (link) {
-                                    return link.href;
-                                }
-                            }
-                            return null;
-                        """, elem, team_url_slug)
-                        if js_href:
-                            href = js_href
-                    except:
-                        pass
-                
-                # Method 4: Try onclick or data attributes as last resort
-                if not href:
-                    onclick = elem.get_attribute('onclick')
-                    if onclick:
-                        url_match = re.search(r'https?://[^\s\'"]+', onclick)
-                        if url_match:
-                            href = url_match.group(0)
-                    
-                    if not href:
-                        href = elem.get_attribute('data-href') or elem.get_attribute('data-url')
-                
-                if not href:
-                    print(f'      ⚠️ No href found for: {tag_name}, text: "{elem_text[:50]}"', flush=True)
-                    continue
-                
-                # Normalize href
-                if href.startswith('/'):
-                    href = 'https://www.footballticketnet.com' + href
-                elif not href.startswith('http'):
-                    continue
-                
-                # Check if it's a game URL
-                # Pattern 1: /[team-url-slug]/[game] (old pattern)
-                # Pattern 2: /[competition]/[team]-vs-[opponent] (new pattern like /carabao-cup/arsenal-vs-chelsea)
-                # Must contain team URL slug or team name and "vs" or be a team-football-tickets URL
-                # Must NOT be a filter page
-                is_game_url = False
-                if '/filter/' not in href.lower():
-                    if f'/{team_url_slug}/' in href.lower():
-                        is_game_url = True
-                    elif team_url_slug.split('-')[0] in href.lower() and ('vs' in href.lower() or '-vs-' in href.lower()):
-                        is_game_url = True
-                
-                if is_game_url:
-                    # Skip if we've seen this URL
-                    if href in seen_urls:
-                        continue
-                    seen_urls.add(href)
-                    
-                    # Try to get match name from nearby elements (parent container)
-                    match_name = None
-                    opponent = None
-                    date = None
-                    
-                    try:
-                        # Look for match name in parent container (the match card/row)
-                        parent = elem.find_element(By.XPATH, './ancestor::*[contains(@class, "match") or contains(@class, "event") or contains(@class, "game") or contains(@class, "card") or contains(@class, "row")][1]')
-                        parent_text = parent.text
-                        
-                        # Extract match name (Arsenal vs Opponent)
-                        vs_match = re.search(rf'{re.escape(team_name)}\s+vs\s+(.+)', parent_text, re.IGNORECASE)
-                        if vs_match:
-                            match_name = vs_match.group(0).strip()
-                            opponent = vs_match.group(1).strip()
-                            # Clean up opponent (remove extra text after opponent name)
-                            opponent = opponent.split('\n')[0].split('|')[0].strip()
-                        
-                        # Extract date (format: 27/12/25 or similar)
-                        date_patterns = [
-                            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                            r'(\d{1,2}\s+\w+\s+\d{4})'
-                        ]
-                        for pattern in date_patterns:
-                            date_match = re.search(pattern, parent_text)
-                            if date_match:
-                                date = date_match.group(1)
-                                break
-                    except:
-                        pass
-                    
-                    # If no match name found, extract from URL
-                    if not match_name:
-                        url_parts = href.split('/')
-                        if len(url_parts) > 0:
-                            last_part = url_parts[-1].split('?')[0]
-                            match_name = last_part.replace('-', ' ').title()
-                            # Try to extract opponent from URL
-                            if '-vs-' in last_part.lower():
-                                parts = last_part.split('-vs-')
-                                if len(parts) > 1:
-                                    opponent_parts = parts[1].split('-')[:3]
-                                    opponent = ' '.join(opponent_parts).title()
-                    
-                    game_info = {
-                        'url': href,
-                        'match_name': match_name or f'{team_name} vs {opponent or "Opponent"}',
-                        'team': team_name,
-                        'opponent': opponent or 'Unknown',
-                        'date': date,
-                        'is_home': True
-                    }
-                    
-                    page_games.append(game_info)
-                    print(f'      ✅ Found: {game_info["match_name"]} -> {href[:100]}...', flush=True)
-                    
-            except Exception as e:
-                continue
-        
-        # Method 2: Fallback - find all links with arsenal in URL
-        if len(page_games) == 0:
-            print(f'   ⚠️ No games found via View Tickets, trying fallback method...', flush=True)
-            all_links = driver.find_elements(By.TAG_NAME, 'a')
-            
-            for link in all_links:
-                try:
-                    href = link.get_attribute('href')
-                    text = link.text.strip()
-                    
-                    if not href:
-                        continue
-                    
-                    # Normalize href
-                    if href.startswith('/'):
-                        href = 'https://www.footballticketnet.com' + href
-                    elif not href.startswith('http'):
-                        continue
-                    
-                    # Check if it's a game URL
-                    if f'/{team_url_slug}/' in href.lower() and '/filter/' not in href:
-                        if href in seen_urls:
-                            continue
-                        seen_urls.add(href)
-                        
-                        # Extract match name from text or URL
-                        match_name = text if text and len(text) > 5 else None
-                        if not match_name:
-                            url_parts = href.split('/')
-                            if len(url_parts) > 0:
-                                last_part = url_parts[-1].split('?')[0]
-                                match_name = last_part.replace('-', ' ').title()
-                        
-                        # Extract opponent
-                        opponent = None
-                        if match_name:
-                            vs_match = re.search(rf'{re.escape(team_name)}\s+vs\s+(.+)', match_name, re.IGNORECASE)
-                            if vs_match:
-                                opponent = vs_match.group(1).strip()
-                        
-                        if 'vs' in (match_name or '').lower() or 'vs' in href.lower():
-                            game_info = {
-                                'url': href,
-                                'match_name': match_name or f'{team_name} vs Opponent',
-                                'team': team_name,
-                                'opponent': opponent or 'Unknown',
-                                'date': None,
-                                'is_home': True
-                            }
-                            page_games.append(game_info)
-                            print(f'      ✅ Found (fallback): {game_info["match_name"]} -> {href[:100]}...', flush=True)
-                except:
-                    continue
+        wait_ready(driver, 'ftn_team_games', 'after scroll')
         
+        start = time.time()
+        page = driver.execute_script(_GAME_LINKS_JS, (team_url_slug or '').lower())
+        page_games = games_from_links(page, team_name, team_url_slug, seen_urls)
+        print(f'   ⏱️ Game discovery: {len(page["controls"])} controls, {len(page["links"])} links, '
+              f'{len(page_games)} games in {time.time() - start:.2f}s', flush=True)
         return page_games
         
     except Exception as e:
@@ -435,7 +330,7 @@ def extract_home_game_urls(driver, team_url, team_name):
     
     try:
         driver.get(team_url)
-        time.sleep(6)  # Wait for page to load
+        wait_ready(driver, 'ftn_team_games')  # Wait until the games are listed
         
         # Wait for page to load
         WebDriverWait(driver, 15).until(
@@ -460,9 +355,9 @@ def extract_home_game_urls(driver, team_url, team_name):
                     if view_all_btn.is_displayed() and view_all_btn.is_enabled():
                         print(f'   🔘 Clicking "View All" button to show all games...', flush=True)
                         driver.execute_script("arguments[0].scrollIntoView(true);", view_all_btn)
-                        time.sleep(1)
+                        before = page_state(driver, 'ftn_team_games')
                         view_all_btn.click()
-                        time.sleep(5)  # Wait for all games to load
+                        wait_ready(driver, 'ftn_team_games', 'after View All', baseline=before)  # Wait for all games to load
                         view_all_clicked = True
                         break
                 except:
@@ -472,7 +367,7 @@ def extract_home_game_urls(driver, team_url, team_name):
         
         # Scroll to bottom to ensure all content is loaded
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
+        wait_ready(driver, 'ftn_team_games', 'after scroll')
         
         # Extract team URL slug from team_url (e.g., "fc-barcelona-football-tickets" from URL)
         team_url_slug = None
@@ -512,7 +407,7 @@ def scrape_game_prices(driver, game_url, game_name):
     
     try:
         driver.get(game_url)
-        time.sleep(8)  # Wait for page to fully load
+        wait_ready(driver, 'ftn_event')  # Wait until the ticket prices are on the page
         
         # Wait for page to load
         WebDriverWait(driver, 15).until(
@@ -538,9 +433,9 @@ def scrape_game_prices(driver, game_url, game_name):
                         if 'active' not in classes.lower() and 'selected' not in classes.lower():
                             print(f'      🔘 Clicking filter: "Up To 2 Seats Together"...', flush=True)
                             driver.execute_script("arguments[0].scrollIntoView(true);", filter_btn)
-                            time.sleep(1)
+                            before = page_state(driver, 'ftn_filter')
                             filter_btn.click()
-                            time.sleep(3)  # Wait for filter to apply
+                            wait_ready(driver, 'ftn_filter', baseline=before)  # Wait for filter to apply
                             break
                 except:
                     continue
@@ -549,7 +444,7 @@ def scrape_game_prices(driver, game_url, game_name):
         
         # Scroll to load all tickets
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        wait_ready(driver, 'ftn_event', 'after scroll')
         
         try:
             body_text = driver.find_element(By.TAG_NAME, 'body').text
@@ -672,68 +567,42 @@ def run_team_scraper(team_key='arsenal'):
     print(f'\n🚀 Starting FTN Team Scraper for {team_name}...', flush=True)
     print(f'   URL: {team_url}', flush=True)
     
-    # Load existing data
-    existing_data = {}
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            with open(OUTPUT_FILE, 'r') as f:
-                existing_data = json.load(f)
-        except:
-            existing_data = {}
-    
-    # Initialize team data if not exists
-    if team_key not in existing_data:
-        # Try to load from individual team file first (if manually created)
-        team_specific_file = f'{team_key}_prices.json'
-        if os.path.exists(team_specific_file):
-            try:
-                with open(team_specific_file, 'r') as f:
-                    team_file_data = json.load(f)
-                    existing_data[team_key] = {
-                        'team_name': team_file_data.get('team_name', team_name),
-                        'team_url': team_file_data.get('team_url', team_url),
-                        'games': team_file_data.get('games', []),
-                        'last_updated': team_file_data.get('last_updated')
-                    }
-                    print(f'   📂 Loaded existing data from {team_specific_file}', flush=True)
-            except Exception as e:
-                print(f'   ⚠️ Error loading {team_specific_file}: {e}', flush=True)
-                existing_data[team_key] = {
-                    'team_name': team_name,
-                    'team_url': team_url,
-                    'games': [],
-                    'last_updated': None
-                }
+    # One run per team at a time - a second one would overwrite this run's manifest
+    store = TeamStore()
+    try:
+        with store.lock(team_key, timeout=0):
+            scrape_team(store, team_key, team_name, team_url)
+    except LockTimeout:
+        print(f'⚠️ {team_name} is already being scraped by another run - skipping', flush=True)
+
+def scrape_team(store, team_key, team_name, team_url):
+    """One locked run: update the game list, append changed prices, save the manifest"""
+    # Load this team's manifest (first run: split the legacy ftn_teams_data.json / {team_key}_prices.json)
+    manifest = store.load_manifest(team_key)
+    if manifest is None:
+        legacy = load_legacy_team(team_key)
+        if legacy is not None:
+            manifest = store.import_team(team_key, legacy)
+            print(f'   📂 Migrated existing data to {store.root}/{team_key}/', flush=True)
         else:
-            existing_data[team_key] = {
-                'team_name': team_name,
-                'team_url': team_url,
-                'games': [],
-                'last_updated': None
-            }
-    
-    driver = get_driver()
-    if not driver:
-        print('❌ Failed to initialize driver', flush=True)
-        return
+            manifest = {'team_name': team_name, 'team_url': team_url, 'games': [], 'last_updated': None}
     
+    pool = BrowserPool(get_driver, attempts=2)  # a page whose browser crashed is retried once on a fresh one
     try:
-        # Step 1: Extract all home game URLs from team page (with pagination)
-        current_games = extract_home_game_urls(driver, team_url, team_name)
+        # Step 1: Extract all home game URLs from team page (with pagination) - its browser is reused below
+        current_games = pool.map(lambda driver, url: extract_home_game_urls(driver, url, team_name),
+                                 [team_url], url=lambda url: url)[0] or []
         
         # Step 2: Update game list
         # - Add new games
         # - Remove games that no longer exist (but keep history)
-        existing_games = {g['url']: g for g in existing_data[team_key]['games']}
+        existing_games = {g['url']: g for g in manifest['games']}
         current_urls = {g['url']: g for g in current_games}
         
         # Add new games
         for game in current_games:
             if game['url'] not in existing_games:
-                existing_games[game['url']] = {
-                    **game,
-                    'price_history': []
-                }
+                existing_games[game['url']] = store.add_game(manifest, game)
                 print(f'   ➕ Added new game: {game["match_name"]}', flush=True)
         
         # Mark games for removal (but keep history)
@@ -747,63 +616,63 @@ def run_team_scraper(team_key='arsenal'):
         run_timestamp = datetime.now().isoformat()
         print(f'\n   📅 Run timestamp: {run_timestamp}', flush=True)
         print(f'   📊 Scraping prices for {len(current_urls)} games...\n', flush=True)
+        new_snapshots = []
         
-        for i, (url, game) in enumerate(current_urls.items(), 1):
+        def scrape(driver, job):
+            i, url = job
+            print(f'   [{i}/{len(current_urls)}] {existing_games[url]["match_name"]}...', flush=True)
+            return scrape_game_prices(driver, url, existing_games[url]['match_name'])
+        
+        # Games are scraped in parallel; the shards are written here, one game at a time
+        all_prices = pool.map(scrape, enumerate(current_urls, 1), url=lambda job: job[1])
+        
+        for url, prices in zip(current_urls, all_prices):
             game_data = existing_games[url]
-            print(f'   [{i}/{len(current_urls)}] {game_data["match_name"]}...', flush=True)
-            
-            prices = scrape_game_prices(driver, url, game_data['match_name'])
-            
             if prices:
                 # Count total blocks/categories
                 total_blocks = sum(len(blocks) for blocks in prices.values())
-                # Add price snapshot to history
+                # Append to this game's shard only - and only if the prices changed
                 price_snapshot = {
                     'timestamp': run_timestamp,
                     'prices': prices  # Format: {category: {block: price}}
                 }
-                game_data['price_history'].append(price_snapshot)
-                game_data['latest_prices'] = prices
-                game_data['last_scraped'] = run_timestamp
-                print(f'      ✅ Found {len(prices)} categories with {total_blocks} blocks', flush=True)
+                written = store.append_snapshot(team_key, game_data, price_snapshot)
+                new_snapshots.extend((game_data, snapshot) for snapshot in written)
+                print(f'   ✅ {game_data["match_name"]}: {len(prices)} categories with {total_blocks} blocks'
+                      f'{"" if written else " (unchanged)"}', flush=True)
                 # Show sample prices
                 for cat, blocks in list(prices.items())[:3]:
                     for block, price in list(blocks.items())[:2]:
                         print(f'         {cat} - Block {block}: ${price:.2f}', flush=True)
             else:
-                print(f'      ⚠️ No prices found', flush=True)
-            
-            time.sleep(3)  # Be nice to the server
+                print(f'   ⚠️ {game_data["match_name"]}: No prices found', flush=True)
         
-        # Update existing data
-        existing_data[team_key]['games'] = list(existing_games.values())
-        existing_data[team_key]['last_updated'] = run_timestamp
+        # Save the manifest (the index of this team's shards)
+        manifest['last_updated'] = run_timestamp
+        store.save_manifest(team_key, manifest)
+        print(f'   💾 Saved {team_name} data to {store.manifest_path(team_key)}', flush=True)
         
-        # Save to main teams file
-        with open(OUTPUT_FILE, 'w') as f:
-            json.dump(existing_data, f, indent=2)
-        
-        # Also save team-specific file (for backward compatibility and easier access)
-        team_specific_file = f'{team_key}_prices.json'
-        team_data = existing_data[team_key]
-        with open(team_specific_file, 'w') as f:
-            json.dump(team_data, f, indent=2)
-        print(f'   💾 Saved {team_name} data to {team_specific_file}', flush=True)
+        # Indexed copy for history queries (a failure here must not lose the save above)
+        try:
+            db = PriceDB()
+            rows = sum(db.record_team_prices(team_key, game, snapshot['timestamp'], snapshot['prices'])
+                       for game, snapshot in new_snapshots)
+            print(f'   💾 Recorded {rows} prices in {db.path}', flush=True)
+        except Exception as db_err:
+            print(f'   ⚠️ Could not update price database: {db_err}', flush=True)
         
         print(f'\n✅ Scraper complete!', flush=True)
         print(f'   Total games: {len(existing_games)}', flush=True)
         print(f'   Active games: {len(current_urls)}', flush=True)
         print(f'   Removed games: {len(removed_games)}', flush=True)
+        wait_summary()
         
     except Exception as e:
         print(f'❌ Error in scraper: {e}', flush=True)
         import traceback
         traceback.print_exc()
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        pool.close()
 
 if __name__ == '__main__':
     # Default to arsenal, can be overridden
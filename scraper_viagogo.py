@@ -8,6 +8,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
+from browser_pool import BrowserPool, POOL_WORKERS, is_browser_crash
+from match_registry import stamp_match_keys
+from page_wait import page_state, wait_ready, summary as wait_summary
+from viagogo_network import drain, extract_prices_network
+from price_log import append_changes
+from price_db import PriceDB
 
 # Fix encoding for Windows
 if sys.platform == 'win32':
@@ -18,8 +24,14 @@ if sys.platform == 'win32':
 # ==========================================
 # ⚙️ CONFIGURATION
 # ==========================================
-OUTPUT_FILE = 'prices.json'
+OUTPUT_FILE = 'prices.ndjson'        # append-only log, one record per line
+LEGACY_OUTPUT_FILE = 'prices.json'   # migrated into OUTPUT_FILE on first append
 GAMES_FILE = 'all_games_to_scrape.json'
+# Where extract_prices starts - each falls back to the next:
+#   'network': the listing JSON the page fetches, 'script': one in-page script, 'dom': element by element
+# 'network' stays opt-in until `python viagogo_network.py check` passes on recorded fixtures;
+# its result is only used when the next mode finds no more categories
+EXTRACTION_MODE = os.environ.get('VIAGOGO_EXTRACTION', 'script')
 
 # ==========================================
 # UTILS
@@ -33,12 +45,6 @@ def load_json(path, default):
     except:
         return default
 
-def append_json(path, rows):
-    data = load_json(path, [])
-    data.extend(rows)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
 # ==========================================
 # PRICE EXTRACTION - Simple HTML/DOM approach
 # ==========================================
@@ -216,11 +222,154 @@ def extract_prices_simple(driver):
         print(f"      ⚠️ Extraction error after {elapsed:.1f}s: {str(e)[:50]}", flush=True)
         return prices  # Return what we have
 
+# ==========================================
+# PRICE EXTRACTION - One in-page script
+# ==========================================
+# Collects in a single execute_script what extract_prices_simple reads element by
+# element: the same XPath selections and limits, each price element's own text and
+# aria-label, and the textContent of it and its ancestors (shared in `texts`).
+_PAGE_JS = r"""
+function xpath(expr) {
+    var result = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+var texts = [], ids = new Map();
+function textId(node) {
+    if (!ids.has(node)) { ids.set(node, texts.length); texts.push(node.textContent || ''); }
+    return ids.get(node);
+}
+var aria = xpath('//*[@aria-label]').slice(0, 50).map(function (el) { return el.getAttribute('aria-label') || ''; });
+var prices = xpath("//*[contains(text(), '$') or contains(@aria-label, '$')]").slice(0, 100).map(function (el) {
+    var chain = [];
+    for (var node = el; node && node.nodeType === 1 && chain.length < 5; node = node.parentElement) chain.push(textId(node));
+    return {text: el.innerText || el.textContent || '', aria: el.getAttribute('aria-label') || '', chain: chain};
+});
+return {aria: aria, prices: prices, texts: texts, body: document.body ? document.body.innerText.slice(0, 50000) : ''};
+"""
+
+def _category_in(text):
+    cat_match = re.search(r'(?:Category|Cat)\s+([1-4])\b', text or '', re.I)
+    return f"Category {cat_match.group(1)}" if cat_match else None
+
+def _price_in(text):
+    """First price-like number in the text, if it is in the sane range"""
+    price_match = re.search(r'(?:\$|USD)?\s*([\d,]{2,})', text or '')
+    if not price_match:
+        return None
+    try:
+        price_val = float(price_match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    return price_val if 35 <= price_val <= 50000 else None
+
+def prices_from_page(page):
+    """extract_prices_simple's three strategies, run locally on the _PAGE_JS payload"""
+    prices = {}
+    
+    # Strategy 1: aria-labels naming a category and a price
+    for aria_text in page['aria']:
+        cat_name = _category_in(aria_text)
+        if not cat_name or cat_name in prices:
+            continue
+        price_val = _price_in(aria_text)
+        if price_val is not None:
+            prices[cat_name] = price_val
+    
+    # Strategy 2: price elements and the nearest category label among their ancestors
+    if len(prices) < 4:
+        for elem in page['prices']:
+            price_val = _price_in(elem['text'])
+            if price_val is None:
+                continue
+            category_found = next((c for c in (_category_in(page['texts'][i]) for i in elem['chain']) if c), None)
+            category_found = category_found or _category_in(elem['aria'])
+            if category_found and (category_found not in prices or price_val < prices[category_found]):
+                prices[category_found] = price_val
+    
+    # Strategy 3: text scan for remaining categories
+    if len(prices) < 3 or 'Category 1' not in prices:
+        body_text = page['body']
+        for cat_num in ['1', '2', '3', '4']:
+            cat_name = f"Category {cat_num}"
+            if cat_name in prices:
+                continue
+            pattern = rf"(?:Category|Cat)\s+{cat_num}\b[^$]*?(?:\$|USD)?\s*([\d,]{{2,}})"
+            matches = list(re.finditer(pattern, body_text, re.I | re.DOTALL))[:5]
+            candidates = [p for p in (_price_in(m.group(1)) for m in matches) if p is not None]
+            if candidates:
+                prices[cat_name] = min(candidates)
+    return prices
+
+def extract_prices_script(driver):
+    """Prices via one execute_script; None if the script could not run (the DOM strategies take over)"""
+    try:
+        page = driver.execute_script(_PAGE_JS)
+    except Exception as e:
+        if is_browser_crash(e):
+            raise
+        print(f"      ⚠️ In-page extraction failed: {str(e)[:50]}", flush=True)
+        return None
+    return prices_from_page(page)
+
+# ==========================================
+# PRICE EXTRACTION - Mode selection
+# ==========================================
+class RoundTrips:
+    """Counts the WebDriver commands sent while active (element calls go through driver.execute too)"""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+    
+    def __enter__(self):
+        execute = self.driver.execute
+        def counted(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+        self.driver.execute = counted
+        return self
+    
+    def __exit__(self, *exc):
+        del self.driver.execute
+
+EXTRACTORS = [
+    ('network', extract_prices_network),
+    ('script', extract_prices_script),
+    ('dom', extract_prices_simple),
+]
+
+def extract_prices(driver):
+    """
+    Prices of the loaded page, starting at EXTRACTION_MODE and falling back to the
+    slower modes. The network capture is always checked against the next mode and
+    only kept when that one finds no more categories. Logs time and WebDriver round
+    trips per mode.
+    """
+    names = [name for name, _ in EXTRACTORS]
+    start_at = names.index(EXTRACTION_MODE if EXTRACTION_MODE in names else 'script')
+    captured = {}
+    for name, extractor in EXTRACTORS[start_at:]:
+        start = time.time()
+        with RoundTrips(driver) as trips:
+            prices = extractor(driver)
+        print(f"      📊 {name} extraction: {len(prices or {})} categories in {time.time() - start:.2f}s, "
+              f"{trips.count} WebDriver round trips", flush=True)
+        if name == 'network':
+            # The capture may have missed listings or misread a payload - compare with the page
+            captured = prices or {}
+            continue
+        if prices is None:
+            continue  # this mode failed - the next one decides
+        return captured if captured and len(captured) >= len(prices) else prices
+    return captured
+
 # ==========================================
 # DRIVER SETUP - Simple for local use
 # ==========================================
-def get_driver():
-    """Get a Chrome driver instance - optimized for local use"""
+def get_driver(network_log=None):
+    """Get a Chrome driver instance - optimized for local use (network_log defaults to network mode)"""
     import random
     
     # Add small random delay to prevent both scrapers from initializing at exact same time
@@ -255,6 +404,13 @@ def get_driver():
         
         options.page_load_strategy = 'eager'
         
+        # DevTools Network events in the performance log, for extract_prices_network only -
+        # the log buffers every event of every page, so the other modes leave it off
+        if network_log is None:
+            network_log = EXTRACTION_MODE == 'network'
+        if network_log:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
         for attempt in range(5):  # Increased retries
             try:
                 driver = uc.Chrome(
@@ -304,6 +460,77 @@ def get_driver():
 # ==========================================
 # MAIN SCRAPER
 # ==========================================
+def scrape_match(driver, game, timestamp):
+    """One game's price records ([] if none found); a dead browser is raised to the pool"""
+    match_name = game.get('match_name', 'Unknown Match')
+    url = game['url']
+    clean_url = url.split('&Currency')[0].split('?Currency')[0]
+    
+    # Ensure USD currency in URL
+    target_url = url + ('&Currency=USD' if '?' in url else '?Currency=USD')
+    
+    for attempt in range(2):  # 2 attempts per match
+        try:
+            # The browser is reused: forget the previous page's network events
+            if EXTRACTION_MODE == 'network':
+                drain(driver)
+            # Load page
+            try:
+                driver.get(target_url)
+            except Exception as load_error:
+                if 'timeout' in str(load_error).lower():
+                    try:
+                        driver.execute_script("window.stop();")
+                    except:
+                        pass
+                else:
+                    raise load_error
+            
+            # Wait until the prices are on the page (or it has clearly loaded without any)
+            wait_ready(driver, 'viagogo_event')
+            
+            # Extract prices from the captured listing JSON, else with the simple HTML method
+            prices = extract_prices(driver)
+            
+            if not prices and attempt == 0:
+                # Try clicking listings button on first attempt
+                try:
+                    listings_els = driver.find_elements(By.XPATH, 
+                        "//*[contains(text(), 'listings') and string-length(text()) < 30]")
+                    for le in listings_els[:3]:
+                        if le.is_displayed():
+                            try:
+                                before = page_state(driver, 'viagogo_event')
+                                driver.execute_script("arguments[0].click();", le)
+                                wait_ready(driver, 'viagogo_event', 'after listings click', baseline=before)
+                                prices = extract_prices(driver)
+                                if prices:
+                                    break
+                            except:
+                                continue
+                except:
+                    pass
+            
+            if prices:
+                print(f'   ✅ {match_name[:40]}: {json.dumps(prices)}', flush=True)
+                return [{
+                    'match_url': clean_url,
+                    'match_name': match_name,
+                    'category': cat,
+                    'price': price,
+                    'currency': 'USD',
+                    'timestamp': timestamp
+                } for cat, price in prices.items()]
+            
+            print(f'   ❌ {match_name[:40]}: No data found (attempt {attempt+1}/2)', flush=True)
+        
+        except Exception as e:
+            # A dead browser goes back to the pool, which restarts it and retries the match
+            if is_browser_crash(e):
+                raise
+            print(f"      ⚠️ Error (attempt {attempt+1}/2): {str(e).lower()[:80]}", flush=True)
+    return []
+
 def run():
     start_time = time.time()
     print(f'\n[{datetime.now().strftime("%H:%M")}] 🚀 VIAGOGO SCRAPER STARTING (SIMPLE HTML APPROACH)...', flush=True)
@@ -313,167 +540,46 @@ def run():
         print("ERROR: No games file found", flush=True)
         return
 
-    print(f"   Target: {len(games)} games...", flush=True)
+    print(f"   Target: {len(games)} games, {POOL_WORKERS} browsers...", flush=True)
 
-    driver = None
     timestamp = datetime.now().isoformat()
     results = []
 
+    def scrape(driver, job):
+        i, game = job
+        print(f'[{i}/{len(games)}] {game.get("match_name", "Unknown Match")[:40]}...', flush=True)
+        return scrape_match(driver, game, timestamp)
+
     try:
-        for i, game in enumerate(games, 1):
-            # Restart driver every 5 matches to prevent crashes (more frequent restarts)
-            if i > 1 and i % 5 == 1:
-                if driver:
-                    try:
-                        driver.quit()
-                    except:
-                        pass
-                    driver = None
-                    time.sleep(2)  # Wait before restart
-                
-                print(f"   [RESTART] Scheduled driver restart (match {i})...", flush=True)
-            
-            # Check if driver is still alive before using it
-            if driver:
-                try:
-                    # Quick health check
-                    driver.current_url
-                except Exception as health_check:
-                    print(f"   ⚠️ Driver unhealthy, restarting... ({str(health_check)[:50]})", flush=True)
-                    try:
-                        driver.quit()
-                    except:
-                        pass
-                    driver = None
-            
-            if not driver:
-                driver = get_driver()
-                if not driver:
-                    print(f"   ❌ Failed to get driver, skipping match {i}", flush=True)
-                    continue
-            
-            match_name = game.get('match_name', 'Unknown Match')
-            url = game['url']
-            clean_url = url.split('&Currency')[0].split('?Currency')[0]
-            
-            # Ensure USD currency in URL
-            target_url = url + ('&Currency=USD' if '?' in url else '?Currency=USD')
-            
-            print(f'[{i}/{len(games)}] {match_name[:40]}... ', end='', flush=True)
-            
-            for attempt in range(2):  # 2 attempts per match
-                try:
-                    # Load page
-                    try:
-                        driver.get(target_url)
-                    except Exception as load_error:
-                        if 'timeout' in str(load_error).lower():
-                            try:
-                                driver.execute_script("window.stop();")
-                            except:
-                                pass
-                        else:
-                            raise load_error
-                    
-                    # Wait for page to load
-                    time.sleep(8)
-                    
-                    # Extract prices with simple HTML method
-                    prices = extract_prices_simple(driver)
-                    
-                    if prices:
-                        # Save results
-                        for cat, price in prices.items():
-                            results.append({
-                                'match_url': clean_url,
-                                'match_name': match_name,
-                                'category': cat,
-                                'price': price,
-                                'currency': 'USD',
-                                'timestamp': timestamp
-                            })
-                        
-                        print(f'✅ {json.dumps(prices)}', flush=True)
-                        break  # Success, move to next match
-                    else:
-                        if attempt == 0:
-                            # Try clicking listings button on first attempt
-                            try:
-                                listings_els = driver.find_elements(By.XPATH, 
-                                    "//*[contains(text(), 'listings') and string-length(text()) < 30]")
-                                for le in listings_els[:3]:
-                                    if le.is_displayed():
-                                        try:
-                                            driver.execute_script("arguments[0].click();", le)
-                                            time.sleep(2)
-                                            prices = extract_prices_simple(driver)
-                                            if prices:
-                                                break
-                                        except:
-                                            continue
-                            except:
-                                pass
-                        
-                        if not prices:
-                            print('❌ No data found', flush=True)
-                            if attempt == 1:
-                                break  # Give up after 2 attempts
-                
-                except Exception as e:
-                    msg = str(e).lower()
-                    error_str = str(e)
-                    print(f"      ⚠️ Error (attempt {attempt+1}/2): {msg[:80]}", flush=True)
-                    
-                    # Check if critical error requiring restart (including connection pool errors)
-                    is_critical = any(keyword in msg or keyword in error_str.lower() for keyword in [
-                        'crashed', 'disconnected', 'tab crashed', 'target closed',
-                        'chrome not reachable', 'timeout: timed out receiving message',
-                        'httpconnectionpool', 'connectionpool', 'max retries exceeded',
-                        'connection refused', 'connection aborted', 'broken pipe',
-                        'localhost', 'port 6'  # Chrome DevTools Protocol port errors
-                    ])
-                    
-                    if is_critical:
-                        print(f"      🔥 Critical driver error detected, restarting driver...", flush=True)
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                        driver = None
-                        time.sleep(3)  # Wait longer before restart
-                        driver = get_driver()
-                        if not driver:
-                            print(f"      ❌ Failed to restart driver, skipping match {i}", flush=True)
-                            break  # Skip this match
-                        # Continue to retry with new driver
-                        if attempt == 0:
-                            continue  # Retry with new driver
-                    
-                    if attempt == 1:
-                        break  # Move to next match after 2 attempts
-            
-            time.sleep(0.5)  # Brief pause between matches
-        
-    except KeyboardInterrupt:
-        print(f"\n[WARN] Scraper interrupted by user", flush=True)
+        # Restart each browser every 5 matches to prevent crashes; a crashed one is restarted and the match retried
+        with BrowserPool(get_driver, restart_every=5, attempts=2) as pool:
+            for records in pool.map(scrape, enumerate(games, 1), url=lambda job: job[1]['url']):
+                results.extend(records or [])
     except Exception as e: 
         print(f"ERROR: Fatal error in scraper: {e}", flush=True)
         import traceback
         traceback.print_exc()
-    finally:
-        try:
-            if driver:
-                driver.quit()
-        except:
-            pass
 
     if results:
+        written = []
+        db = PriceDB()
         try:
-            append_json(OUTPUT_FILE, results)
-            print(f"\n[OK] Saved {len(results)} rows to {OUTPUT_FILE}", flush=True)
+            stamp_match_keys(results)
+            # Whether prices.db held the log before this append - decides add vs. re-import below
+            db_synced = db.synced('viagogo', OUTPUT_FILE)
+            # Only prices that changed since the last run are stored; the rest just move the heartbeat
+            written = append_changes(OUTPUT_FILE, results, legacy_path=LEGACY_OUTPUT_FILE)
+            print(f"\n[OK] Saved {len(results)} prices to {OUTPUT_FILE} ({len(written)} change rows)", flush=True)
         except Exception as save_err:
             print(f"\n[ERROR] Error saving results: {str(save_err)[:50]}", flush=True)
+            db_synced = False  # the log may hold part of the append - re-import it
+        try:
+            db.record_log('viagogo', OUTPUT_FILE, written, db_synced)
+            print(f"[OK] Recorded {len(written)} rows in {db.path}", flush=True)
+        except Exception as db_err:
+            print(f"[WARN] Could not update price database: {str(db_err)[:50]}", flush=True)
     
+    wait_summary()
     runtime = time.time() - start_time
     print(f'[{datetime.now().strftime("%H:%M")}] [DONE] VIAGOGO SCRAPER COMPLETE (runtime: {int(runtime)}s).', flush=True)
 
@@ -0,0 +1,294 @@
+"""
+Sharded Team Price Storage
+Replaces the single ftn_teams_data.json (plus its {team_key}_prices.json copy)
+with one directory per team:
+
+    teams/{team_key}/manifest.json          team info + one small entry per game (the index)
+    teams/{team_key}/games/{game_id}.ndjson  that game's price snapshots, append-only
+
+A scraper run appends to the shards of the games it scraped and rewrites its own
+team's manifest, so runs for different teams never touch the same file.
+
+Shards hold change points: a snapshot is only appended when a game's prices differ
+from the last one stored (preceded by a closing copy of the old prices at the time
+they were last seen). The manifest's last_scraped is the heartbeat that readers
+extend the series to. Snapshots older than a week are moved to
+games/{game_id}.rollup.ndjson as hourly/daily buckets by rollup.py.
+
+Usage:
+    python team_store.py migrate       # one-shot split of ftn_teams_data.json / *_prices.json
+    python team_store.py changepoints  # re-encode existing shards as change points
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+
+from atomic_io import LOCK_TIMEOUT, file_lock, write_json
+from json_stream import iter_object
+from price_log import append_records, iter_records, rollup_path, write_log
+from price_store import CachedFile, file_signature
+
+TEAMS_DIR = 'teams'
+LEGACY_TEAMS_FILE = 'ftn_teams_data.json'
+
+# Per-game keys kept in the manifest (everything but the history itself)
+GAME_INFO_FIELDS = ['url', 'match_name', 'team', 'opponent', 'date', 'is_home']
+
+
+def game_id(url):
+    """https://www.footballticketnet.com/premier-league/arsenal-vs-aston-villa -> arsenal-vs-aston-villa"""
+    slug = (url or '').split('?')[0].rstrip('/').rsplit('/', 1)[-1].lower()
+    return re.sub(r'[^a-z0-9-]+', '-', slug).strip('-') or 'game'
+
+
+class TeamStore:
+    def __init__(self, root=TEAMS_DIR):
+        self.root = root
+
+    # -------------------------------------------------
+    # Paths
+    # -------------------------------------------------
+    def team_keys(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(k for k in os.listdir(self.root) if os.path.exists(self.manifest_path(k)))
+
+    def manifest_path(self, team_key):
+        return os.path.join(self.root, team_key, 'manifest.json')
+
+    def shard_path(self, team_key, gid):
+        return os.path.join(self.root, team_key, 'games', f'{gid}.ndjson')
+
+    def lock(self, team_key, timeout=LOCK_TIMEOUT):
+        """Held by a whole scraper run, so two runs of one team can't overwrite each other's manifest"""
+        return file_lock(self.manifest_path(team_key), timeout)
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+    def load_manifest(self, team_key):
+        path = self.manifest_path(team_key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_history(self, team_key, gid):
+        return list(iter_records(self.shard_path(team_key, gid)))
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+    def save_manifest(self, team_key, manifest):
+        write_json(self.manifest_path(team_key), manifest, indent=2)
+
+    def add_game(self, manifest, game):
+        """New manifest entry for a scraped game (id unique within the team)"""
+        taken = {g['id'] for g in manifest['games']}
+        gid = base = game_id(game.get('url'))
+        n = 2
+        while gid in taken:
+            gid, n = f'{base}-{n}', n + 1
+        entry = {'id': gid, **{k: game.get(k) for k in GAME_INFO_FIELDS},
+                 'latest_prices': {}, 'last_scraped': None,
+                 'price_history_count': 0, 'first_timestamp': None, 'last_timestamp': None}
+        manifest['games'].append(entry)
+        return entry
+
+    def append_snapshot(self, team_key, entry, snapshot):
+        """
+        Change-point append of one {'timestamp', 'prices'} snapshot to a game's shard.
+        Returns the snapshots written - [] when the prices are unchanged, in which
+        case only the entry's last_scraped heartbeat moves.
+        """
+        stored = entry.get('price_history_count', 0)
+        if stored and snapshot['prices'] == entry.get('latest_prices'):
+            entry['last_scraped'] = snapshot['timestamp']
+            return []
+        rows = []
+        if stored and (entry.get('last_scraped') or '') > (entry.get('last_timestamp') or ''):
+            # Close the old prices where they were last observed
+            rows.append({'timestamp': entry['last_scraped'], 'prices': entry.get('latest_prices', {})})
+        rows.append(snapshot)
+        path = self.shard_path(team_key, entry['id'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        append_records(path, rows)
+        entry['latest_prices'] = snapshot['prices']
+        entry['last_scraped'] = snapshot['timestamp']
+        entry['price_history_count'] = stored + len(rows)
+        entry['first_timestamp'] = entry.get('first_timestamp') or rows[0]['timestamp']
+        entry['last_timestamp'] = snapshot['timestamp']
+        return rows
+
+    def encode_changes(self, team_key):
+        """Offline: rewrite every shard of a team as change points"""
+        with self.lock(team_key):
+            manifest = self.load_manifest(team_key)
+            before = after = 0
+            for entry in manifest['games']:
+                history = self.load_history(team_key, entry['id'])
+                changes = encode_snapshots(history)
+                before, after = before + len(history), after + len(changes)
+                if history:
+                    write_log(self.shard_path(team_key, entry['id']), changes)
+                    entry['price_history_count'] = len(changes)
+                    entry['last_timestamp'] = changes[-1]['timestamp']
+            self.save_manifest(team_key, manifest)
+        print(f'[OK] {team_key}: {before} snapshots -> {after} change points')
+
+    def import_team(self, team_key, team_data):
+        """Write shards + manifest for one team in the legacy nested format"""
+        manifest = {
+            'team_name': team_data.get('team_name', team_key.title()),
+            'team_url': team_data.get('team_url', ''),
+            'last_updated': team_data.get('last_updated'),
+            'games': [],
+        }
+        for game in team_data.get('games', []):
+            entry = self.add_game(manifest, game)
+            history = game.get('price_history', [])
+            write_log(self.shard_path(team_key, entry['id']), history)
+            entry['latest_prices'] = game.get('latest_prices', {})
+            entry['last_scraped'] = game.get('last_scraped')
+            entry['price_history_count'] = len(history)
+            if history:
+                entry['first_timestamp'] = history[0].get('timestamp')
+                entry['last_timestamp'] = history[-1].get('timestamp')
+        self.save_manifest(team_key, manifest)
+        return manifest
+
+
+def encode_snapshots(history):
+    """Change points of a chronological snapshot list (closing snapshot before each change)"""
+    changes = []
+    last_seen = None
+    for snapshot in history:
+        if changes and snapshot['prices'] == changes[-1]['prices']:
+            last_seen = snapshot['timestamp']
+            continue
+        if changes and last_seen > changes[-1]['timestamp']:
+            changes.append({'timestamp': last_seen, 'prices': changes[-1]['prices']})
+        changes.append(snapshot)
+        last_seen = snapshot['timestamp']
+    return changes
+
+
+def with_heartbeat(history, entry):
+    """Stored change points plus the current prices at last_scraped, if observed since"""
+    last_scraped = entry.get('last_scraped')
+    if history and last_scraped and last_scraped > history[-1].get('timestamp', ''):
+        return history + [{'timestamp': last_scraped, 'prices': entry.get('latest_prices', {})}]
+    return history
+
+
+def load_legacy_team(team_key, legacy_path=LEGACY_TEAMS_FILE):
+    """A team's nested data from ftn_teams_data.json, else from {team_key}_prices.json"""
+    for path in (legacy_path, f'{team_key}_prices.json'):
+        if not os.path.exists(path):
+            continue
+        try:
+            if path == legacy_path:
+                # Stream the combined file and stop at the team - the other teams are never built
+                team_data = next((value for key, value in iter_object(path) if key == team_key), None)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    team_data = json.load(f)
+        except Exception as e:
+            print(f'[WARN] Could not read {path}: {e}')
+            continue
+        if isinstance(team_data, dict) and team_data.get('games') is not None:
+            return team_data
+    return None
+
+
+def migrate(store=None, legacy_path=LEGACY_TEAMS_FILE):
+    store = store or TeamStore()
+    team_keys = set()
+    if os.path.exists(legacy_path):
+        try:
+            team_keys.update(key for key, _ in iter_object(legacy_path))
+        except ValueError as e:
+            print(f'[WARN] Could not read {legacy_path}: {e}')
+    team_keys.update(name[:-len('_prices.json')] for name in os.listdir('.') if name.endswith('_prices.json'))
+    for team_key in sorted(team_keys):
+        if store.load_manifest(team_key) is not None:
+            print(f'[INFO] {team_key}: already sharded, skipping')
+            continue
+        team_data = load_legacy_team(team_key, legacy_path)
+        if team_data is None:
+            continue
+        manifest = store.import_team(team_key, team_data)
+        snapshots = sum(g['price_history_count'] for g in manifest['games'])
+        print(f'[OK] {team_key}: {len(manifest["games"])} games, {snapshots} snapshots -> {store.root}/{team_key}/')
+
+
+# ---------------------------------------------------------
+# Server-side cache
+# ---------------------------------------------------------
+class TeamCache:
+    """Manifests and game shards as CachedFiles - each re-parsed only when it changes"""
+
+    def __init__(self, store=None):
+        self.store = store or TeamStore()
+        self._manifests = {}
+        self._shards = {}
+
+    def manifest_paths(self):
+        return [self.store.manifest_path(k) for k in self.store.team_keys()]
+
+    def manifest_file(self, team_key):
+        cached = self._manifests.get(team_key)
+        if cached is None:
+            cached = self._manifests[team_key] = CachedFile(
+                self.store.manifest_path(team_key), lambda m: m if isinstance(m, dict) else None, default={})
+        return cached
+
+    def shard_file(self, team_key, gid, rolled_up=False):
+        path = self.store.shard_path(team_key, gid)
+        if rolled_up:
+            path = rollup_path(path)
+        cached = self._shards.get(path)
+        if cached is None:
+            cached = self._shards[path] = CachedFile(
+                path, list, reader=lambda path, default: list(iter_records(path)))
+        return cached
+
+    def manifests(self):
+        """{team_key: manifest} (blocking)"""
+        result = {}
+        for k in self.store.team_keys():
+            manifest = self.manifest_file(k).get()
+            if manifest:
+                result[k] = manifest
+        return result
+
+    async def amanifests(self):
+        result = {}
+        for k in self.store.team_keys():
+            manifest = await self.manifest_file(k).aget()
+            if manifest:
+                result[k] = manifest
+        return result
+
+    async def ahistory(self, team_key, gid):
+        """Rolled-up buckets of older snapshots, then the raw shard - one timeline"""
+        rolled, raw = await asyncio.gather(self.shard_file(team_key, gid, rolled_up=True).aget(),
+                                           self.shard_file(team_key, gid).aget())
+        return rolled + raw if rolled else raw
+
+    def version(self):
+        """Signature of all manifests - changes whenever any team run lands"""
+        return [file_signature(p) for p in self.manifest_paths()]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        migrate()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'changepoints':
+        store = TeamStore()
+        for team_key in store.team_keys():
+            store.encode_changes(team_key)
+    else:
+        print(__doc__)
@@ -0,0 +1,75 @@
+"""
+Streaming reader for the JSON data files (json_stream.py)
+Small chunk sizes put every kind of token across a chunk boundary.
+Run: python -m pytest -q test_json_stream.py
+"""
+import json
+
+import pytest
+
+from json_stream import iter_array, iter_events, iter_object, top_level_type
+from price_log import stream_records
+
+RECORDS = [
+    {'match_name': 'Mexico vs South Africa', 'category': 'Category 1', 'price': 1234.5, 'timestamp': '2026-06-11T14:00:00'},
+    {'match_name': 'Ciudad de México [A, B]: "quoted" {not json}', 'price': 100000, 'blocks': [1, 2.5e3, -7]},
+    {'price': None, 'available': False, 'nested': {'a': [{'b': {}}], 'c': []}},
+    12345678901234567890,
+    'tail',
+]
+
+
+def write(tmp_path, text, name='data.json'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 16])
+def test_array_matches_json_load(tmp_path, chunk_size):
+    path = write(tmp_path, json.dumps(RECORDS, indent=1, ensure_ascii=False))
+    assert list(iter_array(path, chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 1 << 16])
+def test_object_members_in_file_order(tmp_path, chunk_size):
+    data = {'arsenal': {'games': RECORDS[:2]}, 'chelsea': [], 'spurs': 0.25}
+    path = write(tmp_path, json.dumps(data))
+    assert list(iter_object(path, chunk_size)) == list(data.items())
+
+
+def test_number_cut_at_the_chunk_boundary_is_read_whole(tmp_path):
+    path = write(tmp_path, '[1234567, 89]')
+    assert list(iter_array(path, 4)) == [1234567, 89]
+
+
+def test_events(tmp_path):
+    assert list(iter_events(write(tmp_path, ' { "a" : [1] , "b":2 } \n'))) == [
+        ('start_map', None), ('key', 'a'), ('value', [1]), ('key', 'b'), ('value', 2), ('end', None)]
+    assert list(iter_events(write(tmp_path, '[]'))) == [('start_array', None), ('end', None)]
+    assert list(iter_events(write(tmp_path, '42'))) == [('value', 42)]
+
+
+@pytest.mark.parametrize('text', ['[1, 2', '[1 2]', '[1, 2] 3', '{"a" 1}', '{1: 2}'])
+def test_malformed_file_raises_value_error(tmp_path, text):
+    with pytest.raises(ValueError):
+        list(iter_events(write(tmp_path, text), 2))
+
+
+def test_wrong_top_level_type_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_array(write(tmp_path, '{"a": 1}')))
+    with pytest.raises(ValueError):
+        list(iter_object(write(tmp_path, '[1]')))
+
+
+def test_top_level_type(tmp_path):
+    assert top_level_type(write(tmp_path, '  [1]')) == 'array'
+    assert top_level_type(write(tmp_path, '\n{}')) == 'object'
+    assert top_level_type(write(tmp_path, '')) is None
+    assert top_level_type(str(tmp_path / 'missing.json')) is None
+
+
+def test_legacy_records_stream_and_stop_at_a_torn_file(tmp_path):
+    path = write(tmp_path, json.dumps(RECORDS[:3])[:-40], 'prices.json')
+    assert list(stream_records(path)) == RECORDS[:2]
@@ -0,0 +1,126 @@
+"""
+Git merge driver for the price data (merge_prices.py)
+Run: python -m pytest -q test_merge_prices.py
+"""
+import os
+
+import merge_prices
+from merge_prices import merge_files, merge_heartbeats, merge_logs, merge_manifests, repair, split_conflicts
+from price_log import iter_records, write_log
+
+
+def row(timestamp, category='Category 1', price=100.0, match_key='mex-rsa'):
+    return {'source': 'viagogo', 'match_key': match_key, 'category': category, 'timestamp': timestamp, 'price': price}
+
+
+def log(path, rows):
+    write_log(str(path), rows)
+    return str(path)
+
+
+def stamps(path):
+    return [(r['timestamp'], r['category']) for r in iter_records(str(path))]
+
+
+# ---------------------------------------------------------
+# Logs
+# ---------------------------------------------------------
+def test_merge_logs_is_the_sorted_union_without_repeats(tmp_path):
+    ours = log(tmp_path / 'ours.ndjson', [row('2026-10-01T10:00'), row('2026-10-01T12:00'),
+                                         row('2026-10-01T12:00', 'Category 2')])
+    theirs = log(tmp_path / 'theirs.ndjson', [row('2026-10-01T11:00'), row('2026-10-01T12:00'),
+                                             row('2026-10-01T13:00')])
+    assert merge_logs(ours, theirs, ours) == 5
+    assert stamps(ours) == [('2026-10-01T10:00', 'Category 1'), ('2026-10-01T11:00', 'Category 1'),
+                            ('2026-10-01T12:00', 'Category 1'), ('2026-10-01T12:00', 'Category 2'),
+                            ('2026-10-01T13:00', 'Category 1')]
+
+
+def test_same_timestamp_from_different_matches_is_kept(tmp_path):
+    ours = log(tmp_path / 'ours.ndjson', [row('2026-10-01T10:00', match_key='a')])
+    theirs = log(tmp_path / 'theirs.ndjson', [row('2026-10-01T10:00', match_key='b')])
+    assert merge_logs(ours, theirs, ours) == 2
+
+
+def test_out_of_order_log_is_sorted_in_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(merge_prices, 'CHUNK_ROWS', 2)
+    hours = [5, 1, 4, 1, 3, 0, 2]
+    ours = log(tmp_path / 'ours.ndjson', [row(f'2026-10-01T0{h}:00') for h in hours])
+    theirs = log(tmp_path / 'theirs.ndjson', [row('2026-10-01T06:00')])
+    assert merge_logs(ours, theirs, ours) == 7
+    assert [t for t, _ in stamps(ours)] == [f'2026-10-01T0{h}:00' for h in range(7)]
+    # The sorted runs lived in the scratch directory, which is gone
+    assert sorted(n for n in os.listdir(tmp_path) if not n.endswith('.lock')) == ['ours.ndjson', 'theirs.ndjson']
+
+
+# ---------------------------------------------------------
+# JSON sidecars
+# ---------------------------------------------------------
+def test_merge_heartbeats_keeps_the_newest_row_and_the_latest_last_seen():
+    ours = {'last_run': '2026-10-01T12:00', 'series': {
+        'a': {'record': row('2026-10-01T09:00', price=100.0), 'last_seen': '2026-10-01T12:00'},
+        'b': {'record': row('2026-10-01T08:00'), 'last_seen': '2026-10-01T08:00'},
+    }}
+    theirs = {'last_run': '2026-10-01T11:00', 'series': {
+        'a': {'record': row('2026-10-01T10:00', price=120.0), 'last_seen': '2026-10-01T11:00'},
+        'c': {'record': row('2026-10-01T07:00'), 'last_seen': '2026-10-01T07:30'},
+    }}
+    merged = merge_heartbeats(ours, theirs)
+    assert merged['last_run'] == '2026-10-01T12:00'
+    assert sorted(merged['series']) == ['a', 'b', 'c']
+    assert merged['series']['a'] == {'record': row('2026-10-01T10:00', price=120.0), 'last_seen': '2026-10-01T12:00'}
+
+
+def test_merge_manifests_keeps_the_more_recently_scraped_game():
+    ours = {'team': 'arsenal', 'last_updated': '2026-10-02', 'games': [
+        {'id': 'g1', 'last_scraped': '2026-10-02', 'price_history_count': 3, 'first_timestamp': '2026-09-20'},
+        {'id': 'g2', 'last_scraped': '2026-10-01'},
+    ]}
+    theirs = {'last_updated': '2026-10-03', 'games': [
+        {'id': 'g1', 'last_scraped': '2026-10-03', 'price_history_count': 2, 'first_timestamp': '2026-09-10'},
+        {'id': 'g3', 'last_scraped': '2026-10-03'},
+    ]}
+    merged = merge_manifests(ours, theirs)
+    assert merged['team'] == 'arsenal'
+    assert merged['last_updated'] == '2026-10-03'
+    assert [g['id'] for g in merged['games']] == ['g1', 'g2', 'g3']
+    assert merged['games'][0] == {'id': 'g1', 'last_scraped': '2026-10-03', 'price_history_count': 3,
+                                  'first_timestamp': '2026-09-10'}
+
+
+def test_unreadable_sidecar_takes_the_other_side(tmp_path):
+    ours, theirs = tmp_path / 'ours', tmp_path / 'theirs'
+    ours.write_text('{"series": {', encoding='utf-8')
+    theirs.write_text('{"last_run": "2026-10-01", "series": {}}', encoding='utf-8')
+    assert merge_files(str(ours), str(theirs), 'prices.ndjson.heartbeat.json')
+    assert ours.read_text(encoding='utf-8') == '{"last_run":"2026-10-01","series":{}}'
+
+
+# ---------------------------------------------------------
+# Conflict markers
+# ---------------------------------------------------------
+def test_split_conflicts_drops_the_diff3_base(tmp_path):
+    path = tmp_path / 'prices.ndjson'
+    path.write_text('shared\n<<<<<<< HEAD\nmine\n||||||| base\nold\n=======\nyours\n>>>>>>> other\ntail\n',
+                    encoding='utf-8')
+    ours, theirs = tmp_path / 'ours', tmp_path / 'theirs'
+    assert split_conflicts(str(path), str(ours), str(theirs))
+    assert ours.read_text(encoding='utf-8') == 'shared\nmine\ntail\n'
+    assert theirs.read_text(encoding='utf-8') == 'shared\nyours\ntail\n'
+
+
+def test_repair_merges_both_sides_of_a_conflicted_log(tmp_path):
+    path = tmp_path / 'prices.ndjson'
+    log(tmp_path / 'rows', [row(f'2026-10-01T0{h}:00') for h in range(4)])
+    lines = (tmp_path / 'rows').read_text(encoding='utf-8').splitlines(keepends=True)
+    path.write_text(''.join([lines[0], '<<<<<<< HEAD\n', lines[2], '=======\n', lines[1], lines[2],
+                             '>>>>>>> other\n', lines[3]]), encoding='utf-8')
+    assert repair(str(path))
+    assert [t for t, _ in stamps(path)] == [f'2026-10-01T0{h}:00' for h in range(4)]
+    assert not repair(str(path))  # no markers left
+
+
+def test_repair_skips_other_files(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('<<<<<<< HEAD\n=======\n>>>>>>> other\n', encoding='utf-8')
+    assert not repair(str(path))
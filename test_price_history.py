@@ -0,0 +1,75 @@
+"""
+Windowed /history series from change-point storage (price_store.window_series, resample_step)
+and the cursor helpers that page through it (after_cursor, page_before)
+Run: python -m pytest -q test_price_history.py
+"""
+from price_store import after_cursor, page_before, resample_step, window_series
+
+START = '2026-10-16T12:00:00'
+END = '2026-10-17T12:00:00'
+
+
+def row(timestamp, price):
+    return {'category': 'Category 1', 'timestamp': timestamp, 'price': price}
+
+
+def test_unchanged_category_is_carried_through_the_window():
+    rows = [row('2026-10-14T09:00:00', 200.0)]
+    heartbeat = {'last_seen': '2026-10-17T11:00:00', 'price': 200.0}
+    assert window_series(rows, START, END, heartbeat=heartbeat) == [
+        {'timestamp': START, 'price': 200.0},
+        {'timestamp': '2026-10-17T11:00:00', 'price': 200.0},
+    ]
+
+
+def test_change_inside_window_keeps_the_price_in_force_at_start():
+    rows = [row('2026-10-14T09:00:00', 200.0), row('2026-10-17T10:00:00', 250.0)]
+    heartbeat = {'last_seen': '2026-10-17T11:50:00', 'price': 250.0}
+    points = window_series(rows, START, END, heartbeat=heartbeat)
+    assert [p['price'] for p in points] == [200.0, 250.0, 250.0]
+    assert points[0]['timestamp'] == START
+    assert points[-1]['timestamp'] == '2026-10-17T11:50:00'
+
+
+def test_series_is_closed_at_window_end():
+    rows = [row('2026-10-16T20:00:00', 180.0), row('2026-10-18T08:00:00', 190.0)]
+    points = window_series(rows, START, END)
+    assert points[-1] == {'timestamp': END, 'price': 180.0}
+
+
+def test_series_that_ended_before_the_window_is_empty():
+    rows = [row('2026-10-10T09:00:00', 200.0)]
+    assert window_series(rows, START, END, heartbeat={'last_seen': '2026-10-12T00:00:00', 'price': 200.0}) == []
+
+
+def test_since_only_extends_with_the_heartbeat():
+    heartbeat = {'last_seen': '2026-10-17T11:00:00', 'price': 250.0}
+    assert window_series([], START, END, since='2026-10-17T10:00:00', heartbeat=heartbeat) == [
+        {'timestamp': '2026-10-17T11:00:00', 'price': 250.0},
+    ]
+    assert window_series([], START, END, since='2026-10-17T11:00:00', heartbeat=heartbeat) == []
+
+
+def test_step_series_ends_with_the_current_price():
+    rows = [row('2026-10-14T09:00:00', 200.0), row('2026-10-17T10:00:00', 250.0)]
+    heartbeat = {'last_seen': '2026-10-17T11:50:00', 'price': 250.0}
+    points = resample_step(window_series(rows, START, END, heartbeat=heartbeat), 21600, START, END)
+    assert [p['timestamp'] for p in points] == [
+        '2026-10-16T12:00:00', '2026-10-16T18:00:00', '2026-10-17T00:00:00', '2026-10-17T06:00:00',
+        '2026-10-17T11:50:00',
+    ]
+    assert [p['price'] for p in points] == [200.0, 200.0, 200.0, 200.0, 250.0]
+
+
+def test_step_series_on_grid_does_not_repeat_the_stop():
+    points = [row('2026-10-17T00:00:00', 100.0), row('2026-10-17T12:00:00', 120.0)]
+    assert [p['price'] for p in resample_step(points, 21600)] == [100.0, 100.0, 120.0]
+
+
+def test_cursor_helpers_bisect_by_timestamp():
+    items = [row(t, 100.0) for t in ('2026-10-16T12:00:00', '2026-10-16T18:00:00', '2026-10-16T18:00:00',
+                                       '2026-10-17T00:00:00')]
+    assert after_cursor(items, '2026-10-16T18:00:00') == items[3:]
+    assert after_cursor(items, None) is items
+    assert page_before(items, '2026-10-17T00:00:00', 2) == (items[1:3], '2026-10-16T18:00:00')
+    assert page_before(items, '2026-10-16T18:00:00', 5) == (items[:1], None)
@@ -0,0 +1,88 @@
+"""
+Tiered retention (rollup.py): bucketing, folding and re-aging of rollup rows
+Run: python -m pytest -q test_rollup.py
+"""
+from datetime import datetime
+
+from price_log import iter_records, rollup_path, write_log
+from rollup import PRICE_ROWS, SNAPSHOTS, _fold, build_tiers, compact_log, merge_rollups, rollup_series, split_old
+
+EARLY = '2000-01-01T00:00:00'  # daily cutoff that keeps every hourly bucket hourly
+
+
+def row(timestamp, price, category='Category 1'):
+    return {'match_key': 'mex-rsa', 'category': category, 'timestamp': '2026-10-01T' + timestamp, 'price': price}
+
+
+def buckets(rows):
+    return [(r['tier'], r['bucket'][5:16], r['first'][11:], r['min'], r['max'], r['count'], r['price']) for r in rows]
+
+
+def test_bucket_includes_the_price_carried_in_from_before_it():
+    rows = [row('10:05:00', 100.0), row('10:40:00', 120.0), row('11:20:00', 90.0)]
+    assert buckets(rollup_series(rows, 'hourly', carry=150.0)) == [
+        ('hourly', '10-01T10:00', '10:05:00', 100.0, 150.0, 2, 120.0),
+        ('hourly', '10-01T11:00', '11:20:00', 90.0, 120.0, 1, 90.0),
+    ]
+
+
+def test_folding_a_bucket_with_itself_changes_nothing():
+    hourly = rollup_series([row('10:05:00', 100.0), row('10:40:00', 120.0)], 'hourly')
+    assert _fold(hourly + hourly, PRICE_ROWS) == hourly
+
+
+def test_later_pass_in_the_same_bucket_adds_its_count():
+    existing = rollup_series([row('10:05:00', 100.0), row('10:20:00', 110.0)], 'hourly')
+    rolled = build_tiers(existing, [row('10:40:00', 130.0)], EARLY)
+    assert buckets(rolled) == [('hourly', '10-01T10:00', '10:05:00', 100.0, 130.0, 3, 130.0)]
+
+
+def test_hourly_buckets_past_the_daily_cutoff_become_one_daily_bucket():
+    rows = [row('10:05:00', 150.0), row('10:40:00', 100.0), row('11:20:00', 90.0)]
+    later = {**row('11:20:00', 95.0), 'timestamp': '2026-10-02T09:30:00'}
+    rolled = build_tiers([], rows + [later], '2026-10-02T00:00:00')
+    assert buckets(rolled) == [
+        ('daily', '10-01T00:00', '10:05:00', 90.0, 150.0, 3, 90.0),
+        ('hourly', '10-02T09:00', '09:30:00', 90.0, 95.0, 1, 95.0),
+    ]
+
+
+def test_snapshot_buckets_widen_per_category_and_block():
+    rows = [{'timestamp': '2026-10-01T10:05:00', 'prices': {'Cat 1': {'A': 100.0, 'B': None}}},
+            {'timestamp': '2026-10-01T10:35:00', 'prices': {'Cat 1': {'A': 80.0, 'B': 200.0}}}]
+    [bucket] = rollup_series(rows, 'hourly', SNAPSHOTS)
+    assert bucket['min'] == {'Cat 1': {'A': 80.0, 'B': 200.0}}
+    assert bucket['max'] == {'Cat 1': {'A': 100.0, 'B': 200.0}}
+    assert bucket['prices'] == rows[-1]['prices']
+
+
+def test_split_old_keeps_each_series_newest_row_raw():
+    rows = [row('08:00:00', 100.0), row('08:00:00', 200.0, 'Category 2'), row('09:00:00', 110.0),
+            row('12:00:00', 120.0)]
+    old, raw = split_old(rows, '2026-10-01T10:00:00')
+    assert old == [rows[0], rows[2]]
+    assert raw == [rows[1], rows[3]]
+
+
+def test_merge_rollups_folds_both_sides(tmp_path):
+    ours, theirs = str(tmp_path / 'ours'), str(tmp_path / 'theirs')
+    shared = rollup_series([row('10:05:00', 100.0)], 'hourly')
+    write_log(ours, shared)
+    write_log(theirs, shared + rollup_series([row('11:05:00', 90.0)], 'hourly'))
+    merged = merge_rollups(ours, theirs, 'prices.rollup.ndjson', now=datetime(2026, 10, 5))
+    assert buckets(merged) == [
+        ('hourly', '10-01T10:00', '10:05:00', 100.0, 100.0, 1, 100.0),
+        ('hourly', '10-01T11:00', '11:05:00', 90.0, 90.0, 1, 90.0),
+    ]
+
+
+def test_compact_log_moves_old_rows_into_the_rollup_file(tmp_path):
+    path = str(tmp_path / 'prices.ndjson')
+    old = [row('10:05:00', 100.0), row('10:40:00', 120.0)]
+    recent = {**row('10:00:00', 110.0), 'timestamp': '2026-10-20T10:00:00'}
+    write_log(path, old + [recent])
+    assert compact_log(path, now=datetime(2026, 10, 21)) == 2
+    assert list(iter_records(path)) == [recent]
+    assert buckets(iter_records(rollup_path(path))) == [
+        ('hourly', '10-01T10:00', '10:05:00', 100.0, 120.0, 2, 120.0),
+    ]
@@ -3,7 +3,8 @@ Test script to verify scraper_viagogo.py works locally and data format matches d
 """
 import json
 import os
-from scraper_viagogo import run, OUTPUT_FILE, load_json
+from scraper_viagogo import run, OUTPUT_FILE, LEGACY_OUTPUT_FILE, load_json
+from price_log import read_records, stream_records, current_path
 
 def test_data_format():
     """Test that saved data matches dashboard format"""
@@ -11,22 +12,21 @@ def test_data_format():
     print("Testing Data Format")
     print("=" * 60)
     
-    # Check if prices.json exists
-    if not os.path.exists(OUTPUT_FILE):
-        print(f"ERROR: {OUTPUT_FILE} not found. Run scraper first.")
+    # Check if the price log (or the legacy prices.json) exists
+    data_file = current_path(OUTPUT_FILE, LEGACY_OUTPUT_FILE)
+    if not os.path.exists(data_file):
+        print(f"ERROR: {data_file} not found. Run scraper first.")
         return False
     
-    data = load_json(OUTPUT_FILE, [])
-    if not data:
-        print(f"ERROR: {OUTPUT_FILE} is empty")
-        return False
-    
-    print(f"Found {len(data)} records in {OUTPUT_FILE}")
-    
-    # Check required fields
+    # Required fields
     required_fields = ["match_name", "match_url", "category", "price", "currency", "timestamp"]
     
-    for i, record in enumerate(data[:5]):  # Check first 5 records
+    # Streamed: the first 5 records are checked, the rest only counted
+    count = 0
+    for i, record in enumerate(stream_records(data_file)):
+        count += 1
+        if i >= 5:
+            continue
         print(f"\nRecord {i+1}:")
         missing_fields = []
         for field in required_fields:
@@ -51,6 +51,11 @@ def test_data_format():
             print(f"  ERROR Invalid price: {record['price']}")
             return False
     
+    if not count:
+        print(f"ERROR: {data_file} is empty")
+        return False
+    
+    print(f"\nFound {count} records in {data_file}")
     print("\nAll format checks passed!")
     return True
 
@@ -93,7 +98,7 @@ def test_scraper_run():
                 
                 # Check results
                 if os.path.exists(OUTPUT_FILE):
-                    data = load_json(OUTPUT_FILE, [])
+                    data = read_records(OUTPUT_FILE)
                     if data:
                         print(f"\nSUCCESS: Scraper completed! Found {len(data)} records")
                         return True
@@ -0,0 +1,139 @@
+"""
+Viagogo extraction modes replayed over the fixtures in fixtures/viagogo
+Each fixture's JSON responses feed the network mode through a fake performance log;
+its page payload feeds the page script and, element by element, the DOM strategies.
+Every mode that has data in a fixture must give that fixture's .expected.json.
+Run: python -m pytest -q test_viagogo_extraction.py
+"""
+import glob
+import json
+import os
+
+import pytest
+
+from viagogo_network import FIXTURES_DIR, extract_prices_network, load_fixture, read_fixture
+
+
+def fixtures(key):
+    """pytest params (fixture, expected prices) for every fixture with data under key and an .expected.json"""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.json'))):
+        expected_path = path[:-len('.json')] + '.expected.json'
+        if path.endswith('.expected.json') or not os.path.exists(expected_path):
+            continue
+        fixture = read_fixture(path)
+        if fixture.get(key):
+            with open(expected_path, 'r', encoding='utf-8') as f:
+                cases.append(pytest.param(fixture, json.load(f), id=os.path.basename(path)[:-len('.json')]))
+    return cases
+
+
+# ---------------------------------------------------------
+# Replay driver
+# ---------------------------------------------------------
+class NoSuchElement(Exception):
+    pass
+
+
+class Element:
+    """A price element of the page payload, or one of its ancestors (level = steps up the chain)"""
+
+    def __init__(self, page, price=None, level=0, aria=None, text=''):
+        self.page, self.price, self.level, self.aria, self._text = page, price, level, aria, text
+
+    @property
+    def text(self):
+        if self.price is None:
+            return self._text
+        return self.price['text'] if self.level == 0 else self.page['texts'][self.price['chain'][self.level]]
+
+    def get_attribute(self, name):
+        if name == 'aria-label':
+            if self.price is None:
+                return self.aria
+            return self.price['aria'] if self.level == 0 else ''
+        if name == 'textContent' and self.price is not None:
+            return self.page['texts'][self.price['chain'][self.level]]
+        return None
+
+    def find_element(self, by, expr):
+        if self.price is None or expr != '..' or self.level + 1 >= len(self.price['chain']):
+            raise NoSuchElement(expr)
+        return Element(self.page, self.price, self.level + 1)
+
+
+class ReplayDriver:
+    """Serves one fixture the way Chrome served the page it was recorded from"""
+
+    def __init__(self, fixture):
+        self.responses = fixture.get('responses', [])
+        self.page = fixture.get('page')
+
+    def execute(self, command, params=None):
+        return None
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def get_log(self, log_type):
+        return [{'message': json.dumps({'message': {
+            'method': 'Network.responseReceived',
+            'params': {'requestId': str(i), 'response': {'url': response['url'], 'mimeType': 'application/json'}},
+        }})} for i, response in enumerate(self.responses)]
+
+    def execute_cdp_cmd(self, command, params):
+        return {'body': json.dumps(self.responses[int(params['requestId'])]['body']), 'base64Encoded': False}
+
+    def execute_script(self, script, *args):
+        if self.page is None:
+            raise RuntimeError('no page payload recorded')
+        return self.page
+
+    def find_elements(self, by, expr):
+        if expr == '//*[@aria-label]':
+            return [Element(self.page, aria=label) for label in self.page['aria']]
+        return [Element(self.page, price) for price in self.page['prices']]
+
+    def find_element(self, by, expr):
+        return Element(self.page, text=self.page['body'])
+
+
+# ---------------------------------------------------------
+# Network mode
+# ---------------------------------------------------------
+@pytest.mark.parametrize('fixture,expected', fixtures('responses'))
+def test_network_capture(fixture, expected):
+    assert extract_prices_network(ReplayDriver(fixture)) == expected
+
+
+def test_load_fixture_returns_the_bodies():
+    path = os.path.join(FIXTURES_DIR, 'ticket_classes.json')
+    assert [body.get('eventId') for body in load_fixture(path)] == [None, 1]
+
+
+# ---------------------------------------------------------
+# Page modes (scraper_viagogo needs the browser packages)
+# ---------------------------------------------------------
+@pytest.fixture
+def scraper():
+    pytest.importorskip('undetected_chromedriver')
+    pytest.importorskip('selenium')
+    import scraper_viagogo
+    return scraper_viagogo
+
+
+@pytest.mark.parametrize('fixture,expected', fixtures('page'))
+def test_page_script(scraper, fixture, expected):
+    assert scraper.extract_prices_script(ReplayDriver(fixture)) == expected
+
+
+@pytest.mark.parametrize('fixture,expected', fixtures('page'))
+def test_dom_strategies(scraper, fixture, expected):
+    assert scraper.extract_prices_simple(ReplayDriver(fixture)) == expected
+
+
+@pytest.mark.parametrize('mode', ['network', 'script', 'dom'])
+@pytest.mark.parametrize('fixture,expected', fixtures('page'))
+def test_every_mode_agrees(scraper, monkeypatch, mode, fixture, expected):
+    monkeypatch.setattr(scraper, 'EXTRACTION_MODE', mode)
+    assert scraper.extract_prices(ReplayDriver(fixture)) == expected
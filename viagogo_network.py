@@ -0,0 +1,285 @@
+"""
+Viagogo Prices from Network Responses
+An event page fetches its listings as JSON. With Chrome's performance log on
+(get_driver sets goog:loggingPrefs in network mode), every response the page receives shows up as
+a DevTools Network event; this module picks out the JSON ones, fetches their bodies
+(Network.getResponseBody) and reduces them to the minimum price per category in
+pure Python - a handful of WebDriver calls per page instead of hundreds of element
+lookups. scraper_viagogo.scrape_match falls back to the DOM strategies when nothing
+usable was captured.
+
+The reducer does not depend on one payload layout: it walks the JSON for objects
+that name a category ("Category 1", "Cat 3", directly or in a child object such as
+a ticket class) and reads their price from the first usable key of PRICE_KEYS (a
+number, "$1,234", or an {amount|value, currency} object) - fees, face value and
+other *price* keys are never considered. A price counts only when it is known to be
+USD: "$"/"USD" in the text, or a currency key on the price, the object or one of its
+ancestors. Unmarked numbers are skipped rather than assumed to be USD.
+
+A fixture in fixtures/viagogo holds what one event page gave each extraction mode:
+its JSON responses (network) and the _PAGE_JS payload (script, and the DOM strategies
+replayed over it - see test_viagogo_extraction.py). `record` captures both from a live
+page. Fixtures marked "placeholder" are hand-built responses, not recorded traffic;
+those with a "source" were converted from a page saved in OLD/ and have no responses.
+scraper_viagogo keeps the page script as its default mode until `check` passes on
+recorded fixtures.
+
+Usage:
+    python viagogo_network.py record <event url> [name]   # save a page's responses and page payload as a fixture
+    python viagogo_network.py parse <fixture.json>...      # print the prices found in fixtures
+    python viagogo_network.py check                        # compare every fixture with its .expected.json
+"""
+import base64
+import glob
+import json
+import os
+import re
+import sys
+
+from browser_pool import is_browser_crash
+
+FIXTURES_DIR = os.path.join('fixtures', 'viagogo')
+MAX_BODY = 5 * 1024 * 1024  # bigger responses are not listing data
+PRICE_RANGE = (35, 50000)   # same sanity range as the DOM strategies
+
+_CATEGORY = re.compile(r'(?:Category|Cat)\s+([1-4])\b', re.I)
+_PRICE_TEXT = re.compile(r'(?:\$|USD)?\s*([\d,]{2,}(?:\.\d+)?)')
+_USD_TEXT = re.compile(r'(?:\$|USD)\s*[\d,]{2,}(?:\.\d+)?')
+# Listing / ticket-class price keys, most specific first - the first one that yields a USD price wins
+PRICE_KEYS = ('minPrice', 'lowestPrice', 'price', 'rawPrice', 'formattedPrice')
+_AMOUNT_KEYS = ('amount', 'value', 'raw', 'rawPrice', 'price')
+_CURRENCY_KEYS = ('currency', 'currencyCode', 'Currency', 'CurrencyCode')
+
+
+# ---------------------------------------------------------
+# Capture (Chrome performance log)
+# ---------------------------------------------------------
+def drain(driver):
+    """Drop the events logged so far - call before loading the next page in a reused browser"""
+    try:
+        driver.get_log('performance')
+    except Exception:
+        pass
+
+
+def captured_responses(driver):
+    """[(url, payload)] for the JSON responses logged since the last drain()"""
+    candidates = {}
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get('method') != 'Network.responseReceived':
+            continue
+        params = message.get('params', {})
+        response = params.get('response', {})
+        if 'json' in (response.get('mimeType') or '') and 'viagogo' in (response.get('url') or ''):
+            candidates[params.get('requestId')] = response['url']
+    responses = []
+    for request_id, url in candidates.items():
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            continue  # still loading or evicted - the DOM fallback covers it
+        body = result.get('body') or ''
+        if len(body) > MAX_BODY:
+            continue
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        try:
+            responses.append((url, json.loads(body)))
+        except ValueError:
+            continue
+    return responses
+
+
+# ---------------------------------------------------------
+# Reduction (pure Python)
+# ---------------------------------------------------------
+def _category(obj):
+    """'Category N' named by the object's own strings or those of a direct child object"""
+    children = [v for v in obj.values() if isinstance(v, dict)]
+    for source in [obj] + children:
+        for value in source.values():
+            if isinstance(value, str):
+                match = _CATEGORY.search(value)
+                if match:
+                    return f'Category {match.group(1)}'
+    return None
+
+
+def _currency(obj):
+    for key in _CURRENCY_KEYS:
+        if isinstance(obj.get(key), str):
+            return obj[key].upper()
+    return None
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _PRICE_TEXT.fullmatch(value.strip())
+        if match:
+            return float(match.group(1).replace(',', ''))
+    return None
+
+
+def _usd_amount(value, currency):
+    """USD amount of one price value, or None if it is not one (or its currency is unknown)"""
+    if isinstance(value, dict):
+        if (_currency(value) or currency) != 'USD':
+            return None
+        for key in _AMOUNT_KEYS:
+            amount = _number(value.get(key))
+            if amount is not None:
+                return amount
+        return None
+    if isinstance(value, str) and _USD_TEXT.fullmatch(value.strip()):
+        return _number(value)
+    return _number(value) if currency == 'USD' else None
+
+
+def _price(obj, currency=None):
+    """In-range USD price under the object's first usable PRICE_KEYS key, or None"""
+    currency = _currency(obj) or currency
+    for key in PRICE_KEYS:
+        price = _usd_amount(obj.get(key), currency)
+        if price is not None and PRICE_RANGE[0] <= price <= PRICE_RANGE[1]:
+            return price
+    return None
+
+
+def _walk(node, currency=None):
+    """(object, currency in effect for it) for every object in the tree"""
+    if isinstance(node, dict):
+        currency = _currency(node) or currency
+        yield node, currency
+        for value in node.values():
+            yield from _walk(value, currency)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value, currency)
+
+
+def prices_from_payloads(payloads):
+    """{category: minimum price} over all objects in the payloads that name a category and carry a price"""
+    prices = {}
+    for payload in payloads:
+        for obj, currency in _walk(payload):
+            category = _category(obj)
+            if category is None:
+                continue
+            price = _price(obj, currency)
+            if price is not None and (category not in prices or price < prices[category]):
+                prices[category] = price
+    return prices
+
+
+def extract_prices_network(driver):
+    """{category: min price} from the JSON the current page fetched ({} if none of it had prices)"""
+    try:
+        responses = captured_responses(driver)
+    except Exception as e:
+        if is_browser_crash(e):
+            raise
+        print(f'      ⚠️ Network capture unavailable: {str(e)[:50]}', flush=True)
+        return {}
+    prices = prices_from_payloads(payload for _, payload in responses)
+    print(f'      ➡️ Network capture: {len(responses)} JSON responses, {len(prices)} categories', flush=True)
+    return prices
+
+
+# ---------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------
+def read_fixture(path):
+    """{"url": page, "responses": [{"url", "body"}], "page": _PAGE_JS payload} as written by record()"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_fixture(path):
+    return [response['body'] for response in read_fixture(path).get('responses', [])]
+
+
+def record(url, name=None):
+    from scraper_viagogo import get_driver, _PAGE_JS, prices_from_page
+    from page_wait import wait_ready
+
+    driver = get_driver(network_log=True)
+    if not driver:
+        return None
+    try:
+        target_url = url + ('&Currency=USD' if '?' in url else '?Currency=USD')
+        drain(driver)
+        driver.get(target_url)
+        wait_ready(driver, 'viagogo_event')
+        responses = captured_responses(driver)
+        page = driver.execute_script(_PAGE_JS)
+    finally:
+        driver.quit()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    path = os.path.join(FIXTURES_DIR, (name or re.sub(r'\W+', '_', url.split('/')[-1])[:60]) + '.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'url': url, 'responses': [{'url': u, 'body': body} for u, body in responses], 'page': page},
+                  f, indent=1)
+    print(f'[OK] Recorded {len(responses)} JSON responses and the page payload to {path}')
+    print(f'[INFO] network: {prices_from_payloads(body for _, body in responses)}')
+    print(f'[INFO] page:    {prices_from_page(page)}')
+    print(f'[INFO] Check these against the live page, then save them as {path[:-len(".json")]}.expected.json')
+    return path
+
+
+def check():
+    """Every fixture with an .expected.json next to it must reduce to exactly that"""
+    failures = recorded = 0
+    paths = sorted(p for p in glob.glob(os.path.join(FIXTURES_DIR, '*.json')) if not p.endswith('.expected.json'))
+    for path in paths:
+        expected_path = path[:-len('.json')] + '.expected.json'
+        if not os.path.exists(expected_path):
+            print(f'[WARN] {path}: no {expected_path} - skipped')
+            continue
+        with open(expected_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        fixture = read_fixture(path)
+        results = {}
+        if fixture.get('responses'):
+            recorded += not fixture.get('placeholder')
+            results['network'] = prices_from_payloads(load_fixture(path))
+        if 'page' in fixture:
+            try:
+                from scraper_viagogo import prices_from_page
+            except ImportError as e:
+                print(f'[WARN] {path}: page payload not checked ({e})')
+            else:
+                results['page'] = prices_from_page(fixture['page'])
+        for mode, prices in results.items():
+            if prices == expected:
+                print(f'[OK] {path} ({mode}): {prices}')
+            else:
+                failures += 1
+                print(f'[ERROR] {path} ({mode}): got {prices}, expected {expected}')
+    if not recorded:
+        print('[WARN] No recorded fixtures - record live event pages before making network the default mode')
+    return failures
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == 'record':
+        return 0 if record(argv[1], argv[2] if len(argv) > 2 else None) else 1
+    if len(argv) >= 2 and argv[0] == 'parse':
+        for path in argv[1:]:
+            print(f'[INFO] {path}: {prices_from_payloads(load_fixture(path))}')
+        return 0
+    if argv and argv[0] == 'check':
+        return 1 if check() else 0
+    print(__doc__)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))